@@ -2,6 +2,8 @@
 
 from .hybrid_config import (
     HybridSystemConfig,
+    FrozenDict,
+    CRITERIA_NAMES,
     MODEL_A_SYSTEM_PROMPT,
     MODEL_B_SYSTEM_PROMPT
 )
@@ -9,6 +11,8 @@ from .model_configs import ModelAConfig, ModelBConfig
 
 __all__ = [
     'HybridSystemConfig',
+    'FrozenDict',
+    'CRITERIA_NAMES',
     'MODEL_A_SYSTEM_PROMPT', 
     'MODEL_B_SYSTEM_PROMPT',
     'ModelAConfig',
@@ -1,10 +1,67 @@
 """Hybrid system configuration for CV evaluation"""
 
 import os
-from dataclasses import dataclass
-from typing import List, Dict, Any
+from dataclasses import dataclass, field
+from typing import Mapping, Tuple
 
-@dataclass
+class FrozenDict(dict):
+    """Read-only, hashable dict: shared by every config, pickles/copies, and keeps the frozen config hashable"""
+    __slots__ = ()
+    
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only")
+    
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    
+    def __hash__(self):
+        return hash(tuple(self.items()))
+    
+    def __reduce__(self):
+        # Rebuild from items; the default dict protocol would go through __setitem__
+        return type(self), (tuple(self.items()),)
+    
+    def __copy__(self):
+        return self
+    
+    def __deepcopy__(self, memo):
+        return self
+
+
+# Shared read-only defaults (allocated once, not per config instance)
+_DEFAULT_CRITERIA = FrozenDict({
+    "technical_skills": "Technical expertise and proficiency relevant to role",
+    "experience_relevance": "Relevance and quality of work experience",
+    "education_quality": "Quality and prestige of educational background",
+    "leadership_potential": "Leadership experience and management potential",
+    "communication_skills": "Written communication and presentation skills",
+    "problem_solving": "Problem-solving abilities and analytical thinking",
+    "innovation_mindset": "Innovation, creativity, and forward-thinking",
+    "cultural_fit": "Cultural alignment and team collaboration indicators",
+    "career_progression": "Career growth trajectory and advancement",
+    "overall_impression": "Overall assessment and candidate potential"
+})
+
+_DEFAULT_RECS = ('strong_hire', 'hire', 'lean_hire', 'no_hire', 'strong_no_hire')
+
+# Single source of truth for criterion names (config, prompt, clients)
+CRITERIA_NAMES = tuple(_DEFAULT_CRITERIA)
+
+# Short per-criterion instructions shown in the Model A prompt
+_PROMPT_HINTS = (
+    "Assess technical expertise",
+    "Evaluate work experience quality",
+    "Review educational background",
+    "Assess leadership capabilities",
+    "Evaluate communication abilities",
+    "Assess analytical thinking",
+    "Review creativity and innovation",
+    "Evaluate team collaboration potential",
+    "Assess career growth trajectory",
+    "Provide overall assessment"
+)
+
+@dataclass(slots=True, frozen=True)
 class HybridSystemConfig:
     """Configuration for the hybrid CV evaluation system"""
     
@@ -24,54 +81,38 @@ class HybridSystemConfig:
     checkpoint_every: int = 10
     cache_dir: str = "/workspace/hf_cache"
     use_a100_optimizations: bool = True
+    empty_cache_on_init: bool = False  # torch.cuda.empty_cache() before training (OOM recovery)
+    inference_batch_size: int = 8  # CVs per generate() call in batch_evaluate
+    quantize_inference: bool = True  # Load Model A in 4-bit NF4 and Model B in 8-bit
+    compile_inference: bool = False  # torch.compile forward + static KV cache (best with fp16 weights)
+    model_a_engine: str = "hf"  # "hf" (transformers generate) or "vllm" (continuous batching)
+    reuse_prompt_prefix_cache: bool = True  # Compute the Model A system-prompt KV cache once
+    response_cache_size: int = 4096  # LRU entries keyed by CV text hash (0 disables)
     
     # Training Configuration
     train_split: float = 0.8
     random_seed: int = 42
+    deterministic_ground_truth: bool = False  # Skip per-CV score noise
     
     # Evaluation Criteria
-    evaluation_criteria: Dict[str, str] = None
-    valid_recommendations: List[str] = None
-    
-    def __post_init__(self):
-        if self.evaluation_criteria is None:
-            self.evaluation_criteria = {
-                "technical_skills": "Technical expertise and proficiency relevant to role",
-                "experience_relevance": "Relevance and quality of work experience",
-                "education_quality": "Quality and prestige of educational background",
-                "leadership_potential": "Leadership experience and management potential",
-                "communication_skills": "Written communication and presentation skills",
-                "problem_solving": "Problem-solving abilities and analytical thinking",
-                "innovation_mindset": "Innovation, creativity, and forward-thinking",
-                "cultural_fit": "Cultural alignment and team collaboration indicators",
-                "career_progression": "Career growth trajectory and advancement",
-                "overall_impression": "Overall assessment and candidate potential"
-            }
-        
-        if self.valid_recommendations is None:
-            self.valid_recommendations = [
-                'strong_hire', 'hire', 'lean_hire', 'no_hire', 'strong_no_hire'
-            ]
+    evaluation_criteria: Mapping[str, str] = field(default_factory=lambda: _DEFAULT_CRITERIA)
+    valid_recommendations: Tuple[str, ...] = field(default_factory=lambda: _DEFAULT_RECS)
 
 # System prompts
-MODEL_A_SYSTEM_PROMPT = """You are a professional CV evaluator with years of hiring experience.
+_CRITERIA_LINES = "\n".join(
+    f"{i}. {name.replace('_', ' ').title()} (score 1-10): {hint}"
+    for i, (name, hint) in enumerate(zip(CRITERIA_NAMES, _PROMPT_HINTS), 1)
+)
+
+MODEL_A_SYSTEM_PROMPT = f"""You are a professional CV evaluator with years of hiring experience.
 Analyze the CV and provide a structured evaluation in clear prose covering ALL of these criteria:
 
-1. Technical Skills (score 1-10): Assess technical expertise
-2. Experience Relevance (score 1-10): Evaluate work experience quality
-3. Education Quality (score 1-10): Review educational background
-4. Leadership Potential (score 1-10): Assess leadership capabilities
-5. Communication Skills (score 1-10): Evaluate communication abilities
-6. Problem Solving (score 1-10): Assess analytical thinking
-7. Innovation Mindset (score 1-10): Review creativity and innovation
-8. Cultural Fit (score 1-10): Evaluate team collaboration potential
-9. Career Progression (score 1-10): Assess career growth trajectory
-10. Overall Impression (score 1-10): Provide overall assessment
+{_CRITERIA_LINES}
 
 Format your response as:
 - Start each criterion with its name followed by ": X/10" where X is the score
 - After all scores, state "Total Score: Y" where Y is the sum
-- Then state "Recommendation: [recommendation]" using one of: strong_hire, hire, lean_hire, no_hire, strong_no_hire
+- Then state "Recommendation: [recommendation]" using one of: {', '.join(_DEFAULT_RECS)}
 - List "Key Strengths:" followed by 2-3 specific strengths
 - List "Areas for Improvement:" followed by 1-2 areas
 - Be specific and detailed in your evaluation"""
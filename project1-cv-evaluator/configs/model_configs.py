@@ -1,16 +1,23 @@
 """Individual model configurations"""
 
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
 
-@dataclass
+# Shared read-only LoRA target defaults
+_DEFAULT_TARGETS_A = (
+    "q_proj", "k_proj", "v_proj", "o_proj",
+    "gate_proj", "up_proj", "down_proj"
+)
+_DEFAULT_TARGETS_B = ("c_attn", "c_proj")
+
+@dataclass(slots=True, frozen=True)
 class ModelAConfig:
     """Configuration for Model A (Prose Evaluator)"""
     model_name: str = "NousResearch/Hermes-2-Pro-Mistral-7B"
     lora_rank: int = 64
     lora_alpha: int = 64
     lora_dropout: float = 0.1
-    target_modules: List[str] = None
+    target_modules: Tuple[str, ...] = field(default_factory=lambda: _DEFAULT_TARGETS_A)
     max_seq_length: int = 2048
     
     # GRPO specific
@@ -25,22 +32,16 @@ class ModelAConfig:
     bf16: bool = True
     tf32: bool = True
     gradient_checkpointing: bool = True
-    
-    def __post_init__(self):
-        if self.target_modules is None:
-            self.target_modules = [
-                "q_proj", "k_proj", "v_proj", "o_proj",
-                "gate_proj", "up_proj", "down_proj"
-            ]
+    use_paged_optimizer: bool = False  # paged_adamw_8bit: only when optimizer state does not fit
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ModelBConfig:
     """Configuration for Model B (JSON Converter)"""
     model_name: str = "gpt2"
     lora_rank: int = 32
     lora_alpha: int = 64
     lora_dropout: float = 0.05
-    target_modules: List[str] = None
+    target_modules: Tuple[str, ...] = field(default_factory=lambda: _DEFAULT_TARGETS_B)
     max_seq_length: int = 1024
     
     # Training specific
@@ -54,7 +55,3 @@ class ModelBConfig:
     bf16: bool = True
     tf32: bool = True
     dataloader_num_workers: int = 4
-    
-    def __post_init__(self):
-        if self.target_modules is None:
-            self.target_modules = ["c_attn", "c_proj"]
@@ -1,39 +1,37 @@
 # cleanup.py
-import os
-from dotenv import load_dotenv
-from google.cloud import aiplatform
+import logging
 
-# Load environment variables
-load_dotenv()
+from env_cache import get_env
+from vertex_client import get_endpoint
 
-# Get configuration
-ENDPOINT_ID = os.getenv('ENDPOINT_ID')
-PROJECT_ID = os.getenv('PROJECT_ID')
-REGION = os.getenv('REGION')
+# Get configuration (parsed once)
+ENV = get_env()
+
+logging.basicConfig(level=ENV.get('LOG_LEVEL', 'INFO'), format='%(message)s')
+logger = logging.getLogger(__name__)
+
+ENDPOINT_ID = ENV.get('ENDPOINT_ID')
 
 if not ENDPOINT_ID:
-    print("❌ No ENDPOINT_ID in .env - nothing to clean up")
+    logger.warning("❌ No ENDPOINT_ID in .env - nothing to clean up")
     exit(0)
 
-# Initialize
-aiplatform.init(project=PROJECT_ID, location=REGION)
-
-print("🗑️ Cleaning up Vertex AI resources...")
+logger.info("🗑️ Cleaning up Vertex AI resources...")
 
 try:
-    # Get endpoint
-    endpoint = aiplatform.Endpoint(ENDPOINT_ID)
+    # Get endpoint (SDK imported and initialised only once there is work to do)
+    endpoint = get_endpoint(ENDPOINT_ID)
     
     # Undeploy all models
-    print("📤 Undeploying models...")
+    logger.info("📤 Undeploying models...")
     endpoint.undeploy_all()
     
     # Delete endpoint
-    print("🗑️ Deleting endpoint...")
+    logger.info("🗑️ Deleting endpoint...")
     endpoint.delete()
     
-    print("✅ Cleanup complete!")
-    print("\n⚠️  Remember to remove ENDPOINT_ID from .env")
+    logger.info("✅ Cleanup complete!")
+    logger.warning("\n⚠️  Remember to remove ENDPOINT_ID from .env")
     
 except Exception as e:
-    print(f"❌ Error during cleanup: {e}")
+    logger.error("❌ Error during cleanup: %s", e)
@@ -3,39 +3,36 @@ import os
 import pickle
 import numpy as np
 
+# Static part of the mock response, shared by every prediction (treat as read-only)
+_TEMPLATE_PREDICTION = {
+    "model_a_prose_output": "Technical Skills (score 8/10): Strong technical background...",
+    "extraction_summary": {
+        "criteria_found": 10,
+        "total_criteria": 10,
+        "extraction_method": "direct_from_prose"
+    },
+    "final_evaluation": {
+        "technical_skills": 8,
+        "experience_relevance": 9,
+        "education_quality": 8,
+        "total_score": 75,
+        "recommendation": "hire",
+        "key_strengths": ["Strong technical skills", "Good experience"],
+        "areas_for_improvement": ["Leadership development"]
+    }
+}
+
 class CvEvaluatorPredictor:
     def __init__(self):
         pass
     
+    def _build_prediction(self, instance):
+        """Mock response for a single instance"""
+        return {"cv_preview": instance.get("cv_text", "")[:100] + "...", **_TEMPLATE_PREDICTION}
+    
     def predict(self, instances):
         """Simple predictor that returns mock results for testing"""
-        predictions = []
-        
-        for instance in instances:
-            cv_text = instance.get("cv_text", "")
-            
-            # Mock response for testing deployment
-            prediction = {
-                "cv_preview": cv_text[:100] + "...",
-                "model_a_prose_output": "Technical Skills (score 8/10): Strong technical background...",
-                "extraction_summary": {
-                    "criteria_found": 10,
-                    "total_criteria": 10,
-                    "extraction_method": "direct_from_prose"
-                },
-                "final_evaluation": {
-                    "technical_skills": 8,
-                    "experience_relevance": 9,
-                    "education_quality": 8,
-                    "total_score": 75,
-                    "recommendation": "hire",
-                    "key_strengths": ["Strong technical skills", "Good experience"],
-                    "areas_for_improvement": ["Leadership development"]
-                }
-            }
-            predictions.append(prediction)
-        
-        return predictions
+        return [self._build_prediction(instance) for instance in instances]
 
 # Create and save the predictor
 predictor = CvEvaluatorPredictor()
@@ -1,29 +1,31 @@
 # deploy_simple.py - Simplified deployment using custom predictor
-import os
-from dotenv import load_dotenv
-from google.cloud import aiplatform
-
-# Load environment variables
-load_dotenv()
-
-# Get configuration
-PROJECT_ID = os.getenv('PROJECT_ID')
-BUCKET_NAME = os.getenv('BUCKET_NAME')
-REGION = os.getenv('REGION')
-MODEL_DISPLAY_NAME = os.getenv('MODEL_DISPLAY_NAME')
-ENDPOINT_DISPLAY_NAME = os.getenv('ENDPOINT_DISPLAY_NAME')
-MACHINE_TYPE = os.getenv('MACHINE_TYPE')
-MIN_REPLICA_COUNT = int(os.getenv('MIN_REPLICA_COUNT', '1'))
-MAX_REPLICA_COUNT = int(os.getenv('MAX_REPLICA_COUNT', '1'))
+import logging
+
+from env_cache import get_env
+from vertex_client import get_aiplatform
+
+# Get configuration (parsed once)
+ENV = get_env()
+
+logging.basicConfig(level=ENV.get('LOG_LEVEL', 'INFO'), format='%(message)s')
+logger = logging.getLogger(__name__)
+
+BUCKET_NAME = ENV.get('BUCKET_NAME')
+MODEL_DISPLAY_NAME = ENV.get('MODEL_DISPLAY_NAME')
+ENDPOINT_DISPLAY_NAME = ENV.get('ENDPOINT_DISPLAY_NAME')
+DEPLOYED_MODEL_DISPLAY_NAME = ENV.get('DEPLOYED_MODEL_DISPLAY_NAME')
+MACHINE_TYPE = ENV.get('MACHINE_TYPE')
+MIN_REPLICA_COUNT = ENV.get('MIN_REPLICA_COUNT', 1)
+MAX_REPLICA_COUNT = ENV.get('MAX_REPLICA_COUNT', 1)
 
 # Initialize
-print(f"🔧 Initializing Vertex AI...")
-aiplatform.init(project=PROJECT_ID, location=REGION)
+logger.info("🔧 Initializing Vertex AI...")
+aiplatform = get_aiplatform()
 
 # Use sklearn container which is more flexible
 SERVING_CONTAINER = "us-docker.pkg.dev/vertex-ai/prediction/sklearn-cpu.1-0:latest"
 
-print("\n📦 Creating model with custom predictor...")
+logger.info("\n📦 Creating model with custom predictor...")
 
 # Create model without uploading artifacts (we'll handle it differently)
 model = aiplatform.Model.upload(
@@ -32,21 +34,21 @@ model = aiplatform.Model.upload(
     artifact_uri=f"gs://{BUCKET_NAME}/cv-evaluator/",
 )
 
-print(f"✅ Model created: {model.display_name}")
+logger.info("✅ Model created: %s", model.display_name)
 
-print("\n🔧 Creating endpoint...")
+logger.info("\n🔧 Creating endpoint...")
 endpoint = aiplatform.Endpoint.create(display_name=ENDPOINT_DISPLAY_NAME)
 
-print("\n🚀 Deploying model...")
+logger.info("\n🚀 Deploying model...")
 model.deploy(
     endpoint=endpoint,
-    deployed_model_display_name=os.getenv('DEPLOYED_MODEL_DISPLAY_NAME'),
+    deployed_model_display_name=DEPLOYED_MODEL_DISPLAY_NAME,
     machine_type=MACHINE_TYPE,
     min_replica_count=MIN_REPLICA_COUNT,
     max_replica_count=MAX_REPLICA_COUNT,
     # No GPU for initial test
 )
 
-print(f"\n✅ Deployment complete!")
-print(f"📌 Endpoint ID: {endpoint.name}")
+logger.info("\n✅ Deployment complete!")
+logger.info("📌 Endpoint ID: %s", endpoint.name)
 print(f"ENDPOINT_ID={endpoint.name}")
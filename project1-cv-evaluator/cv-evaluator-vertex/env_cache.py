@@ -0,0 +1,29 @@
+# env_cache.py - Parse .env once and share the values across scripts
+import os
+import types
+from functools import lru_cache
+
+from dotenv import dotenv_values
+
+# Variables that are always consumed as integers
+_INT_KEYS = ("ACCELERATOR_COUNT", "MIN_REPLICA_COUNT", "MAX_REPLICA_COUNT")
+
+
+@lru_cache(maxsize=1)
+def get_env():
+    """Return a read-only view of the environment with .env values applied.
+
+    The .env file is parsed a single time per process. Like load_dotenv(),
+    values already present in the process environment take precedence and
+    missing ones are exported so SDKs and subprocesses still see them.
+    """
+    for key, value in dotenv_values().items():
+        if value is not None:
+            os.environ.setdefault(key, value)
+
+    env = dict(os.environ)
+    for key in _INT_KEYS:
+        if env.get(key):
+            env[key] = int(env[key])
+
+    return types.MappingProxyType(env)
@@ -1,6 +1,8 @@
 # fix_model_pkl.py
 import pickle
-import json
+import orjson
+
+from gcs_upload import upload_bytes
 
 # Instead of pickling the class, pickle just the configuration
 model_config = {
@@ -12,12 +14,9 @@ model_config = {
     "base_model_b": "gpt2"
 }
 
-# Save configuration only
-with open("model.pkl", "wb") as f:
-    pickle.dump(model_config, f)
-
-print("✅ Created model.pkl with config only")
+# Upload configuration straight from memory: JSON (read by
+# sklearn_predictor.load) plus the pickle artifact the sklearn container requires
+upload_bytes("cv-evaluator-bucket", "cv-evaluator/model.json", orjson.dumps(model_config))
+upload_bytes("cv-evaluator-bucket", "cv-evaluator/model.pkl", pickle.dumps(model_config))
 
-# Upload fixed model.pkl
-import os
-os.system("gsutil cp model.pkl gs://cv-evaluator-bucket/cv-evaluator/")
+print("✅ Uploaded model.json and model.pkl with config only")
@@ -0,0 +1,56 @@
+# gcs_upload.py - Batch GCS uploads through a single storage client
+from functools import lru_cache
+from pathlib import Path
+
+
+@lru_cache(maxsize=None)
+def get_bucket(bucket_name):
+    """Return a bucket handle backed by one authenticated client"""
+    from google.cloud import storage
+    return storage.Client().bucket(bucket_name)
+
+
+def expand_paths(paths):
+    """Expand directories into the files they contain (relative paths)"""
+    filenames = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            filenames.extend(str(p) for p in sorted(path.rglob("*")) if p.is_file())
+        else:
+            filenames.append(str(path))
+    return filenames
+
+
+def clear_prefix(bucket_name, prefix):
+    """Delete every object under prefix (equivalent of gsutil -m rm -r)"""
+    bucket = get_bucket(bucket_name)
+    blobs = list(bucket.list_blobs(prefix=prefix))
+    if blobs:
+        bucket.delete_blobs(blobs)
+    return len(blobs)
+
+
+def upload_files(bucket_name, paths, prefix, max_workers=8):
+    """Upload files/directories under prefix in one parallel batch.
+
+    Threads share the bucket's HTTP connection pool, so there is no
+    per-file process start-up or TLS handshake as with gsutil calls.
+    """
+    from google.cloud.storage import transfer_manager
+
+    filenames = expand_paths(paths)
+    results = transfer_manager.upload_many_from_filenames(
+        get_bucket(bucket_name),
+        filenames,
+        blob_name_prefix=prefix,
+        max_workers=max_workers,
+        worker_type=transfer_manager.THREAD,
+        raise_exception=True,
+    )
+    return dict(zip(filenames, results))
+
+
+def upload_bytes(bucket_name, blob_name, data):
+    """Upload an in-memory payload (bytes or str) without a local temp file"""
+    get_bucket(bucket_name).blob(blob_name).upload_from_string(data)
+    return f"gs://{bucket_name}/{blob_name}"
@@ -2,30 +2,24 @@
 import pickle
 from sklearn import datasets
 from sklearn.ensemble import RandomForestClassifier
-from google.cloud import aiplatform
-from dotenv import load_dotenv
-import os
 
-load_dotenv()
+from env_cache import get_env
+from gcs_upload import upload_bytes
+from vertex_client import get_aiplatform
+
+ENV = get_env()
 
 # 1. Create a REAL sklearn model
 iris = datasets.load_iris()
 model = RandomForestClassifier()
 model.fit(iris.data, iris.target)
 
-# 2. Save it (no custom predictor needed!)
-with open("model.pkl", "wb") as f:
-    pickle.dump(model, f)
-
-# 3. Upload ONLY the model
-BUCKET = os.getenv('BUCKET_NAME')
-os.system(f"gsutil cp model.pkl gs://{BUCKET}/sklearn-iris/")
+# 2-3. Serialize and upload ONLY the model, straight from memory (no custom predictor needed!)
+BUCKET = ENV.get('BUCKET_NAME')
+upload_bytes(BUCKET, "sklearn-iris/model.pkl", pickle.dumps(model))
 
 # 4. Deploy (no predictor.py needed)
-aiplatform.init(
-    project=os.getenv('PROJECT_ID'),
-    location=os.getenv('REGION')
-)
+aiplatform = get_aiplatform()
 
 model = aiplatform.Model.upload(
     display_name="sklearn-iris-test",
@@ -1,10 +1,11 @@
 # minimal_deploy_test.py
-import os
 import pickle
-from google.cloud import aiplatform
-from dotenv import load_dotenv
 
-load_dotenv()
+from env_cache import get_env
+from gcs_upload import upload_bytes
+from vertex_client import get_aiplatform
+
+ENV = get_env()
 
 # 1. Create minimal predictor
 predictor_code = '''
@@ -13,24 +14,16 @@ def predict(instances, **kwargs):
     return [{"score": 75, "status": "working"} for _ in instances]
 '''
 
-with open("predictor.py", "w") as f:
-    f.write(predictor_code)
-
 # 2. Create simple model.pkl (just config, no classes)
 model_config = {"type": "test", "version": "1.0"}
-with open("model.pkl", "wb") as f:
-    pickle.dump(model_config, f)
 
-# 3. Upload files
-BUCKET = os.getenv('BUCKET_NAME')
-os.system(f"gsutil cp model.pkl gs://{BUCKET}/test-deploy/")
-os.system(f"gsutil cp predictor.py gs://{BUCKET}/test-deploy/")
+# 3. Upload files straight from memory
+BUCKET = ENV.get('BUCKET_NAME')
+upload_bytes(BUCKET, "test-deploy/model.pkl", pickle.dumps(model_config))
+upload_bytes(BUCKET, "test-deploy/predictor.py", predictor_code)
 
 # 4. Deploy
-aiplatform.init(
-    project=os.getenv('PROJECT_ID'),
-    location=os.getenv('REGION')
-)
+aiplatform = get_aiplatform()
 
 model = aiplatform.Model.upload(
     display_name="test-minimal",
@@ -1,6 +1,8 @@
 # package_for_vertex.py
 import pickle
-import os
+import orjson
+
+from gcs_upload import upload_bytes, upload_files
 
 # Create a dummy model object that Vertex AI will accept
 dummy_model = {
@@ -9,19 +11,18 @@ dummy_model = {
     "description": "This is a placeholder. Actual model loading happens in predictor.py"
 }
 
-# Save as model.pkl
-with open("model.pkl", "wb") as f:
-    pickle.dump(dummy_model, f)
-
-print("✅ Created model.pkl")
+# Upload model.json, plus the model.pkl artifact the container insists on,
+# straight from memory
+upload_bytes("cv-evaluator-bucket", "cv-evaluator/model.json", orjson.dumps(dummy_model))
+upload_bytes("cv-evaluator-bucket", "cv-evaluator/model.pkl", pickle.dumps(dummy_model))
 
-# Upload to GCS
-os.system("gsutil cp model.pkl gs://cv-evaluator-bucket/cv-evaluator/")
-print("✅ Uploaded model.pkl to GCS")
+print("✅ Uploaded model.json and model.pkl")
 
-# Also ensure predictor.py and requirements.txt are there
-os.system("gsutil cp predictor.py gs://cv-evaluator-bucket/cv-evaluator/")
-os.system("gsutil cp requirements.txt gs://cv-evaluator-bucket/cv-evaluator/")
-os.system("gsutil -m cp -r model_files gs://cv-evaluator-bucket/cv-evaluator/")
+# Upload predictor.py, requirements.txt and model files
+upload_files(
+    "cv-evaluator-bucket",
+    ["predictor.py", "requirements.txt", "model_files"],
+    prefix="cv-evaluator/",
+)
 
 print("✅ All files uploaded")
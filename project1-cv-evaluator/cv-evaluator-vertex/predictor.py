@@ -1,8 +1,14 @@
 
 import joblib
 import json
+from functools import lru_cache
+
+@lru_cache(maxsize=1)
+def _get_model(path="model.joblib"):
+    """Deserialize the model once per process"""
+    return joblib.load(path)
 
 def predict(instances, **kwargs):
-    model = joblib.load("model.joblib")
+    model = _get_model()
     predictions = model.predict(instances)
     return predictions
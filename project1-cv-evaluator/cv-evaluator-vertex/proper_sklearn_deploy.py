@@ -1,12 +1,14 @@
 # proper_sklearn_deploy.py
+import io
 import os
-import pickle
 import joblib
 from sklearn.base import BaseEstimator
-from google.cloud import aiplatform
-from dotenv import load_dotenv
 
-load_dotenv()
+from env_cache import get_env
+from gcs_upload import upload_bytes
+from vertex_client import get_aiplatform
+
+ENV = get_env()
 
 # 1. Create a proper sklearn estimator
 class SimplePredictor(BaseEstimator):
@@ -17,36 +19,37 @@ class SimplePredictor(BaseEstimator):
         # X will be the instances from the request
         return [{"score": 75, "recommendation": "hire"} for _ in X]
 
-# 2. Save with joblib (sklearn preferred)
+# 2. Serialize with joblib (sklearn preferred) into memory
 model = SimplePredictor()
-joblib.dump(model, "model.joblib")
+model_buffer = io.BytesIO()
+joblib.dump(model, model_buffer)
 
 # 3. Create the exact predictor format sklearn expects
 predictor_py = '''
 import joblib
 import json
+from functools import lru_cache
+
+@lru_cache(maxsize=1)
+def _get_model(path="model.joblib"):
+    """Deserialize the model once per process"""
+    return joblib.load(path)
 
 def predict(instances, **kwargs):
-    model = joblib.load("model.joblib")
+    model = _get_model()
     predictions = model.predict(instances)
     return predictions
 '''
 
-with open("predictor.py", "w") as f:
-    f.write(predictor_py)
-
-# 4. Upload both files
-BUCKET = os.getenv('BUCKET_NAME')
-os.system(f"gsutil cp model.joblib gs://{BUCKET}/sklearn-proper/")
-os.system(f"gsutil cp predictor.py gs://{BUCKET}/sklearn-proper/")
+# 4. Upload both files straight from memory
+BUCKET = ENV.get('BUCKET_NAME')
+upload_bytes(BUCKET, "sklearn-proper/model.joblib", model_buffer.getvalue())
+upload_bytes(BUCKET, "sklearn-proper/predictor.py", predictor_py)
 
 print("✅ Files uploaded. Now deploying...")
 
 # 5. Deploy
-aiplatform.init(
-    project=os.getenv('PROJECT_ID'),
-    location=os.getenv('REGION')
-)
+aiplatform = get_aiplatform()
 
 # First, clean up the hanging deployment
 print("🧹 Cleaning up hanging deployments...")
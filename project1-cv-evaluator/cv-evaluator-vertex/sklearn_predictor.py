@@ -1,51 +1,83 @@
 # sklearn_predictor.py - This works with sklearn container!
 import os
-import json
 import pickle
+import threading
 import numpy as np
-from typing import List, Dict, Any
+import orjson
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+def _read_config(model_path: str) -> Dict[str, Any]:
+    """Read model configuration (JSON when available, legacy pickle otherwise)"""
+    config_path = Path(model_path, "model.json")
+    if config_path.exists():
+        return orjson.loads(config_path.read_bytes())
+    with open(os.path.join(model_path, "model.pkl"), "rb") as f:
+        return pickle.load(f)
+
+def _preload_config():
+    """Read the config at import time if the artifacts are already on disk"""
+    model_path = os.environ.get("AIP_STORAGE_URI", ".")
+    try:
+        return model_path, _read_config(model_path)
+    except OSError:
+        # Not available yet (e.g. remote URI) - load() will read it
+        return None, None
+    except (ValueError, EOFError, pickle.UnpicklingError) as e:
+        # Corrupt or partially written config - don't fail the import, load() will retry
+        print(f"⚠️ Config not preloaded from {model_path}: {e}")
+        return None, None
+
+# Module import runs once under the import lock, so concurrent first
+# requests never race through the file read
+_CONFIG_PATH, _CONFIG = _preload_config()
+_LOAD_LOCK = threading.Lock()
 
 class SklearnPredictor:
     """Custom predictor that sklearn container can handle"""
-    
-    def __init__(self):
-        self.loaded = False
-        
+
+    def __init__(self, model_path: Optional[str] = None, config: Optional[Dict[str, Any]] = None):
+        self.model_path = model_path
+        self.config = None
+        self.template = None
+        if config is not None:
+            self._set_config(config)
+
+    def _set_config(self, config: Dict[str, Any]):
+        """Store config and build the static part of every mock prediction"""
+        self.config = config
+        self.template = {
+            "total_score": 75,
+            "recommendation": "hire",
+            "technical_skills": 8,
+            "experience_relevance": 7,
+            "education_quality": 8,
+            "processing_time_ms": 100,
+            "model_config": config,
+            "message": "Sklearn predictor working!"
+        }
+
     def load(self, model_path: str):
-        """Load model configuration"""
-        # Load the config
-        with open(os.path.join(model_path, "model.pkl"), "rb") as f:
-            self.config = pickle.load(f)
-        
-        # For now, just mark as loaded
-        self.loaded = True
-        print(f"✅ Model loaded: {self.config}")
-    
+        """Load model configuration (no-op if already preloaded from model_path)"""
+        if model_path == self.model_path:
+            return
+
+        with _LOAD_LOCK:
+            if model_path != self.model_path:
+                self._set_config(_read_config(model_path))
+                self.model_path = model_path
+                print(f"✅ Model loaded: {self.config}")
+
+    def _build_prediction(self, instance: Dict[str, Any]) -> Dict[str, Any]:
+        """Mock prediction for a single instance"""
+        return {"cv_preview": instance.get("cv_text", "")[:100] + "...", **self.template}
+
     def predict(self, X: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
         """Make predictions"""
-        predictions = []
-        
-        for instance in X:
-            cv_text = instance.get("cv_text", "")
-            
-            # Mock prediction for testing
-            prediction = {
-                "cv_preview": cv_text[:100] + "...",
-                "total_score": 75,
-                "recommendation": "hire",
-                "technical_skills": 8,
-                "experience_relevance": 7,
-                "education_quality": 8,
-                "processing_time_ms": 100,
-                "model_config": self.config,
-                "message": "Sklearn predictor working!"
-            }
-            predictions.append(prediction)
-        
-        return predictions
+        return [self._build_prediction(instance) for instance in X]
 
 # Create global instance for sklearn container
-_predictor = SklearnPredictor()
+_predictor = SklearnPredictor(_CONFIG_PATH, _CONFIG)
 
 # Sklearn container entry points
 def load(model_path):
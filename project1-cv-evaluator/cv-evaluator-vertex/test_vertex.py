@@ -1,15 +1,24 @@
 # test_vertex.py
-import os
-from dotenv import load_dotenv
-from google.cloud import aiplatform
+import sys
+from pathlib import Path
 
-# Load environment variables
-load_dotenv()
+sys.path.append(str(Path(__file__).parent.parent))
 
-# Get configuration
-ENDPOINT_ID = os.getenv('ENDPOINT_ID')
-PROJECT_ID = os.getenv('PROJECT_ID')
-REGION = os.getenv('REGION')
+from configs import CRITERIA_NAMES
+from env_cache import get_env
+from vertex_client import get_endpoint
+
+# Hashed membership for the per-field score loop
+_SCORE_CRITERIA = frozenset(CRITERIA_NAMES)
+_TITLES = {name: name.replace('_', ' ').title() for name in CRITERIA_NAMES}
+
+PROCESSING_TIME_TEMPLATE = "\n⏱️ Processing time: {}ms"
+
+# Get configuration (parsed once)
+ENV = get_env()
+ENDPOINT_ID = ENV.get('ENDPOINT_ID')
+PROJECT_ID = ENV.get('PROJECT_ID')
+REGION = ENV.get('REGION')
 
 if not ENDPOINT_ID:
     print("❌ Error: ENDPOINT_ID not set in .env file")
@@ -22,8 +31,8 @@ print(f"   Project: {PROJECT_ID}")
 print(f"   Region: {REGION}")
 print(f"   Endpoint: {ENDPOINT_ID}")
 
-aiplatform.init(project=PROJECT_ID, location=REGION)
-endpoint = aiplatform.Endpoint(ENDPOINT_ID)
+# SDK imported only once the configuration is known to be usable
+endpoint = get_endpoint(ENDPOINT_ID)
 
 # Test CV
 test_cv = """
@@ -62,10 +71,7 @@ print(f"Recommendation: {final_eval.get('recommendation', 'N/A')}")
 
 print("\n📊 Individual Scores:")
 for criterion, score in final_eval.items():
-    if criterion in ["technical_skills", "experience_relevance", "education_quality", 
-                     "leadership_potential", "communication_skills", "problem_solving",
-                     "innovation_mindset", "cultural_fit", "career_progression", 
-                     "overall_impression"]:
-        print(f"  • {criterion.replace('_', ' ').title()}: {score}/10")
+    if criterion in _SCORE_CRITERIA:
+        print(f"  • {_TITLES[criterion]}: {score}/10")
 
-print("\n⏱️ Processing time: {prediction.get('processing_time_ms', 'N/A')}ms")
+print(PROCESSING_TIME_TEMPLATE.format(prediction.get('processing_time_ms', 'N/A')))
@@ -0,0 +1,20 @@
+# vertex_client.py - Initialise the Vertex AI SDK once and share handles across scripts
+from functools import lru_cache
+
+from env_cache import get_env
+
+
+@lru_cache(maxsize=1)
+def get_aiplatform():
+    """Import aiplatform and run init() once for the configured project/region"""
+    from google.cloud import aiplatform
+
+    env = get_env()
+    aiplatform.init(project=env.get('PROJECT_ID'), location=env.get('REGION'))
+    return aiplatform
+
+
+@lru_cache(maxsize=None)
+def get_endpoint(endpoint_id):
+    """Return a shared Endpoint handle (metadata fetched once per id)"""
+    return get_aiplatform().Endpoint(endpoint_id)
@@ -1,11 +1,21 @@
 """Data processing module for hybrid CV evaluation"""
 
-from .dataset_processor import HybridDatasetProcessor
+from .dataset_processor import (
+    HybridDatasetProcessor,
+    write_packed_dataset,
+    save_processed_splits,
+    load_processed_splits,
+    processing_source
+)
 from .cv_generator import CVGenerator
 from .ground_truth_generator import GroundTruthGenerator
 
 __all__ = [
     'HybridDatasetProcessor',
     'CVGenerator',
-    'GroundTruthGenerator'
+    'GroundTruthGenerator',
+    'write_packed_dataset',
+    'save_processed_splits',
+    'load_processed_splits',
+    'processing_source'
 ]
@@ -1,96 +1,181 @@
 """CV generation utilities (incorporating persona and resume builder logic)"""
 
-import random
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+# Section underline used throughout the CV text
+SEP = "=" * 50
+
+
+@lru_cache(maxsize=None)
+def _pretty_name(slug: str) -> str:
+    """'data_science' -> 'data science' (cached per slug)"""
+    return slug.replace('_', ' ')
+
+
+class _SlotValues(dict):
+    """format_map mapping that draws a template slot value on first use"""
+    
+    def __init__(self, generator: 'CVGenerator'):
+        super().__init__()
+        self.generator = generator
+    
+    def __missing__(self, key: str) -> str:
+        rng = self.generator.rng
+        if key in self.generator.TEMPLATE_NUMBERS:
+            low, high, fmt = self.generator.TEMPLATE_NUMBERS[key]
+            value = fmt.format(int(rng.integers(low, high, endpoint=True)))
+        else:
+            pool = self.generator.TEMPLATE_POOLS[key]
+            value = pool[int(rng.integers(0, len(pool)))]
+        self[key] = value
+        return value
 
 
 class CVGenerator:
     """Generate synthetic CVs for training"""
     
-    def __init__(self):
+    # Value pools for per-CV fields (drawn by index in generate_batch)
+    FIRST_NAMES = ('Alex', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Avery')
+    LAST_NAMES = ('Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller')
+    EMAIL_PROVIDERS = ('gmail', 'outlook', 'yahoo')
+    LOCATIONS = ('San Francisco, CA', 'New York, NY', 'Seattle, WA')
+    DEGREES = ('Bachelor of Science', 'Master of Science')
+    # Achievement template slots: word pools and numeric (low, high, format) ranges
+    TEMPLATE_POOLS = {
+        'impact': ('key features', 'critical systems', 'new products'),
+        'metric': ('performance', 'efficiency', 'user satisfaction'),
+        'method': ('optimization', 'refactoring', 'new architecture'),
+        'system': ('microservices', 'data pipeline', 'API platform'),
+        'feature': ('recommendation engine', 'analytics dashboard', 'API'),
+        'project': ('platform migration', 'new feature launch', 'system upgrade'),
+        'technology': ('Python', 'React', 'Docker', 'Kubernetes'),
+        'purpose': ('scalability', 'performance', 'user experience'),
+        'activity': ('code reviews', 'sprint planning', 'technical discussions'),
+        'task': ('bug fixes', 'documentation', 'testing')
+    }
+    TEMPLATE_NUMBERS = {
+        'num': (3, 10, "{}"),
+        'percent': (20, 80, "{}"),
+        'scale': (1, 10, "{}M")
+    }
+    # Skill categories per quality tier (inclusive range) and positions per level
+    SKILL_COUNT_RANGES = {
+        'excellent': (6, 8),
+        'good': (4, 6),
+        'average': (3, 5),
+        'below_average': (2, 4)
+    }
+    POSITIONS_BY_LEVEL = {'entry': 1, 'mid': 2, 'senior': 3, 'executive': 4}
+    
+    def __init__(self, seed: Optional[Any] = None):
+        self.rng = np.random.default_rng(seed)
         self.skill_pools = self._initialize_skill_pools()
         self.education_institutions = self._initialize_education()
         self.company_pools = self._initialize_companies()
         
+        # Category names and value pools per domain, in matching order
+        self._skill_categories = {d: tuple(v) for d, v in self.skill_pools.items()}
+        self._skill_values = {d: tuple(v.values()) for d, v in self.skill_pools.items()}
+        
     def generate_cv(self, domain: str, experience_level: str, quality_tier: str) -> Dict[str, Any]:
         """Generate a complete CV based on parameters"""
+        return self.generate_batch([(domain, experience_level, quality_tier)])[0]
+    
+    def generate_batch(self, specs: Sequence[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        """Generate CVs for (domain, experience_level, quality_tier) specs.
         
-        persona = self._generate_persona(domain, experience_level, quality_tier)
-        cv_text = self._generate_cv_text(persona)
+        Fields present on every CV are drawn for the whole batch with one
+        generator call per pool instead of one Python RNG call per CV.
+        """
+        n = len(specs)
+        rng = self.rng
         
-        return {
-            'cv_text': cv_text,
-            'persona': persona,
-            'metadata': {
+        first_idx = rng.integers(0, len(self.FIRST_NAMES), n).tolist()
+        last_idx = rng.integers(0, len(self.LAST_NAMES), n).tolist()
+        provider_idx = rng.integers(0, len(self.EMAIL_PROVIDERS), n).tolist()
+        phones = rng.integers(2000000000, 9999999999, n, endpoint=True).tolist()
+        location_idx = rng.integers(0, len(self.LOCATIONS), n).tolist()
+        degree_idx = rng.integers(0, len(self.DEGREES), n).tolist()
+        edu_years = rng.integers(2015, 2023, n, endpoint=True).tolist()
+        # Institution pools differ in size per tier, so scale a uniform draw
+        institution_u = rng.random(n).tolist()
+        
+        # One clock read per batch: shared timestamp and experience end year
+        now = datetime.now()
+        generated_at = now.isoformat()
+        
+        cvs = []
+        for i, (domain, experience_level, quality_tier) in enumerate(specs):
+            institutions = self.education_institutions[quality_tier]
+            
+            persona = {
+                'name': f"{self.FIRST_NAMES[first_idx[i]]} {self.LAST_NAMES[last_idx[i]]}",
+                'title': self._generate_title(domain, experience_level),
+                'contact': {
+                    'email': f"contact@{self.EMAIL_PROVIDERS[provider_idx[i]]}.com",
+                    'phone': f"+1{phones[i]}",
+                    'location': self.LOCATIONS[location_idx[i]]
+                },
+                'skills': self._generate_skills(domain, experience_level, quality_tier),
+                'experience': self._generate_experience(domain, experience_level, quality_tier, now.year),
+                'education': [{
+                    'degree': self.DEGREES[degree_idx[i]],
+                    'institution': institutions[int(institution_u[i] * len(institutions))],
+                    'year': str(edu_years[i])
+                }],
                 'domain': domain,
                 'experience_level': experience_level,
-                'quality_tier': quality_tier,
-                'generated_at': datetime.now().isoformat()
+                'quality_tier': quality_tier
             }
-        }
-    
-    def _generate_persona(self, domain: str, experience_level: str, quality_tier: str) -> Dict[str, Any]:
-        """Generate persona for CV"""
+            
+            cvs.append({
+                'cv_text': self._generate_cv_text(persona),
+                'persona': persona,
+                'metadata': {
+                    'domain': domain,
+                    'experience_level': experience_level,
+                    'quality_tier': quality_tier,
+                    'generated_at': generated_at
+                }
+            })
         
-        return {
-            'name': self._generate_name(),
-            'title': self._generate_title(domain, experience_level),
-            'contact': self._generate_contact(),
-            'skills': self._generate_skills(domain, experience_level, quality_tier),
-            'experience': self._generate_experience(domain, experience_level, quality_tier),
-            'education': self._generate_education(quality_tier),
-            'domain': domain,
-            'experience_level': experience_level,
-            'quality_tier': quality_tier
-        }
+        return cvs
     
     def _generate_cv_text(self, persona: Dict[str, Any]) -> str:
         """Convert persona to CV text"""
         
-        cv_parts = []
-        
-        # Header
-        cv_parts.append(f"Name: {persona['name']}")
-        cv_parts.append(f"Title: {persona['title']}")
-        cv_parts.append(f"Email: {persona['contact']['email']}")
-        cv_parts.append(f"Phone: {persona['contact']['phone']}")
-        cv_parts.append(f"Location: {persona['contact']['location']}")
-        
-        # Professional Summary
-        cv_parts.append("\nPROFESSIONAL SUMMARY")
-        cv_parts.append("=" * 50)
-        cv_parts.append(self._generate_summary(persona))
-        
-        # Skills
-        cv_parts.append("\nTECHNICAL SKILLS")
-        cv_parts.append("=" * 50)
-        for category, skills in persona['skills'].items():
-            cv_parts.append(f"{category}: {skills}")
-        
-        # Experience
-        cv_parts.append("\nPROFESSIONAL EXPERIENCE")
-        cv_parts.append("=" * 50)
-        for exp in persona['experience']:
-            cv_parts.append(f"{exp['title']} | {exp['company']}")
-            cv_parts.append(f"Duration: {exp['period']}")
-            for achievement in exp['achievements']:
-                cv_parts.append(f"• {achievement}")
-            cv_parts.append("")
+        contact = persona['contact']
         
-        # Education
-        cv_parts.append("EDUCATION")
-        cv_parts.append("=" * 50)
-        for edu in persona['education']:
-            cv_parts.append(f"{edu['degree']} - {edu['institution']} ({edu['year']})")
+        # Sections built with one join each (every line newline-terminated)
+        skills_block = ''.join(
+            f"{category}: {skills}\n" for category, skills in persona['skills'].items()
+        )
+        exp_block = ''.join(
+            f"{exp['title']} | {exp['company']}\nDuration: {exp['period']}\n"
+            + ''.join(f"• {achievement}\n" for achievement in exp['achievements'])
+            + "\n"
+            for exp in persona['experience']
+        )
+        edu_block = '\n'.join(
+            f"{edu['degree']} - {edu['institution']} ({edu['year']})"
+            for edu in persona['education']
+        )
         
-        return '\n'.join(cv_parts)
-    
-    def _generate_name(self) -> str:
-        """Generate random name"""
-        first_names = ['Alex', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Avery']
-        last_names = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller']
-        return f"{random.choice(first_names)} {random.choice(last_names)}"
+        return (
+            f"Name: {persona['name']}\n"
+            f"Title: {persona['title']}\n"
+            f"Email: {contact['email']}\n"
+            f"Phone: {contact['phone']}\n"
+            f"Location: {contact['location']}\n"
+            f"\nPROFESSIONAL SUMMARY\n{SEP}\n{self._generate_summary(persona)}\n"
+            f"\nTECHNICAL SKILLS\n{SEP}\n{skills_block}"
+            f"\nPROFESSIONAL EXPERIENCE\n{SEP}\n{exp_block}"
+            f"EDUCATION\n{SEP}\n{edu_block}"
+        )
     
     def _generate_title(self, domain: str, experience_level: str) -> str:
         """Generate job title"""
@@ -111,55 +196,42 @@ class CVGenerator:
         
         return titles.get(domain, titles['data_science'])[experience_level]
     
-    def _generate_contact(self) -> Dict[str, str]:
-        """Generate contact information"""
-        return {
-            'email': f"contact@{random.choice(['gmail', 'outlook', 'yahoo'])}.com",
-            'phone': f"+1{random.randint(2000000000, 9999999999)}",
-            'location': random.choice(['San Francisco, CA', 'New York, NY', 'Seattle, WA'])
-        }
-    
     def _generate_skills(self, domain: str, experience_level: str, quality_tier: str) -> Dict[str, str]:
         """Generate skills based on parameters"""
-        domain_skills = self.skill_pools.get(domain, self.skill_pools['data_science'])
+        if domain not in self.skill_pools:
+            domain = 'data_science'
         
-        # Number of skills based on quality
-        skill_counts = {
-            'excellent': random.randint(6, 8),
-            'good': random.randint(4, 6),
-            'average': random.randint(3, 5),
-            'below_average': random.randint(2, 4)
-        }
+        # Number of skills based on quality (one draw from the tier's range)
+        count_range = self.SKILL_COUNT_RANGES.get(quality_tier)
+        num_categories = int(self.rng.integers(*count_range, endpoint=True)) if count_range else 4
         
         skills = {}
-        num_categories = skill_counts.get(quality_tier, 4)
         
-        for category in list(domain_skills.keys())[:num_categories]:
-            category_skills = domain_skills[category]
-            selected = random.sample(category_skills, min(5, len(category_skills)))
+        for category, category_skills in zip(self._skill_categories[domain][:num_categories],
+                                             self._skill_values[domain]):
+            order = self.rng.permutation(len(category_skills))[:5]
+            selected = [category_skills[j] for j in order]
             skills[category] = ', '.join(selected)
         
         return skills
     
-    def _generate_experience(self, domain: str, experience_level: str, quality_tier: str) -> List[Dict[str, Any]]:
+    def _generate_experience(self, domain: str, experience_level: str, quality_tier: str,
+                             current_year: Optional[int] = None) -> List[Dict[str, Any]]:
         """Generate work experience"""
         companies = self.company_pools[quality_tier]
         
-        num_positions = {
-            'entry': 1,
-            'mid': 2,
-            'senior': 3,
-            'executive': 4
-        }[experience_level]
+        num_positions = self.POSITIONS_BY_LEVEL[experience_level]
         
         experience = []
-        current_year = datetime.now().year
+        if current_year is None:
+            current_year = datetime.now().year
+        company_idx = self.rng.integers(0, len(companies), num_positions).tolist()
         
         for i in range(num_positions):
             years_ago = i * 3
             experience.append({
                 'title': self._generate_title(domain, experience_level),
-                'company': random.choice(companies),
+                'company': companies[company_idx[i]],
                 'period': f"{current_year - years_ago - 2} - {current_year - years_ago}",
                 'achievements': self._generate_achievements(domain, quality_tier)
             })
@@ -187,40 +259,13 @@ class CVGenerator:
         }
         
         templates = achievement_templates.get(quality_tier, achievement_templates['average'])
-        return [self._fill_template(t) for t in random.sample(templates, min(3, len(templates)))]
+        order = self.rng.permutation(len(templates))[:3]
+        return [self._fill_template(templates[j]) for j in order]
     
     def _fill_template(self, template: str) -> str:
         """Fill achievement template with random values"""
-        replacements = {
-            '{num}': str(random.randint(3, 10)),
-            '{impact}': random.choice(['key features', 'critical systems', 'new products']),
-            '{metric}': random.choice(['performance', 'efficiency', 'user satisfaction']),
-            '{percent}': str(random.randint(20, 80)),
-            '{method}': random.choice(['optimization', 'refactoring', 'new architecture']),
-            '{system}': random.choice(['microservices', 'data pipeline', 'API platform']),
-            '{scale}': f"{random.randint(1, 10)}M",
-            '{feature}': random.choice(['recommendation engine', 'analytics dashboard', 'API']),
-            '{project}': random.choice(['platform migration', 'new feature launch', 'system upgrade']),
-            '{technology}': random.choice(['Python', 'React', 'Docker', 'Kubernetes']),
-            '{purpose}': random.choice(['scalability', 'performance', 'user experience']),
-            '{activity}': random.choice(['code reviews', 'sprint planning', 'technical discussions']),
-            '{task}': random.choice(['bug fixes', 'documentation', 'testing'])
-        }
-        
-        result = template
-        for key, value in replacements.items():
-            result = result.replace(key, value)
-        return result
-    
-    def _generate_education(self, quality_tier: str) -> List[Dict[str, str]]:
-        """Generate education background"""
-        institutions = self.education_institutions[quality_tier]
-        
-        return [{
-            'degree': random.choice(['Bachelor of Science', 'Master of Science']),
-            'institution': random.choice(institutions),
-            'year': str(random.randint(2015, 2023))
-        }]
+        # Single formatting pass; only the slots the template uses are drawn
+        return template.format_map(_SlotValues(self))
     
     def _generate_summary(self, persona: Dict[str, Any]) -> str:
         """Generate professional summary"""
@@ -233,40 +278,40 @@ class CVGenerator:
         template = templates.get(persona['quality_tier'], templates['average'])
         return template.format(
             title=persona['title'],
-            domain=persona['domain'].replace('_', ' ')
+            domain=_pretty_name(persona['domain'])
         )
     
-    def _initialize_skill_pools(self) -> Dict[str, Dict[str, List[str]]]:
+    def _initialize_skill_pools(self) -> Dict[str, Dict[str, Tuple[str, ...]]]:
         """Initialize skill pools by domain"""
         return {
             'data_science': {
-                'Programming': ['Python', 'R', 'SQL', 'Scala', 'Java'],
-                'ML/AI': ['Machine Learning', 'Deep Learning', 'TensorFlow', 'PyTorch'],
-                'Data Tools': ['Pandas', 'NumPy', 'Jupyter', 'Apache Spark'],
-                'Cloud': ['AWS', 'GCP', 'Azure', 'Docker', 'Kubernetes']
+                'Programming': ('Python', 'R', 'SQL', 'Scala', 'Java'),
+                'ML/AI': ('Machine Learning', 'Deep Learning', 'TensorFlow', 'PyTorch'),
+                'Data Tools': ('Pandas', 'NumPy', 'Jupyter', 'Apache Spark'),
+                'Cloud': ('AWS', 'GCP', 'Azure', 'Docker', 'Kubernetes')
             },
             'software_engineering': {
-                'Languages': ['Python', 'JavaScript', 'Java', 'Go', 'TypeScript'],
-                'Frontend': ['React', 'Vue.js', 'Angular', 'HTML5', 'CSS3'],
-                'Backend': ['Node.js', 'Django', 'Flask', 'Spring Boot'],
-                'DevOps': ['Docker', 'Kubernetes', 'Jenkins', 'GitLab CI']
+                'Languages': ('Python', 'JavaScript', 'Java', 'Go', 'TypeScript'),
+                'Frontend': ('React', 'Vue.js', 'Angular', 'HTML5', 'CSS3'),
+                'Backend': ('Node.js', 'Django', 'Flask', 'Spring Boot'),
+                'DevOps': ('Docker', 'Kubernetes', 'Jenkins', 'GitLab CI')
             }
         }
     
-    def _initialize_education(self) -> Dict[str, List[str]]:
+    def _initialize_education(self) -> Dict[str, Tuple[str, ...]]:
         """Initialize education institutions by quality"""
         return {
-            'excellent': ['MIT', 'Stanford University', 'Harvard University', 'UC Berkeley'],
-            'good': ['University of Washington', 'Georgia Tech', 'University of Michigan'],
-            'average': ['State University', 'Regional College', 'Community College'],
-            'below_average': ['Online University', 'Technical Institute']
+            'excellent': ('MIT', 'Stanford University', 'Harvard University', 'UC Berkeley'),
+            'good': ('University of Washington', 'Georgia Tech', 'University of Michigan'),
+            'average': ('State University', 'Regional College', 'Community College'),
+            'below_average': ('Online University', 'Technical Institute')
         }
     
-    def _initialize_companies(self) -> Dict[str, List[str]]:
+    def _initialize_companies(self) -> Dict[str, Tuple[str, ...]]:
         """Initialize company pools by quality"""
         return {
-            'excellent': ['Google', 'Apple', 'Microsoft', 'Amazon', 'Meta'],
-            'good': ['IBM', 'Oracle', 'Salesforce', 'Adobe', 'Cisco'],
-            'average': ['TechCorp', 'DataFlow Inc', 'Innovation Labs'],
-            'below_average': ['Local Tech Company', 'StartupTech']
+            'excellent': ('Google', 'Apple', 'Microsoft', 'Amazon', 'Meta'),
+            'good': ('IBM', 'Oracle', 'Salesforce', 'Adobe', 'Cisco'),
+            'average': ('TechCorp', 'DataFlow Inc', 'Innovation Labs'),
+            'below_average': ('Local Tech Company', 'StartupTech')
         }
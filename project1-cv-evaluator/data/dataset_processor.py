@@ -1,15 +1,98 @@
 """Dataset processor for hybrid two-model training"""
 
+import hashlib
 import os
-import json
-import random
+import re
 import zipfile
-from typing import Dict, List, Any, Tuple
-from datasets import Dataset
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+import numpy as np
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datasets import Dataset, Features, Sequence as FeatureSequence, Value, load_from_disk
 
 from configs.hybrid_config import HybridSystemConfig, MODEL_A_SYSTEM_PROMPT, MODEL_B_SYSTEM_PROMPT
 from .cv_generator import CVGenerator
-from .ground_truth_generator import GroundTruthGenerator
+from .ground_truth_generator import GroundTruthGenerator, get_recommendation
+
+# CV file name, capturing the number shared with its persona file
+_CV_RE = re.compile(r'cv_(\d+)\.txt$')
+
+# Constant prompt parts, joined once instead of per CV
+_MODEL_A_PREFIX = f"{MODEL_A_SYSTEM_PROMPT}\n\nEvaluate this CV:\n\n"
+_MODEL_B_PREFIX = f"{MODEL_B_SYSTEM_PROMPT}\n\nCV Evaluation:\n"
+_MODEL_B_SUFFIX = "\n\nJSON:"
+
+# Processed splits as written by save_processed_splits, in process_dataset's return order
+_SPLIT_NAMES = ('model_a_train', 'model_a_val', 'model_b_train', 'model_b_val')
+_SOURCE_FILE = 'source.json'
+
+
+def _dumps_compact(obj: Any) -> str:
+    """Serialize to compact JSON text (no whitespace, so completions stay short)"""
+    return orjson.dumps(obj).decode()
+
+
+def write_packed_dataset(cv_texts: Sequence[str],
+                         personas: Sequence[Dict[str, Any]],
+                         output_path: str) -> str:
+    """Write CV texts and their persona data to a single Parquet shard"""
+    table = pa.table({
+        'cv_text': pa.array(cv_texts, type=pa.string()),
+        'quality_tier': [p.get('quality_tier', 'good') for p in personas],
+        'experience_level': [p.get('experience_level', 'mid') for p in personas],
+        'domain': [p.get('domain', 'data_science') for p in personas],
+        'persona_json': pa.array([orjson.dumps(p) for p in personas], type=pa.binary())
+    })
+    pq.write_table(table, output_path)
+    return output_path
+
+
+def processing_source(config: HybridSystemConfig, cv_dataset_path: str) -> Dict[str, Any]:
+    """Everything the processed splits depend on: input files (path, size, mtime) and processing config"""
+    path = os.path.abspath(cv_dataset_path)
+    if os.path.isdir(path):
+        files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    else:
+        files = [path] if os.path.exists(path) else []
+    
+    # Hash of (relative path, size, mtime) for every input file; a regenerated dataset changes it
+    digest = hashlib.sha256()
+    for file_path in files:
+        stat = os.stat(file_path)
+        digest.update(f"{os.path.relpath(file_path, path)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    
+    return {
+        "cv_dataset_path": path,
+        "files_digest": digest.hexdigest(),
+        "random_seed": config.random_seed,
+        "train_split": config.train_split,
+        "deterministic_ground_truth": config.deterministic_ground_truth,
+        "evaluation_criteria": dict(config.evaluation_criteria),
+        "valid_recommendations": list(config.valid_recommendations),
+        "prompts_digest": hashlib.sha256((MODEL_A_SYSTEM_PROMPT + MODEL_B_SYSTEM_PROMPT).encode()).hexdigest()
+    }
+
+
+def save_processed_splits(splits: Sequence[Dataset], cache_dir: str, source: Dict[str, Any]) -> None:
+    """Write the four processed splits as Arrow files, tagged with what they were built from"""
+    for name, split in zip(_SPLIT_NAMES, splits):
+        split.save_to_disk(os.path.join(cache_dir, name))
+    with open(os.path.join(cache_dir, _SOURCE_FILE), 'wb') as f:
+        f.write(orjson.dumps(source))
+
+
+def load_processed_splits(cache_dir: str,
+                          source: Dict[str, Any]) -> Optional[Tuple[Dataset, Dataset, Dataset, Dataset]]:
+    """Memory-map previously saved splits, or None if missing or built from another source"""
+    try:
+        with open(os.path.join(cache_dir, _SOURCE_FILE), 'rb') as f:
+            if orjson.loads(f.read()) != source:
+                return None
+        return tuple(load_from_disk(os.path.join(cache_dir, name)) for name in _SPLIT_NAMES)
+    except FileNotFoundError:
+        return None
 
 
 class HybridDatasetProcessor:
@@ -17,82 +100,88 @@ class HybridDatasetProcessor:
     
     def __init__(self, config: HybridSystemConfig):
         self.config = config
-        self.cv_generator = CVGenerator()
-        self.ground_truth_generator = GroundTruthGenerator(config)
+        
+        # Independent, reproducible streams derived from the configured seed
+        cv_seed, truth_seed, own_seed = np.random.SeedSequence(config.random_seed).spawn(3)
+        self.rng = np.random.default_rng(own_seed)
+        self.cv_generator = CVGenerator(seed=cv_seed)
+        self.ground_truth_generator = GroundTruthGenerator(config, seed=truth_seed)
+        self._pretty = {c: c.replace('_', ' ').title() for c in config.evaluation_criteria}
+        
+        # Fixed Arrow schema for Model A samples (Model B keeps the free-form persona metadata)
+        self.model_a_features = Features({
+            'prompt': Value('string'),
+            'chosen': Value('string'),
+            'ground_truth': {
+                **{criterion: Value('int64') for criterion in config.evaluation_criteria},
+                'total_score': Value('int64'),
+                'recommendation': Value('string'),
+                'key_strengths': FeatureSequence(Value('string')),
+                'areas_for_improvement': FeatureSequence(Value('string')),
+                'processing_time_ms': Value('int64')
+            },
+            'metadata': {
+                'quality': Value('string'),
+                'exp_level': Value('string'),
+                'domain': Value('string')
+            }
+        })
     
     def process_dataset(self, cv_dataset_path: str) -> Tuple[Dataset, Dataset, Dataset, Dataset]:
-        """Process CV dataset for hybrid training"""
+        """Process CV dataset (directory, zip or packed .parquet shard) for hybrid training"""
         
-        # Extract if zip file
-        if cv_dataset_path.endswith('.zip'):
-            extract_path = cv_dataset_path.replace('.zip', '')
-            with zipfile.ZipFile(cv_dataset_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_path)
-            cv_dataset_path = extract_path
+        if cv_dataset_path.endswith('.parquet'):
+            cv_texts, personas = self._load_packed(cv_dataset_path)
+        else:
+            # Extract if zip file
+            if cv_dataset_path.endswith('.zip'):
+                extract_path = cv_dataset_path.replace('.zip', '')
+                with zipfile.ZipFile(cv_dataset_path, 'r') as zip_ref:
+                    zip_ref.extractall(extract_path)
+                cv_dataset_path = extract_path
+            
+            cv_texts, personas = self._load_directory(cv_dataset_path)
         
-        # Load CV files
-        cv_files = [f for f in os.listdir(cv_dataset_path) 
-                   if f.startswith('cv_') and f.endswith('.txt')]
+        print(f"📊 Processing {len(cv_texts)} CV files for hybrid training...")
         
-        print(f"📊 Processing {len(cv_files)} CV files for hybrid training...")
+        # Generate ground truth (both JSON and prose) for all CVs in one batch
+        ground_truths = self.ground_truth_generator.generate_ground_truth_batch(
+            [p.get('quality_tier', 'good') for p in personas],
+            [p.get('experience_level', 'mid') for p in personas],
+            [p.get('domain', 'data_science') for p in personas]
+        )
         
-        model_a_samples = []  # Prose evaluation samples
-        model_b_samples = []  # JSON conversion samples
+        # Samples are collected column-wise, so Arrow converts each column once
+        # instead of going through a list of per-row dicts
+        model_a_columns = {'prompt': [], 'chosen': [], 'ground_truth': [], 'metadata': []}  # Prose evaluation
+        model_b_columns = {'prompt': [], 'completion': [], 'metadata': []}  # JSON conversion
         
-        for i, cv_file in enumerate(cv_files):
-            cv_path = os.path.join(cv_dataset_path, cv_file)
-            with open(cv_path, 'r', encoding='utf-8') as f:
-                cv_text = f.read()
-            
-            # Load persona data
-            cv_number = cv_file.replace('cv_', '').replace('.txt', '')
-            persona_path = os.path.join(cv_dataset_path, f'persona_{cv_number}.json')
-            
-            if os.path.exists(persona_path):
-                with open(persona_path, 'r', encoding='utf-8') as f:
-                    persona_data = json.load(f)
-            else:
-                # Generate default persona
-                persona_data = self._generate_default_persona()
-            
-            # Generate ground truth (both JSON and prose)
-            json_truth, prose_truth = self.ground_truth_generator.generate_ground_truth(
-                persona_data.get('quality_tier', 'good'),
-                persona_data.get('experience_level', 'mid'),
-                persona_data.get('domain', 'data_science')
-            )
-            
+        for i, (cv_text, persona_data, (json_truth, prose_truth)) in enumerate(
+                zip(cv_texts, personas, ground_truths)):
             # Model A sample (CV → Prose)
-            model_a_prompt = f"{MODEL_A_SYSTEM_PROMPT}\n\nEvaluate this CV:\n\n{cv_text}"
-            
-            model_a_samples.append({
-                'prompt': model_a_prompt,
-                'chosen': prose_truth,
-                'ground_truth': json_truth,  # For accuracy reward
-                'metadata': {
-                    'quality': persona_data.get('quality_tier', 'good'),
-                    'exp_level': persona_data.get('experience_level', 'mid'),
-                    'domain': persona_data.get('domain', 'data_science')
-                }
+            model_a_columns['prompt'].append(_MODEL_A_PREFIX + cv_text)
+            model_a_columns['chosen'].append(prose_truth)
+            model_a_columns['ground_truth'].append(json_truth)  # For accuracy reward
+            model_a_columns['metadata'].append({
+                'quality': persona_data.get('quality_tier', 'good'),
+                'exp_level': persona_data.get('experience_level', 'mid'),
+                'domain': persona_data.get('domain', 'data_science')
             })
             
             # Model B sample (Prose → JSON)
-            model_b_prompt = f"{MODEL_B_SYSTEM_PROMPT}\n\nCV Evaluation:\n{prose_truth}\n\nJSON:"
-            
-            model_b_samples.append({
-                'prompt': model_b_prompt,
-                'completion': json.dumps(json_truth, indent=2),
-                'metadata': persona_data
-            })
+            model_b_columns['prompt'].append(_MODEL_B_PREFIX + prose_truth + _MODEL_B_SUFFIX)
+            model_b_columns['completion'].append(_dumps_compact(json_truth))
+            model_b_columns['metadata'].append(persona_data)
             
             if (i + 1) % 100 == 0:
-                print(f"  ✅ Processed {i + 1}/{len(cv_files)} CVs...")
+                print(f"  ✅ Processed {i + 1}/{len(cv_texts)} CVs...")
         
         # Create datasets
-        model_a_dataset = Dataset.from_list(model_a_samples)
-        model_b_dataset = Dataset.from_list(model_b_samples)
+        model_a_dataset = Dataset.from_dict(model_a_columns, features=self.model_a_features)
+        model_b_dataset = Dataset.from_dict(model_b_columns)
+        del model_a_columns, model_b_columns
         
-        # Split into train/val
+        # Split into train/val (contiguous selects are zero-copy slices of the Arrow table)
         train_size = int(len(model_a_dataset) * self.config.train_split)
         
         model_a_train = model_a_dataset.select(range(train_size))
@@ -103,23 +192,84 @@ class HybridDatasetProcessor:
         
         return model_a_train, model_a_val, model_b_train, model_b_val
     
+    def pack_dataset(self, cv_dataset_path: str, output_path: Optional[str] = None) -> str:
+        """Pack a directory of cv_*.txt / persona_*.json files into one Parquet shard"""
+        output_path = output_path or cv_dataset_path.rstrip(os.sep) + '.parquet'
+        cv_texts, personas = self._load_directory(cv_dataset_path)
+        write_packed_dataset(cv_texts, personas, output_path)
+        print(f"📦 Packed {len(cv_texts)} CVs into {output_path}")
+        return output_path
+    
+    def _load_packed(self, parquet_path: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Read CV texts and personas from a packed Parquet shard"""
+        cv_texts, personas = [], []
+        for batch in pq.ParquetFile(parquet_path).iter_batches(
+                batch_size=1024, columns=['cv_text', 'persona_json']):
+            cv_texts.extend(batch.column(0).to_pylist())
+            personas.extend(orjson.loads(p) for p in batch.column(1).to_pylist())
+        return cv_texts, personas
+    
+    def _load_directory(self, cv_dataset_path: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Read every CV/persona pair from a dataset directory"""
+        
+        # Load CV files as (file name, cv number) pairs in a single directory pass,
+        # sorted by CV number so the order never depends on the filesystem
+        with os.scandir(cv_dataset_path) as it:
+            cv_files = sorted(((entry.name, m.group(1)) for entry in it
+                               if (m := _CV_RE.match(entry.name)) and entry.is_file()),
+                              key=lambda cv_file: (int(cv_file[1]), cv_file[0]))
+        
+        # Read CV/persona pairs concurrently (I/O bound); map() keeps file order
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            loaded = list(executor.map(
+                lambda cv_file: self._load_cv(cv_dataset_path, *cv_file), cv_files
+            ))
+        
+        # Missing personas are drawn from the seeded rng here, serially in file order,
+        # so the defaults do not depend on which worker thread finished first
+        cv_texts = [cv_text for cv_text, _ in loaded]
+        personas = [persona if persona is not None else self._generate_default_persona()
+                    for _, persona in loaded]
+        return cv_texts, personas
+    
+    def _load_cv(self, cv_dataset_path: str, cv_file: str,
+                 cv_number: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Read one CV and its persona data (None if the persona file is missing)"""
+        cv_path = os.path.join(cv_dataset_path, cv_file)
+        with open(cv_path, 'r', encoding='utf-8') as f:
+            cv_text = f.read()
+        
+        # Load persona data
+        persona_path = os.path.join(cv_dataset_path, f'persona_{cv_number}.json')
+        
+        persona_data = None
+        if os.path.exists(persona_path):
+            with open(persona_path, 'rb') as f:
+                persona_data = orjson.loads(f.read())
+        
+        return cv_text, persona_data
+    
     def _generate_default_persona(self) -> Dict[str, Any]:
         """Generate default persona if not found"""
+        quality, exp_level, domain = self.rng.integers(0, (3, 3, 4)).tolist()
         return {
-            'quality_tier': random.choice(['excellent', 'good', 'average']),
-            'experience_level': random.choice(['entry', 'mid', 'senior']),
-            'domain': random.choice(['data_science', 'software_engineering', 'marketing', 'finance'])
+            'quality_tier': ('excellent', 'good', 'average')[quality],
+            'experience_level': ('entry', 'mid', 'senior')[exp_level],
+            'domain': ('data_science', 'software_engineering', 'marketing', 'finance')[domain]
         }
     
     def create_synthetic_examples(self, num_examples: int = 200) -> List[Dict[str, Any]]:
         """Create synthetic examples for Model B training"""
         synthetic_examples = []
+        criteria = tuple(self.config.evaluation_criteria)
         
-        for _ in range(num_examples):
-            # Generate random scores
-            scores = {k: random.randint(4, 9) 
-                     for k in self.config.evaluation_criteria.keys()}
-            total = sum(scores.values())
+        # Draw all scores and processing times up front
+        score_rows = self.rng.integers(4, 9, (num_examples, len(criteria)), endpoint=True).tolist()
+        processing_times = self.rng.integers(500, 2000, num_examples, endpoint=True).tolist()
+        
+        for row, processing_time in zip(score_rows, processing_times):
+            scores = dict(zip(criteria, row))
+            total = sum(row)
             
             # Create prose
             prose = self._create_prose_from_scores(scores, total)
@@ -131,10 +281,10 @@ class HybridDatasetProcessor:
                 "recommendation": self._get_recommendation(total),
                 "key_strengths": ["Strong technical skills", "Good experience"],
                 "areas_for_improvement": ["Leadership development needed"],
-                "processing_time_ms": random.randint(500, 2000)
+                "processing_time_ms": processing_time
             }
             
-            json_str = json.dumps(json_obj, indent=2)
+            json_str = _dumps_compact(json_obj)
             text = f"Convert to JSON:\n{prose}\n\nJSON:\n{json_str}"
             
             synthetic_examples.append({"text": text})
@@ -146,7 +296,7 @@ class HybridDatasetProcessor:
         prose_parts = []
         
         for criterion, score in scores.items():
-            criterion_text = criterion.replace('_', ' ').title()
+            criterion_text = self._pretty[criterion]
             prose_parts.append(f"{criterion_text}: {score}/10.")
         
         prose_parts.append(f"Total Score: {total}.")
@@ -156,13 +306,4 @@ class HybridDatasetProcessor:
     
     def _get_recommendation(self, total_score: int) -> str:
         """Get recommendation based on total score"""
-        if total_score >= 85:
-            return 'strong_hire'
-        elif total_score >= 70:
-            return 'hire'
-        elif total_score >= 55:
-            return 'lean_hire'
-        elif total_score >= 40:
-            return 'no_hire'
-        else:
-            return 'strong_no_hire'
+        return get_recommendation(total_score)
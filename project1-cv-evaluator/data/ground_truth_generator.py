@@ -1,108 +1,191 @@
 """Ground truth generation for CV evaluations"""
 
-import random
-from typing import Dict, Any, Tuple, List
+from bisect import bisect_right
+from functools import lru_cache
+from heapq import nlargest, nsmallest
+from operator import itemgetter
+from typing import Dict, Any, Tuple, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; the NumPy kernel below is used instead
+    njit = None
 
 from configs.hybrid_config import HybridSystemConfig
 
+# Integer codes for categorical inputs; unknown values map to the last slot
+_QUALITY_CODES = {'excellent': 0, 'good': 1, 'average': 2, 'below_average': 3}
+_EXP_CODES = {'entry': 0, 'mid': 1, 'senior': 2, 'executive': 3}
+_DOMAIN_CODES = {'data_science': 0}
+
+# Base scores by quality (last entry: unknown quality)
+_BASE_SCORES = np.array([8.5, 7.0, 5.5, 3.5, 6.0])
+
+# Experience modifiers (last entry: unknown level)
+_EXP_MODIFIERS = np.array([-0.5, 0.0, 0.5, 1.0, 0.0])
+
+# Recommendation bands: total < 40, < 55, < 70, < 85, >= 85
+_REC_THRESHOLDS = (40, 55, 70, 85)
+_REC_BANDS = ('strong_no_hire', 'no_hire', 'lean_hire', 'hire', 'strong_hire')
+
+# Qualitative assessment indexed by score (0-10)
+_QUALIFIERS = ('Below average',) * 4 + ('Average',) * 2 + ('Good',) * 2 + ('Excellent',) * 3
+
+_THRESHOLDS = np.array(_REC_THRESHOLDS, dtype=np.int64)
+
+
+def _score_kernel_numpy(raw, thresholds, out_scores, out_totals, out_rec):
+    """Round/clip raw scores, sum per row and bucket totals into recommendation bands"""
+    out_scores[:] = np.clip(np.rint(raw), 1, 10)
+    np.add.reduce(out_scores, axis=1, dtype=np.int64, out=out_totals)
+    out_rec[:] = np.searchsorted(thresholds, out_totals, side='right')
+
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _score_kernel(raw, thresholds, out_scores, out_totals, out_rec):
+        """Fused single pass of _score_kernel_numpy"""
+        n, k = raw.shape
+        for i in prange(n):
+            total = 0
+            for j in range(k):
+                score = min(max(np.rint(raw[i, j]), 1.0), 10.0)
+                out_scores[i, j] = score
+                total += int(score)
+            out_totals[i] = total
+            band = 0
+            while band < thresholds.shape[0] and total >= thresholds[band]:
+                band += 1
+            out_rec[i] = band
+else:
+    _score_kernel = _score_kernel_numpy
+
+
+def get_recommendation(total_score: int) -> str:
+    """Get recommendation based on total score"""
+    return _REC_BANDS[bisect_right(_REC_THRESHOLDS, total_score)]
+
 
 class GroundTruthGenerator:
     """Generate ground truth evaluations for training"""
     
-    def __init__(self, config: HybridSystemConfig):
+    def __init__(self, config: HybridSystemConfig, seed: Optional[Any] = None):
         self.config = config
         self.evaluation_criteria = config.evaluation_criteria
-        self.valid_recommendations = config.valid_recommendations
+        
+        # Recommendations come from the fixed band table; it must stay within the config's labels
+        unknown = set(_REC_BANDS).difference(config.valid_recommendations)
+        if unknown:
+            raise ValueError(f"Recommendation bands not in config.valid_recommendations: {sorted(unknown)}")
+        self.rng = np.random.default_rng(config.random_seed if seed is None else seed)
+        self.deterministic = config.deterministic_ground_truth
+        
+        # Display strings per criterion, built once instead of per CV
+        self.criteria = tuple(self.evaluation_criteria)
+        self._pretty = {c: c.replace('_', ' ').title() for c in self.criteria}
+        self._strength_phrases = {c: f"Strong {c.replace('_', ' ')}" for c in self.criteria}
+        self._improvement_phrases = {c: f"Could improve {c.replace('_', ' ')}" for c in self.criteria}
+        
+        # Per-criterion adjustment tables, gathered by domain / experience code
+        self._domain_adjust = np.zeros((len(_DOMAIN_CODES) + 1, len(self.criteria)))
+        self._exp_adjust = np.zeros((len(_EXP_CODES) + 1, len(self.criteria)))
+        
+        if 'technical_skills' in self.criteria:
+            self._domain_adjust[_DOMAIN_CODES['data_science'], self.criteria.index('technical_skills')] = 0.5
+        if 'leadership_potential' in self.criteria:
+            self._exp_adjust[_EXP_CODES['executive'], self.criteria.index('leadership_potential')] = 1.0
+        if 'experience_relevance' in self.criteria:
+            self._exp_adjust[_EXP_CODES['entry'], self.criteria.index('experience_relevance')] = -1.0
+        
+        # Noise-free score vector per (quality, exp_level, domain), computed once per combination
+        self._base_vector = lru_cache(maxsize=64)(self._compute_base_vector)
     
     def generate_ground_truth(self, 
                             quality: str, 
                             exp_level: str, 
                             domain: str) -> Tuple[Dict[str, Any], str]:
         """Generate both JSON and prose ground truth"""
+        return self.generate_ground_truth_batch([quality], [exp_level], [domain])[0]
+    
+    def generate_ground_truth_batch(self,
+                                    qualities: Sequence[str],
+                                    exp_levels: Sequence[str],
+                                    domains: Sequence[str]) -> List[Tuple[Dict[str, Any], str]]:
+        """Generate JSON and prose ground truth for many CVs at once"""
         
-        # Generate scores
-        scores = self._generate_scores(quality, exp_level, domain)
-        
-        # Calculate total
-        total_score = sum(scores.values())
+        # Generate scores, totals and recommendations for the whole batch
+        score_matrix, totals, rec_idx = self._generate_scores_batch(qualities, exp_levels, domains)
+        processing_times = self.rng.integers(800, 2500, size=len(totals), endpoint=True)
         
-        # Get recommendation
-        recommendation = self._get_recommendation(total_score)
+        results = []
+        for row, total_score, rec, proc_ms, quality, exp_level, domain in zip(
+                score_matrix.tolist(), totals.tolist(), rec_idx.tolist(),
+                processing_times.tolist(), qualities, exp_levels, domains):
+            scores = dict(zip(self.criteria, row))
+            recommendation = _REC_BANDS[rec]
+            
+            # Generate strengths and improvements
+            strengths = self._generate_strengths(scores, domain, quality)
+            improvements = self._generate_improvements(scores, exp_level, quality)
+            
+            # Create JSON ground truth
+            json_truth = {
+                **scores,
+                'total_score': total_score,
+                'recommendation': recommendation,
+                'key_strengths': strengths,
+                'areas_for_improvement': improvements,
+                'processing_time_ms': proc_ms
+            }
+            
+            # Generate prose ground truth
+            prose_truth = self._generate_prose_evaluation(
+                scores, total_score, recommendation, strengths, improvements
+            )
+            
+            results.append((json_truth, prose_truth))
         
-        # Generate strengths and improvements
-        strengths = self._generate_strengths(scores, domain, quality)
-        improvements = self._generate_improvements(scores, exp_level, quality)
+        return results
+    
+    def _generate_scores_batch(self,
+                               qualities: Sequence[str],
+                               exp_levels: Sequence[str],
+                               domains: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Generate an (N, K) score matrix with per-row totals and recommendation indices"""
+        n = len(qualities)
+        keys = list(zip(qualities, exp_levels, domains))
         
-        # Create JSON ground truth
-        json_truth = {
-            **scores,
-            'total_score': total_score,
-            'recommendation': recommendation,
-            'key_strengths': strengths,
-            'areas_for_improvement': improvements,
-            'processing_time_ms': random.randint(800, 2500)
-        }
+        # Gather the cached base vector of each distinct combination
+        combos = {key: i for i, key in enumerate(dict.fromkeys(keys))}
+        table = np.stack([self._base_vector(*key) for key in combos])
+        raw = table[np.fromiter((combos[key] for key in keys), dtype=np.intp, count=n)]
         
-        # Generate prose ground truth
-        prose_truth = self._generate_prose_evaluation(
-            scores, total_score, recommendation, strengths, improvements
-        )
+        # Per-CV noise on top of the deterministic part
+        if not self.deterministic:
+            raw = raw + self.rng.uniform(-1.0, 1.0, raw.shape)
         
-        return json_truth, prose_truth
+        # Ensure valid range, then total and band every row
+        scores = np.empty(raw.shape, dtype=np.int8)
+        totals = np.empty(n, dtype=np.int64)
+        rec_idx = np.empty(n, dtype=np.intp)
+        _score_kernel(raw, _THRESHOLDS, scores, totals, rec_idx)
+        return scores, totals, rec_idx
     
-    def _generate_scores(self, quality: str, exp_level: str, domain: str) -> Dict[str, int]:
-        """Generate evaluation scores based on parameters"""
-        
-        # Base scores by quality
-        base_scores = {
-            'excellent': 8.5,
-            'good': 7.0,
-            'average': 5.5,
-            'below_average': 3.5
-        }
-        
-        # Experience modifiers
-        exp_modifiers = {
-            'entry': -0.5,
-            'mid': 0,
-            'senior': 0.5,
-            'executive': 1.0
-        }
-        
-        base_score = base_scores.get(quality, 6.0)
-        exp_modifier = exp_modifiers.get(exp_level.lower(), 0)
-        
-        scores = {}
-        
-        for criterion in self.evaluation_criteria.keys():
-            # Base calculation
-            score = base_score + exp_modifier + random.uniform(-1.0, 1.0)
-            
-            # Domain-specific adjustments
-            if criterion == 'technical_skills' and domain == 'data_science':
-                score += 0.5
-            elif criterion == 'leadership_potential' and exp_level.lower() == 'executive':
-                score += 1.0
-            elif criterion == 'experience_relevance' and exp_level.lower() == 'entry':
-                score -= 1.0
-            
-            # Ensure valid range
-            scores[criterion] = max(1, min(10, round(score)))
+    def _compute_base_vector(self, quality: str, exp_level: str, domain: str) -> np.ndarray:
+        """Base + experience modifier + per-criterion adjustments (no noise)"""
+        q = _QUALITY_CODES.get(quality, len(_QUALITY_CODES))
+        e = _EXP_CODES.get(exp_level.lower(), len(_EXP_CODES))
+        d = _DOMAIN_CODES.get(domain, len(_DOMAIN_CODES))
         
-        return scores
+        vector = _BASE_SCORES[q] + _EXP_MODIFIERS[e] + self._domain_adjust[d] + self._exp_adjust[e]
+        vector.flags.writeable = False
+        return vector
     
     def _get_recommendation(self, total_score: int) -> str:
         """Get recommendation based on total score"""
-        if total_score >= 85:
-            return 'strong_hire'
-        elif total_score >= 70:
-            return 'hire'
-        elif total_score >= 55:
-            return 'lean_hire'
-        elif total_score >= 40:
-            return 'no_hire'
-        else:
-            return 'strong_no_hire'
+        return get_recommendation(total_score)
     
     def _generate_strengths(self, 
                           scores: Dict[str, int], 
@@ -111,15 +194,9 @@ class GroundTruthGenerator:
         """Generate key strengths based on scores"""
         
         # Find top scoring criteria
-        high_scores = [(k, v) for k, v in scores.items() if v >= 8]
-        high_scores.sort(key=lambda x: x[1], reverse=True)
+        high_scores = nlargest(2, ((k, v) for k, v in scores.items() if v >= 8), key=itemgetter(1))
         
-        strengths = []
-        
-        if high_scores:
-            for criterion, _ in high_scores[:2]:
-                strength = f"Strong {criterion.replace('_', ' ')}"
-                strengths.append(strength)
+        strengths = [self._strength_phrases[criterion] for criterion, _ in high_scores]
         
         # Add domain-specific strength
         if quality in ['excellent', 'good']:
@@ -138,15 +215,9 @@ class GroundTruthGenerator:
         """Generate areas for improvement based on scores"""
         
         # Find lower scoring criteria
-        low_scores = [(k, v) for k, v in scores.items() if v <= 5]
-        low_scores.sort(key=lambda x: x[1])
-        
-        improvements = []
+        low_scores = nsmallest(2, ((k, v) for k, v in scores.items() if v <= 5), key=itemgetter(1))
         
-        if low_scores:
-            for criterion, _ in low_scores[:2]:
-                improvement = f"Could improve {criterion.replace('_', ' ')}"
-                improvements.append(improvement)
+        improvements = [self._improvement_phrases[criterion] for criterion, _ in low_scores]
         
         # Experience-based improvements
         if exp_level.lower() == 'entry':
@@ -168,38 +239,19 @@ class GroundTruthGenerator:
                                  improvements: List[str]) -> str:
         """Generate natural language evaluation"""
         
-        prose_parts = []
-        
-        # Individual criteria evaluations
-        for criterion, score in scores.items():
-            criterion_text = criterion.replace('_', ' ').title()
-            
-            # Add qualitative assessment
-            if score >= 8:
-                qualifier = "Excellent"
-            elif score >= 6:
-                qualifier = "Good"
-            elif score >= 4:
-                qualifier = "Average"
-            else:
-                qualifier = "Below average"
-            
-            prose_parts.append(
-                f"{criterion_text}: {score}/10. {qualifier} performance in this area."
-            )
-        
-        # Total and recommendation
-        prose_parts.append(f"\nTotal Score: {total_score}")
-        prose_parts.append(f"Recommendation: {recommendation}")
-        
-        # Strengths
-        prose_parts.append("\nKey Strengths:")
-        for strength in strengths:
-            prose_parts.append(f"- {strength}")
-        
-        # Improvements
-        prose_parts.append("\nAreas for Improvement:")
-        for improvement in improvements:
-            prose_parts.append(f"- {improvement}")
+        pretty = self._pretty
         
-        return "\n".join(prose_parts)
+        return "\n".join([
+            # Individual criteria evaluations with qualitative assessment
+            *(f"{pretty[criterion]}: {score}/10. {_QUALIFIERS[score]} performance in this area."
+              for criterion, score in scores.items()),
+            # Total and recommendation
+            f"\nTotal Score: {total_score}",
+            f"Recommendation: {recommendation}",
+            # Strengths
+            "\nKey Strengths:",
+            *(f"- {strength}" for strength in strengths),
+            # Improvements
+            "\nAreas for Improvement:",
+            *(f"- {improvement}" for improvement in improvements)
+        ])
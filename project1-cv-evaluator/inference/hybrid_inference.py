@@ -1,7 +1,8 @@
 """Hybrid inference pipeline implementation"""
 
-import json
+import orjson
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
@@ -19,6 +20,12 @@ class HybridInference:
         self.system = HybridCVEvaluationSystem(self.config)
         self.system_loaded = False
         
+    def load_tokenizers(self,
+                        model_a_path: str = "outputs/model_a_prose_evaluator",
+                        model_b_path: str = "outputs/model_b_json_converter"):
+        """Load tokenizers only (no GPU work), e.g. before forking server workers"""
+        self.system.load_tokenizers(model_a_path, model_b_path)
+    
     def load_models(self, 
                    model_a_path: str = "outputs/model_a_prose_evaluator",
                    model_b_path: str = "outputs/model_b_json_converter"):
@@ -40,6 +47,13 @@ class HybridInference:
         
         return self.system.batch_evaluate(cv_texts)
     
+    def batch_evaluate_soa(self, cv_texts: List[str]):
+        """Evaluate multiple CVs, also returning score/total/recommendation columns"""
+        if not self.system_loaded:
+            raise RuntimeError("Models not loaded. Call load_models() first.")
+        
+        return self.system.batch_evaluate_soa(cv_texts)
+    
     def evaluate_with_validation(self, cv_text: str) -> Dict[str, Any]:
         """Evaluate CV with output validation"""
         result = self.evaluate_cv(cv_text)
@@ -59,11 +73,23 @@ class HybridInference:
                 'model_b': self.config.model_b_name,
                 'a100_optimizations': self.config.use_a100_optimizations
             },
+            'model_b_activation_rate': self.system.model_b_activation_rate(),
+            'response_cache': {
+                'hits': self.system.pipeline_stats['cache_hits'],
+                'misses': self.system.pipeline_stats['cache_misses'],
+                'hit_rate': self.system.cache_hit_rate()
+            },
             'evaluation_criteria': list(self.config.evaluation_criteria.keys()),
-            'valid_recommendations': self.config.valid_recommendations
+            'valid_recommendations': list(self.config.valid_recommendations)
         }
 
 
+def _read_text(path: str) -> str:
+    """Read a UTF-8 text file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
 def main():
     """CLI interface for hybrid inference"""
     import argparse
@@ -97,11 +123,12 @@ def main():
         
     elif args.batch_dir:
         import os
-        cv_files = [f for f in os.listdir(args.batch_dir) if f.endswith('.txt')]
-        cv_texts = []
-        for cv_file in cv_files:
-            with open(os.path.join(args.batch_dir, cv_file), 'r') as f:
-                cv_texts.append(f.read())
+        with os.scandir(args.batch_dir) as it:
+            cv_paths = [entry.path for entry in it if entry.name.endswith('.txt') and entry.is_file()]
+        
+        # Read files concurrently (I/O bound); map() keeps file order
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            cv_texts = list(executor.map(_read_text, cv_paths))
         results = inference.batch_evaluate(cv_texts)
         
     else:
@@ -110,12 +137,12 @@ def main():
     
     # Output results
     if args.output:
-        with open(args.output, 'w') as f:
-            json.dump(results if len(results) > 1 else results[0], f, indent=2)
+        with open(args.output, 'wb') as f:
+            f.write(orjson.dumps(results if len(results) > 1 else results[0], option=orjson.OPT_INDENT_2))
         print(f"Results saved to {args.output}")
     else:
         for result in results:
-            print(json.dumps(result, indent=2))
+            print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
 
 
 if __name__ == "__main__":
@@ -2,14 +2,21 @@
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import uvicorn
 from datetime import datetime
+import asyncio
+import fcntl
+import gc
 import logging
+import os
+import tempfile
 
 from inference.hybrid_inference import HybridInference
 from configs.hybrid_config import HybridSystemConfig
+from utils.validation import validate_evaluation_output, validate_evaluation_batch
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,6 +41,22 @@ app.add_middleware(
 # Global inference instance
 inference_system = None
 
+# With `gunicorn --preload` this module is imported once in the master, so CPU-side state
+# (tokenizers, vocab tables, bytecode) built here is shared copy-on-write by all workers.
+# Weights are still loaded per worker at startup: CUDA contexts cannot cross a fork.
+if os.environ.get("CV_API_PRELOAD") == "1":
+    inference_system = HybridInference(HybridSystemConfig())
+    inference_system.load_tokenizers()
+    # Keep the cyclic GC from touching (and so un-sharing) the preloaded objects
+    gc.freeze()
+
+# Micro-batching: concurrent /evaluate requests are queued and share one batched forward pass
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "8"))
+MAX_LATENCY_MS = float(os.environ.get("MAX_LATENCY_MS", "10"))
+
+request_queue: Optional[asyncio.Queue] = None
+batch_worker_task: Optional[asyncio.Task] = None
+
 
 class CVRequest(BaseModel):
     """Request model for CV evaluation"""
@@ -69,6 +92,37 @@ class EvaluationResponse(BaseModel):
     validation: Optional[Dict[str, Any]] = None
 
 
+# The pipeline already produces these fields with the right types, so responses are
+# projected onto the schema and serialized with orjson instead of building models
+_RESPONSE_FIELDS = tuple(EvaluationResponse.model_fields)
+
+
+def _response_body(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a result dict onto the EvaluationResponse fields"""
+    return {field: result.get(field) for field in _RESPONSE_FIELDS}
+
+
+# Held open for the life of the worker; the OS drops the lock when the process exits
+_worker_slot_lock = None
+
+
+def _claim_worker_index(max_slots: int = 1024) -> int:
+    """Lowest free worker index among this server's workers (flock on per-slot files)"""
+    global _worker_slot_lock
+    # Workers of one server share a parent, so slots are namespaced by the parent pid
+    prefix = os.path.join(tempfile.gettempdir(), f"cv-api-{os.getppid()}-worker-")
+    for index in range(max_slots):
+        fd = os.open(f"{prefix}{index}.lock", os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            continue
+        _worker_slot_lock = fd
+        return index
+    raise RuntimeError(f"No free worker slot among {max_slots}")
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize the inference system on startup"""
@@ -76,14 +130,71 @@ async def startup_event():
     
     logger.info("Initializing CV evaluation system...")
     
+    # Spread worker processes over the GPUs before CUDA is initialized in this process
+    num_gpus = int(os.environ.get("CV_API_NUM_GPUS", "0"))
+    if num_gpus > 1 and "CUDA_VISIBLE_DEVICES" not in os.environ:
+        worker_index = _claim_worker_index()
+        os.environ["CUDA_VISIBLE_DEVICES"] = str(worker_index % num_gpus)
+        logger.info(f"Worker {worker_index} (pid {os.getpid()}) pinned to GPU {os.environ['CUDA_VISIBLE_DEVICES']}")
+    
     try:
-        config = HybridSystemConfig()
-        inference_system = HybridInference(config)
+        if inference_system is None:
+            inference_system = HybridInference(HybridSystemConfig())
         inference_system.load_models()
         logger.info("CV evaluation system initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize system: {e}")
         raise
+    
+    global request_queue, batch_worker_task
+    request_queue = asyncio.Queue()
+    batch_worker_task = asyncio.create_task(_batch_worker())
+    logger.info(f"Micro-batching enabled (max_batch_size={MAX_BATCH_SIZE}, max_latency_ms={MAX_LATENCY_MS})")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the micro-batching worker"""
+    if batch_worker_task:
+        batch_worker_task.cancel()
+
+
+async def _batch_worker():
+    """Collect queued CVs into batches and resolve each request's future"""
+    loop = asyncio.get_running_loop()
+    
+    while True:
+        # Block for the first request, then gather more until the batch is full or the deadline passes
+        items = [await request_queue.get()]
+        deadline = loop.time() + MAX_LATENCY_MS / 1000
+        while len(items) < MAX_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(request_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        cv_texts = [cv_text for cv_text, _ in items]
+        try:
+            results = await asyncio.to_thread(inference_system.batch_evaluate, cv_texts)
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+        
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+
+async def _submit_for_evaluation(cv_text: str) -> Dict[str, Any]:
+    """Queue a CV for the next micro-batch and wait for its result"""
+    future = asyncio.get_running_loop().create_future()
+    await request_queue.put((cv_text, future))
+    return await future
 
 
 @app.get("/")
@@ -113,12 +224,12 @@ async def health_check():
 async def evaluate_cv(request: CVRequest):
     """Evaluate a single CV"""
     try:
+        result = await _submit_for_evaluation(request.cv_text)
+        
         if request.include_validation:
-            result = inference_system.evaluate_with_validation(request.cv_text)
-        else:
-            result = inference_system.evaluate_cv(request.cv_text)
+            result['validation'] = validate_evaluation_output(result, inference_system.config)
         
-        return EvaluationResponse(**result)
+        return ORJSONResponse(_response_body(result))
         
     except Exception as e:
         logger.error(f"Evaluation error: {e}")
@@ -129,14 +240,20 @@ async def evaluate_cv(request: CVRequest):
 async def evaluate_batch(request: BatchCVRequest):
     """Evaluate multiple CVs"""
     try:
-        results = inference_system.batch_evaluate(request.cv_texts)
+        # Blocking GPU work runs off the event loop so other requests keep being accepted
+        scores, totals, recs, results = await asyncio.to_thread(
+            inference_system.batch_evaluate_soa, request.cv_texts
+        )
         
         if request.include_validation:
-            for result in results:
-                validation = validate_evaluation_output(result, inference_system.config)
+            # Vectorized over the score columns; dicts are only built per response item
+            validations = validate_evaluation_batch(
+                results, inference_system.config, columns=(scores, totals, recs)
+            )
+            for result, validation in zip(results, validations):
                 result['validation'] = validation
         
-        return [EvaluationResponse(**result) for result in results]
+        return ORJSONResponse([_response_body(result) for result in results])
         
     except Exception as e:
         logger.error(f"Batch evaluation error: {e}")
@@ -148,8 +265,8 @@ async def get_evaluation_criteria():
     """Get evaluation criteria information"""
     if inference_system:
         return {
-            "criteria": inference_system.config.evaluation_criteria,
-            "valid_recommendations": inference_system.config.valid_recommendations
+            "criteria": dict(inference_system.config.evaluation_criteria),
+            "valid_recommendations": list(inference_system.config.valid_recommendations)
         }
     else:
         raise HTTPException(status_code=503, detail="System not ready")
@@ -182,14 +299,25 @@ def main():
     parser.add_argument('--host', type=str, default='0.0.0.0', help='Host to bind to')
     parser.add_argument('--port', type=int, default=8000, help='Port to bind to')
     parser.add_argument('--reload', action='store_true', help='Enable auto-reload')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', '1')),
+                        help='Number of worker processes (default: $WEB_CONCURRENCY or 1)')
     
     args = parser.parse_args()
     
+    if args.reload and args.workers > 1:
+        parser.error("--reload and --workers > 1 are mutually exclusive")
+    
+    if args.workers > 1 and "CUDA_VISIBLE_DEVICES" not in os.environ:
+        # Let each worker pick one GPU (see startup_event)
+        import torch
+        os.environ.setdefault("CV_API_NUM_GPUS", str(torch.cuda.device_count()))
+    
     uvicorn.run(
         "inference.production_api:app",
         host=args.host,
         port=args.port,
-        reload=args.reload
+        reload=args.reload,
+        workers=args.workers
     )
 
 
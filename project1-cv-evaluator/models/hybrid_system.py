@@ -1,15 +1,85 @@
 """Hybrid CV Evaluation System combining Model A and Model B"""
 
-import json
+import copy
+import hashlib
 import re
+import threading
+import numpy as np
+import orjson
+import time
 import torch
-from datetime import datetime
+from bisect import bisect_right
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional, Tuple
-from transformers import AutoTokenizer, AutoModelForCausalLM, GPT2LMHeadModel, GPT2Tokenizer
+from transformers import (
+    AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig, GPT2LMHeadModel, GPT2Tokenizer, StoppingCriteriaList
+)
 
 from configs.hybrid_config import HybridSystemConfig, MODEL_A_SYSTEM_PROMPT, MODEL_B_SYSTEM_PROMPT
 from utils.extraction import extract_json_from_prose_improved
-from utils.validation import validate_evaluation_output
+from utils.generation import JSONBalancedStop
+from utils.validation import validate_evaluation_output, evaluation_columns
+
+# Outermost {...} span in a prose evaluation that already contains JSON
+_EMBEDDED_JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# Characters that matter when scanning for a balanced JSON object
+_JSON_SCAN_RE = re.compile(r'[{}"\\]')
+
+# Model B few-shot prompt around the cleaned prose; tokenized once in load_models
+_MODEL_B_PREFIX = """Convert CV evaluations to JSON format.
+
+Example:
+Evaluation: Technical Skills: 8/10. Experience Relevance: 7/10. Total Score: 75. Recommendation: hire
+JSON: {"technical_skills": 8, "experience_relevance": 7, "total_score": 75, "recommendation": "hire"}
+
+Now convert:
+Evaluation:"""
+_MODEL_B_SUFFIX = "\nJSON:"
+
+# Characters stripped from prose before it goes into the Model B prompt (one translate pass)
+_PROSE_STRIP_TABLE = str.maketrans('', '', '{}"')
+
+_MODEL_A_PREFIX = f"{MODEL_A_SYSTEM_PROMPT}\n\nEvaluate this CV:\n\n"
+
+# Fallback recommendation bands: total < 50, < 70, < 85, >= 85
+_FALLBACK_THRESHOLDS = (50, 70, 85)
+_FALLBACK_RECS = ('no_hire', 'lean_hire', 'hire', 'strong_hire')
+
+
+def _cv_key(cv_text: str) -> bytes:
+    """Response cache key for a CV text"""
+    return hashlib.blake2b(cv_text.encode('utf-8'), digest_size=16).digest()
+
+
+def _first_json_object(text: str) -> Optional[str]:
+    """First balanced {...} span in text, in one pass (braces inside JSON strings are ignored)"""
+    start = text.find('{')
+    if start < 0:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped_pos = -1
+    for match in _JSON_SCAN_RE.finditer(text, start):
+        pos = match.start()
+        if pos == escaped_pos:
+            continue
+        char = match.group()
+        if in_string:
+            if char == '\\':
+                escaped_pos = pos + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:pos + 1]
+    return None
 
 
 class HybridCVEvaluationSystem:
@@ -17,208 +87,410 @@ class HybridCVEvaluationSystem:
     
     def __init__(self, config: HybridSystemConfig):
         self.config = config
+        self._criteria = tuple(config.evaluation_criteria)
+        self._criteria_set = frozenset(self._criteria)
         self.model_a = None
         self.tokenizer_a = None
         self.model_b = None
         self.tokenizer_b = None
+        self._prefix_ids_b: List[int] = []
+        self._suffix_ids_b: List[int] = []
+        self._prefix_ids_a: List[int] = []
+        self._prefix_kv_a = None
+        self.engine_a = None
         self.system_ready = False
+        self.pipeline_stats = {'evaluated': 0, 'model_b_calls': 0, 'cache_hits': 0, 'cache_misses': 0}
+        self._response_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # batch_evaluate runs concurrently on API executor threads; counters are read-modify-write
+        self._stats_lock = threading.Lock()
+        self._use_cuda = torch.cuda.is_available()
         
+    def load_tokenizers(self, model_a_path: Optional[str] = None, model_b_path: Optional[str] = None):
+        """Load both tokenizers and the constant prompt token ids (CPU only, safe before fork)"""
+        self.tokenizer_a = AutoTokenizer.from_pretrained(
+            model_a_path or self.config.model_a_name, 
+            cache_dir=self.config.cache_dir
+        )
+        if self.tokenizer_a.pad_token is None:
+            self.tokenizer_a.pad_token = self.tokenizer_a.eos_token
+        # Decoder-only batches must be left padded so generation continues each prompt
+        self.tokenizer_a.padding_side = "left"
+        
+        self.tokenizer_b = GPT2Tokenizer.from_pretrained(
+            model_b_path or self.config.model_b_name,
+            cache_dir=self.config.cache_dir
+        )
+        self.tokenizer_b.pad_token = self.tokenizer_b.eos_token
+        self.tokenizer_b.padding_side = "left"
+        self._prefix_ids_b = self.tokenizer_b(_MODEL_B_PREFIX)["input_ids"]
+        self._suffix_ids_b = self.tokenizer_b(_MODEL_B_SUFFIX, add_special_tokens=False)["input_ids"]
+    
     def load_models(self, model_a_path: Optional[str] = None, model_b_path: Optional[str] = None):
         """Load both models for the hybrid system"""
+        if self.config.use_a100_optimizations and self._use_cuda:
+            # TF32 matmuls and fused (flash / memory-efficient) attention kernels
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+            torch.backends.cuda.enable_flash_sdp(True)
+            torch.backends.cuda.enable_mem_efficient_sdp(True)
+        
         try:
-            # Load Model A (Prose Evaluator)
             model_a_path = model_a_path or self.config.model_a_name
-            self.tokenizer_a = AutoTokenizer.from_pretrained(
-                model_a_path, 
-                cache_dir=self.config.cache_dir
-            )
-            self.model_a = AutoModelForCausalLM.from_pretrained(
-                model_a_path,
-                device_map="auto",
-                torch_dtype=torch.float16,
-                cache_dir=self.config.cache_dir,
-                trust_remote_code=True
-            )
+            model_b_path = model_b_path or self.config.model_b_name
+            # Tokenizers may already be loaded (e.g. in a preloading server master)
+            if self.tokenizer_a is None or self.tokenizer_b is None:
+                self.load_tokenizers(model_a_path, model_b_path)
             
-            if self.tokenizer_a.pad_token is None:
-                self.tokenizer_a.pad_token = self.tokenizer_a.eos_token
+            # Load Model A (Prose Evaluator)
+            if self.config.model_a_engine == "vllm":
+                # vLLM schedules and batches requests itself (PagedAttention KV cache)
+                from vllm import LLM
+                self.engine_a = LLM(
+                    model=model_a_path,
+                    dtype="float16",
+                    max_model_len=self.config.model_a_max_seq_length,
+                    download_dir=self.config.cache_dir,
+                    trust_remote_code=True,
+                    enable_prefix_caching=self.config.reuse_prompt_prefix_cache
+                )
+            else:
+                self.model_a = AutoModelForCausalLM.from_pretrained(
+                    model_a_path,
+                    device_map="auto",
+                    cache_dir=self.config.cache_dir,
+                    trust_remote_code=True,
+                    **self._weight_kwargs(BitsAndBytesConfig(
+                        load_in_4bit=True,
+                        bnb_4bit_compute_dtype=torch.float16,
+                        bnb_4bit_quant_type="nf4"
+                    ))
+                )
             
             # Load Model B (JSON Converter)
-            model_b_path = model_b_path or self.config.model_b_name
-            self.tokenizer_b = GPT2Tokenizer.from_pretrained(
-                model_b_path,
-                cache_dir=self.config.cache_dir
-            )
             self.model_b = GPT2LMHeadModel.from_pretrained(
                 model_b_path,
                 device_map="auto",
-                torch_dtype=torch.float16,
-                cache_dir=self.config.cache_dir
+                cache_dir=self.config.cache_dir,
+                **self._weight_kwargs(BitsAndBytesConfig(load_in_8bit=True))
             )
             
-            self.tokenizer_b.pad_token = self.tokenizer_b.eos_token
+            for model in filter(None, (self.model_a, self.model_b)):
+                model.eval()
             
             self.system_ready = True
+            
+            if self.config.compile_inference:
+                self._compile_models()
+            elif self.config.reuse_prompt_prefix_cache and self.model_a is not None:
+                self._build_prefix_cache()
+            
             print("✅ Hybrid system loaded successfully")
             
         except Exception as e:
             print(f"❌ Failed to load models: {e}")
             raise
     
+    def _build_prefix_cache(self):
+        """Run the constant Model A prompt prefix once and keep its KV cache"""
+        self._prefix_ids_a = self.tokenizer_a(_MODEL_A_PREFIX)["input_ids"]
+        prefix = self._to_device({"input_ids": torch.tensor([self._prefix_ids_a])})
+        with torch.inference_mode():
+            self._prefix_kv_a = self.model_a(**prefix, use_cache=True).past_key_values
+    
+    def _prefixed_inputs(self, prompts: List[str]) -> Optional[Tuple[Dict[str, torch.Tensor], Any]]:
+        """Inputs of the form [prefix | padding | CV] plus a copy of the prefix cache per row"""
+        # Tokenize whole prompts and slice the prefix off, so CV tokens match the uncached
+        # path exactly (tokenizing a CV alone would add SentencePiece's leading "▁")
+        prefix_len = len(self._prefix_ids_a)
+        budget = max(0, self.config.model_a_max_seq_length - prefix_len)
+        rows = self.tokenizer_a(prompts)["input_ids"]
+        if any(ids[:prefix_len] != self._prefix_ids_a for ids in rows):
+            return None  # Prefix merged with the CV's first token; the cache doesn't apply
+        bodies = [ids[prefix_len:prefix_len + budget] for ids in rows]
+        
+        # Padding sits between the shared prefix and each CV so that every row's prefix
+        # occupies the cached positions and every prompt still ends at the same column;
+        # positions derived from the attention mask stay contiguous across the gap.
+        width = max(len(body) for body in bodies)
+        pad_id = self.tokenizer_a.pad_token_id
+        inputs = self._to_device({
+            "input_ids": torch.tensor(
+                [self._prefix_ids_a + [pad_id] * (width - len(body)) + body for body in bodies]),
+            "attention_mask": torch.tensor(
+                [[1] * prefix_len + [0] * (width - len(body)) + [1] * len(body) for body in bodies]),
+        })
+        
+        # generate() extends the cache in place, so every call gets its own copy, one row per CV
+        cache = copy.deepcopy(self._prefix_kv_a)
+        if len(bodies) > 1:
+            cache.batch_repeat_interleave(len(bodies))
+        return inputs, cache
+    
+    def _compile_models(self):
+        """Compile both forward passes with a static KV cache and trigger compilation up front"""
+        for model in filter(None, (self.model_a, self.model_b)):
+            # Fixed-size cache keeps decode-step shapes stable so CUDA graphs can be captured
+            model.generation_config.cache_implementation = "static"
+            model.forward = torch.compile(model.forward, mode="reduce-overhead", fullgraph=False)
+        
+        print("⏳ Warming up compiled models...")
+        self._generate_prose_batch(["Warm-up CV"])
+        self._convert_to_json_batch(["Technical Skills: 5/10. Total Score: 50. Recommendation: lean_hire"])
+    
+    def _to_device(self, inputs: Dict[str, torch.Tensor]) -> Dict[str, torch.Tensor]:
+        """Move tokenized inputs to the GPU via pinned memory so the copy is asynchronous"""
+        if not self._use_cuda:
+            return inputs
+        return {k: v.pin_memory().to("cuda", non_blocking=True) for k, v in inputs.items()}
+    
+    def _weight_kwargs(self, quantization_config: BitsAndBytesConfig) -> Dict[str, Any]:
+        """from_pretrained kwargs: quantized weights when enabled, plain fp16 otherwise"""
+        if self.config.quantize_inference:
+            return {"quantization_config": quantization_config}
+        return {"torch_dtype": torch.float16}
+    
     def evaluate_cv(self, cv_text: str) -> Dict[str, Any]:
         """Evaluate a CV using the hybrid two-stage approach"""
+        return self._evaluate_batch([cv_text])[0]
+    
+    def _evaluate_batch(self, cv_texts: List[str]) -> List[Dict[str, Any]]:
+        """Evaluate a batch, answering repeated CVs from the response cache"""
+        if not self.system_ready or self.config.response_cache_size <= 0:
+            return self._run_pipeline(cv_texts)
+        
+        keys = [_cv_key(cv_text) for cv_text in cv_texts]
+        with self._cache_lock:
+            cached = {}
+            for key in keys:
+                if key in self._response_cache:
+                    self._response_cache.move_to_end(key)
+                    cached[key] = self._response_cache[key]
+        
+        # Run the pipeline once per distinct uncached CV
+        texts = dict(zip(keys, cv_texts))
+        misses = [key for key in dict.fromkeys(keys) if key not in cached]
+        fresh = dict(zip(misses, self._run_pipeline([texts[key] for key in misses]))) if misses else {}
+        
+        hits = sum(key in cached for key in keys)
+        with self._stats_lock:
+            self.pipeline_stats['cache_hits'] += hits
+            self.pipeline_stats['cache_misses'] += len(keys) - hits
+        
+        with self._cache_lock:
+            for key, result in fresh.items():
+                if 'error' not in result:
+                    self._response_cache[key] = result
+            while len(self._response_cache) > self.config.response_cache_size:
+                self._response_cache.popitem(last=False)
+        
+        # Callers annotate results (e.g. validation), so never hand out the cached objects
+        return [copy.deepcopy(cached[key] if key in cached else fresh[key]) for key in keys]
+    
+    def _run_pipeline(self, cv_texts: List[str]) -> List[Dict[str, Any]]:
+        """Run the two-stage pipeline with one generate() call per model for the whole batch"""
         if not self.system_ready:
-            return {"error": "System not properly initialized"}
+            return [{"error": "System not properly initialized"} for _ in cv_texts]
         
-        start_time = datetime.now()
+        start_ns = time.perf_counter_ns()
         
         try:
-            # Stage 1: Generate prose evaluation with Model A
-            prose_evaluation = self._generate_prose_evaluation(cv_text)
+            # Stage 1: Generate prose evaluations with Model A
+            prose_evaluations = self._generate_prose_batch(cv_texts)
             
             # Try direct extraction first
-            extracted_json = extract_json_from_prose_improved(
-                prose_evaluation, 
-                self.config.evaluation_criteria
-            )
+            extracted = [
+                extract_json_from_prose_improved(prose, self.config.evaluation_criteria)
+                for prose in prose_evaluations
+            ]
             
-            # Check if extraction is sufficient
-            if self._is_extraction_complete(extracted_json):
-                extracted_json['processing_time_ms'] = int(
-                    (datetime.now() - start_time).total_seconds() * 1000
-                )
-                extracted_json['pipeline_method'] = 'direct_extraction'
-                return extracted_json
+            # Prose that already embeds a complete JSON object needs no Model B pass
+            embedded = {}
+            for i, extracted_json in enumerate(extracted):
+                if not self._is_extraction_complete(extracted_json):
+                    embedded_json = self._parse_embedded_json(prose_evaluations[i])
+                    if embedded_json is not None:
+                        embedded[i] = embedded_json
+            
+            # Stage 2: Use Model B (batched) only for CVs where both fast paths failed
+            # (sorted by prose length so Model B pads as little as possible)
+            pending = sorted((i for i, extracted_json in enumerate(extracted)
+                              if i not in embedded and not self._is_extraction_complete(extracted_json)),
+                             key=lambda i: len(prose_evaluations[i]))
+            with self._stats_lock:
+                self.pipeline_stats['evaluated'] += len(cv_texts)
+                self.pipeline_stats['model_b_calls'] += len(pending)
+            json_outputs = dict(zip(
+                pending,
+                self._convert_to_json_batch([prose_evaluations[i] for i in pending]) if pending else []
+            ))
+        except Exception as e:
+            elapsed_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+            return [{'error': f'Pipeline failed: {str(e)}', 'processing_time_ms': elapsed_ms}
+                    for _ in cv_texts]
+        
+        results = []
+        for i, (extracted_json, prose_evaluation) in enumerate(zip(extracted, prose_evaluations)):
+            if i in embedded:
+                embedded[i]['processing_time_ms'] = (time.perf_counter_ns() - start_ns) // 1_000_000
+                embedded[i]['pipeline_method'] = 'embedded_json'
+                results.append(embedded[i])
+                continue
             
-            # Stage 2: Use Model B for JSON conversion if needed
-            json_output = self._convert_to_json(prose_evaluation)
+            if i not in json_outputs:
+                extracted_json['processing_time_ms'] = (time.perf_counter_ns() - start_ns) // 1_000_000
+                extracted_json['pipeline_method'] = 'direct_extraction'
+                results.append(extracted_json)
+                continue
             
+            json_output = json_outputs[i]
             if json_output and 'error' not in json_output:
-                json_output['processing_time_ms'] = int(
-                    (datetime.now() - start_time).total_seconds() * 1000
-                )
+                json_output['processing_time_ms'] = (time.perf_counter_ns() - start_ns) // 1_000_000
                 json_output['pipeline_method'] = 'model_b_generation'
-                return json_output
+                results.append(json_output)
+                continue
             
             # Fallback: Return partial extraction with defaults
-            return self._create_fallback_response(extracted_json, prose_evaluation, start_time)
-            
-        except Exception as e:
-            return {
-                'error': f'Pipeline failed: {str(e)}',
-                'processing_time_ms': int((datetime.now() - start_time).total_seconds() * 1000)
-            }
+            results.append(self._create_fallback_response(extracted_json, prose_evaluation, start_ns))
+        
+        return results
     
     def _generate_prose_evaluation(self, cv_text: str) -> str:
         """Generate prose evaluation using Model A"""
-        prompt = f"{MODEL_A_SYSTEM_PROMPT}\n\nEvaluate this CV:\n\n{cv_text}"
+        return self._generate_prose_batch([cv_text])[0]
+    
+    def _generate_prose_batch(self, cv_texts: List[str]) -> List[str]:
+        """Generate prose evaluations for a batch of CVs using Model A"""
+        prompts = [_MODEL_A_PREFIX + cv_text for cv_text in cv_texts]
         
-        inputs = self.tokenizer_a(
-            prompt, 
-            return_tensors="pt", 
-            truncation=True, 
-            max_length=self.config.model_a_max_seq_length
-        )
+        if self.engine_a is not None:
+            from vllm import SamplingParams
+            outputs = self.engine_a.generate(prompts, SamplingParams(temperature=0.7, max_tokens=512))
+            return [output.outputs[0].text for output in outputs]
         
-        if torch.cuda.is_available():
-            inputs = {k: v.cuda() for k, v in inputs.items()}
+        prefixed = self._prefixed_inputs(prompts) if self._prefix_kv_a is not None else None
+        if prefixed is not None:
+            inputs, prefix_cache = prefixed
+            cache_kwargs = {"past_key_values": prefix_cache}
+        else:
+            inputs = self.tokenizer_a(
+                prompts, 
+                return_tensors="pt", 
+                padding=True,
+                truncation=True, 
+                max_length=self.config.model_a_max_seq_length
+            )
+            inputs = self._to_device(inputs)
+            cache_kwargs = {}
         
-        with torch.no_grad():
+        with torch.inference_mode():
             outputs = self.model_a.generate(
                 **inputs,
+                **cache_kwargs,
                 max_new_tokens=512,
                 temperature=0.7,
                 do_sample=True,
+                use_cache=True,
                 pad_token_id=self.tokenizer_a.eos_token_id,
             )
         
-        prose_evaluation = self.tokenizer_a.decode(
-            outputs[0][len(inputs["input_ids"][0]):],
+        # Left padding: every row's prompt ends at the same column
+        return self.tokenizer_a.batch_decode(
+            outputs[:, inputs["input_ids"].shape[1]:],
             skip_special_tokens=True
         )
-        
-        return prose_evaluation
     
     def _convert_to_json(self, prose_evaluation: str) -> Optional[Dict[str, Any]]:
         """Convert prose to JSON using Model B"""
-        few_shot_prompt = """Convert CV evaluations to JSON format.
-
-Example:
-Evaluation: Technical Skills: 8/10. Experience Relevance: 7/10. Total Score: 75. Recommendation: hire
-JSON: {"technical_skills": 8, "experience_relevance": 7, "total_score": 75, "recommendation": "hire"}
-
-Now convert:
-Evaluation: %s
-JSON:"""
+        return self._convert_to_json_batch([prose_evaluation])[0]
+    
+    def _convert_to_json_batch(self, prose_evaluations: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Convert a batch of prose evaluations to JSON using Model B"""
+        # Only the variable prose is tokenized; the few-shot prefix/suffix ids are cached.
+        # The leading space keeps BPE merges identical to tokenizing the full prompt.
+        prose_ids = self.tokenizer_b(
+            [" " + prose.translate(_PROSE_STRIP_TABLE)[:500] for prose in prose_evaluations],
+            add_special_tokens=False
+        )["input_ids"]
         
-        prose_cleaned = prose_evaluation.replace('{', '').replace('}', '').replace('"', '')[:500]
-        model_b_input = few_shot_prompt % prose_cleaned
+        # Truncate the prose (not the suffix) so every prompt still ends with "JSON:"
+        budget = max(0, self.config.model_b_max_seq_length - len(self._prefix_ids_b) - len(self._suffix_ids_b))
+        rows = [self._prefix_ids_b + ids[:budget] + self._suffix_ids_b for ids in prose_ids]
         
-        inputs = self.tokenizer_b(
-            model_b_input, 
-            return_tensors="pt", 
-            truncation=True, 
-            max_length=self.config.model_b_max_seq_length
-        )
+        # Left pad to the longest row
+        width = max(len(row) for row in rows)
+        pad_id = self.tokenizer_b.pad_token_id
+        inputs = {
+            "input_ids": torch.tensor([[pad_id] * (width - len(row)) + row for row in rows]),
+            "attention_mask": torch.tensor([[0] * (width - len(row)) + [1] * len(row) for row in rows]),
+        }
         
-        if torch.cuda.is_available():
-            inputs = {k: v.cuda() for k, v in inputs.items()}
+        inputs = self._to_device(inputs)
         
-        with torch.no_grad():
+        with torch.inference_mode():
             outputs = self.model_b.generate(
                 **inputs,
-                max_new_tokens=300,
-                temperature=0.3,
-                do_sample=True,
-                top_p=0.9,
+                max_new_tokens=200,
+                do_sample=False,
+                num_beams=1,
+                use_cache=True,
+                eos_token_id=self.tokenizer_b.eos_token_id,
                 pad_token_id=self.tokenizer_b.eos_token_id,
+                # Stop each row once its JSON object closes (any tokenization of the braces)
+                stopping_criteria=StoppingCriteriaList([
+                    JSONBalancedStop(self.tokenizer_b, self.model_b.config.vocab_size)
+                ]),
             )
         
-        full_output = self.tokenizer_b.decode(outputs[0], skip_special_tokens=True)
-        json_output = full_output.split("JSON:")[-1].strip()
+        results = []
+        for full_output in self.tokenizer_b.batch_decode(outputs, skip_special_tokens=True):
+            json_output = full_output.split("JSON:")[-1].strip()
+            
+            parsed = None
+            span = _first_json_object(json_output)
+            if span is not None:
+                try:
+                    parsed = orjson.loads(span)
+                except orjson.JSONDecodeError:
+                    pass
+            results.append(parsed)
         
+        return results
+    
+    def _parse_embedded_json(self, prose_evaluation: str) -> Optional[Dict[str, Any]]:
+        """Return the JSON object embedded in the prose if it parses and is complete"""
+        match = _EMBEDDED_JSON_RE.search(prose_evaluation)
+        if not match:
+            return None
         try:
-            json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', json_output, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(0))
-        except:
-            pass
-        
+            parsed = orjson.loads(match.group(0))
+        except orjson.JSONDecodeError:
+            return None
+        if isinstance(parsed, dict) and self._is_extraction_complete(parsed):
+            return parsed
         return None
     
     def _is_extraction_complete(self, extracted_json: Dict[str, Any]) -> bool:
         """Check if extraction has sufficient fields"""
-        required_fields = len([k for k in extracted_json.keys() 
-                             if k in self.config.evaluation_criteria])
-        return required_fields >= 5 and 'total_score' in extracted_json
+        return 'total_score' in extracted_json and len(self._criteria_set & extracted_json.keys()) >= 5
     
     def _create_fallback_response(self, 
                                  extracted_json: Dict[str, Any], 
                                  prose_evaluation: str,
-                                 start_time: datetime) -> Dict[str, Any]:
+                                 start_ns: int) -> Dict[str, Any]:
         """Create fallback response with defaults"""
-        # Fill missing criteria with default scores
-        for criterion in self.config.evaluation_criteria.keys():
-            if criterion not in extracted_json:
-                extracted_json[criterion] = 5  # Default middle score
+        # Fill missing criteria with default scores (default middle score)
+        scores = [extracted_json.setdefault(criterion, 5) for criterion in self._criteria]
         
         # Calculate total if missing
         if 'total_score' not in extracted_json:
-            extracted_json['total_score'] = sum(
-                extracted_json.get(k, 5) for k in self.config.evaluation_criteria.keys()
-            )
+            extracted_json['total_score'] = sum(scores)
         
         # Set recommendation if missing
         if 'recommendation' not in extracted_json:
-            total = extracted_json.get('total_score', 50)
-            if total >= 85:
-                extracted_json['recommendation'] = 'strong_hire'
-            elif total >= 70:
-                extracted_json['recommendation'] = 'hire'
-            elif total >= 50:
-                extracted_json['recommendation'] = 'lean_hire'
-            else:
-                extracted_json['recommendation'] = 'no_hire'
+            extracted_json['recommendation'] = _FALLBACK_RECS[
+                bisect_right(_FALLBACK_THRESHOLDS, extracted_json['total_score'])
+            ]
         
         # Add default strengths/improvements if missing
         if 'key_strengths' not in extracted_json:
@@ -226,21 +498,52 @@ JSON:"""
         if 'areas_for_improvement' not in extracted_json:
             extracted_json['areas_for_improvement'] = ["Could expand skill set"]
         
-        extracted_json['processing_time_ms'] = int(
-            (datetime.now() - start_time).total_seconds() * 1000
-        )
+        extracted_json['processing_time_ms'] = (time.perf_counter_ns() - start_ns) // 1_000_000
         extracted_json['pipeline_method'] = 'partial_extraction'
         
         return extracted_json
     
     def batch_evaluate(self, cv_texts: List[str]) -> List[Dict[str, Any]]:
-        """Evaluate multiple CVs"""
-        results = []
-        for i, cv_text in enumerate(cv_texts):
-            print(f"Evaluating CV {i+1}/{len(cv_texts)}...")
-            results.append(self.evaluate_cv(cv_text))
+        """Evaluate multiple CVs, batching generation across up to inference_batch_size CVs"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(cv_texts)
+        # vLLM batches continuously on its own, so it gets the whole list at once
+        batch_size = len(cv_texts) if self.engine_a is not None else self.config.inference_batch_size
+        batch_size = max(1, batch_size)
+        
+        # Group CVs of similar token length so each batch pads as little as possible
+        order = self._length_sorted_indices(cv_texts)
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            print(f"Evaluating CVs {start+1}-{start+len(indices)}/{len(cv_texts)}...")
+            for i, result in zip(indices, self._evaluate_batch([cv_texts[i] for i in indices])):
+                results[i] = result
         return results
     
+    def batch_evaluate_soa(self, cv_texts: List[str]
+                           ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """batch_evaluate plus struct-of-arrays columns: scores (N, K), totals (N,), recommendation ids (N,)"""
+        results = self.batch_evaluate(cv_texts)
+        return (*evaluation_columns(results, self.config), results)
+    
+    def _length_sorted_indices(self, cv_texts: List[str]) -> List[int]:
+        """Indices of cv_texts ordered by Model A token length (input order if not loaded)"""
+        if self.tokenizer_a is None or len(cv_texts) <= 1:
+            return list(range(len(cv_texts)))
+        lengths = [len(ids) for ids in self.tokenizer_a(cv_texts, add_special_tokens=False)["input_ids"]]
+        return sorted(range(len(cv_texts)), key=lengths.__getitem__)
+    
+    def cache_hit_rate(self) -> float:
+        """Fraction of evaluations answered from the response cache"""
+        with self._stats_lock:
+            hits, misses = self.pipeline_stats['cache_hits'], self.pipeline_stats['cache_misses']
+        return hits / (hits + misses) if hits + misses else 0.0
+    
+    def model_b_activation_rate(self) -> float:
+        """Fraction of evaluated CVs that needed a Model B generation"""
+        with self._stats_lock:
+            evaluated, model_b_calls = self.pipeline_stats['evaluated'], self.pipeline_stats['model_b_calls']
+        return model_b_calls / evaluated if evaluated else 0.0
+    
     def get_evaluation_summary(self, result: Dict[str, Any]) -> str:
         """Generate a human-readable summary"""
         if "error" in result:
@@ -1,5 +1,6 @@
 """Prose evaluator model (Model A)"""
 
+import importlib.util
 import torch
 from transformers import AutoTokenizer, AutoModelForCausalLM
 from peft import LoraConfig, get_peft_model
@@ -23,6 +24,8 @@ class ProseEvaluator:
             self.config.model_name,
             cache_dir=cache_dir
         )
+        # Decoder-only generation: prompts end flush against the first generated token
+        self.tokenizer.padding_side = "left"
         
         self.model = AutoModelForCausalLM.from_pretrained(
             self.config.model_name,
@@ -30,21 +33,30 @@ class ProseEvaluator:
             torch_dtype=torch.float16,
             cache_dir=cache_dir,
             load_in_4bit=True,
-            trust_remote_code=True
+            trust_remote_code=True,
+            attn_implementation=self._attn_implementation()
         )
+        print(f"⚡ Model A attention: {self.model.config._attn_implementation}")
         
         # Setup padding token
         if self.tokenizer.pad_token is None:
             self.tokenizer.pad_token = self.tokenizer.eos_token
             self.model.config.pad_token_id = self.tokenizer.eos_token_id
     
+    def _attn_implementation(self) -> str:
+        """FlashAttention-2 on Ampere+ GPUs when flash_attn is installed, fused SDPA otherwise"""
+        if (torch.cuda.is_available() and torch.cuda.get_device_capability()[0] >= 8
+                and importlib.util.find_spec("flash_attn") is not None):
+            return "flash_attention_2"
+        return "sdpa"
+    
     def setup_lora(self):
         """Setup LoRA adapters"""
         
         lora_config = LoraConfig(
             r=self.config.lora_rank,
             lora_alpha=self.config.lora_alpha,
-            target_modules=self.config.target_modules,
+            target_modules=list(self.config.target_modules),
             lora_dropout=self.config.lora_dropout,
             bias="none",
             task_type="CAUSAL_LM"
@@ -2,46 +2,165 @@
 
 import re
 import numpy as np
-from typing import List, Dict, Any
+from functools import lru_cache, wraps
+from typing import List, Dict, Any, Tuple
 from sklearn.metrics import mean_squared_error
 
 from configs.hybrid_config import HybridSystemConfig
 
+# Malformed completions or ground truth score 0.0; anything else (including
+# KeyboardInterrupt) propagates
+_REWARD_ERRORS = (ValueError, TypeError, KeyError, IndexError, AttributeError, ArithmeticError)
 
+# Shared default (the config is frozen), instead of building one per reward call
+_DEFAULT_CONFIG = HybridSystemConfig()
+
+# Patterns used per completion, compiled once
+_TOTAL_SCORE_RE = re.compile(r"total score:?\s*(\d+)")
+_SCORE_SLASH10_RE = re.compile(r"(\d+)/10")
+_YEARS_RE = re.compile(r"\d+ years")
+# Text after the first "strengths:" up to the line end (or a repeated "strengths:")
+_STRENGTHS_SEGMENT_RE = re.compile(r"strengths:([^\n]*?)(?:strengths:|\n|\Z)")
+
+_QUALITY_KEYWORDS = (
+    'experience', 'skills', 'demonstrates', 'shows',
+    'excellent', 'strong', 'limited', 'could improve',
+    'background', 'expertise', 'proficient'
+)
+# Lookahead so overlapping keywords are all seen in a single scan
+_QUALITY_KW_RE = re.compile(f"(?=({'|'.join(map(re.escape, _QUALITY_KEYWORDS))}))")
+
+# Consistency reward by |total - sum of scores| (0, 1-2, 3-5, more than 5)
+_DIFF_REWARD = (2.0, 1.5, 1.5, 1.0, 1.0, 1.0, 0.0)
+
+# Logical (score band, recommendation) pairs earn 2.0; anything else gets 0.5
+_LOGIC_REWARD = {
+    (band, rec): 2.0
+    for band, recs in enumerate((
+        ('no_hire', 'strong_no_hire'),
+        ('lean_hire', 'no_hire'),
+        ('hire', 'lean_hire'),
+        ('strong_hire', 'hire')
+    ))
+    for rec in recs
+}
+
+
+@lru_cache(maxsize=None)
+def _criterion_score_re(criterion: str) -> re.Pattern:
+    """Pattern for a criterion name followed by an N/10 score"""
+    return re.compile(f"{criterion.replace('_', ' ')}.*?\\d+/10")
+
+
+@lru_cache(maxsize=None)
+def _recommendation_re(recommendations: Tuple[str, ...]) -> re.Pattern:
+    """Single-pass matcher for any recommendation (longest first, so 'no_hire' is not read as 'hire')"""
+    return re.compile('|'.join(map(re.escape, sorted(recommendations, key=len, reverse=True))))
+
+
+@lru_cache(maxsize=None)
+def _criterion_dfa(criteria: Tuple[str, ...]) -> re.Pattern:
+    """One pattern binding each "<criterion name>: N/10" to its criterion via a named group"""
+    return re.compile('|'.join(
+        f"(?P<{criterion}>{'[ _]'.join(map(re.escape, criterion.split('_')))}\\s*:?\\s*(\\d+)/10)"
+        for criterion in criteria
+    ))
+
+
+@lru_cache(maxsize=4096)
+def _extract_features(text: str, recommendations: Tuple[str, ...],
+                      criteria: Tuple[str, ...]) -> Dict[str, Any]:
+    """Scan a completion once for everything the reward functions look at.
+    
+    GRPO calls every reward function on the same completions, so results are
+    memoized by text and the returned dict must be treated as read-only.
+    """
+    text_lower = text.lower()
+    scores = [int(s) for s in _SCORE_SLASH10_RE.findall(text_lower)]
+    valid_scores = [s for s in scores if 1 <= s <= 10]
+    total_match = _TOTAL_SCORE_RE.search(text_lower)
+    strengths_match = _STRENGTHS_SEGMENT_RE.search(text_lower)
+    rec_match = _recommendation_re(recommendations).search(text_lower)
+    
+    return {
+        'text_lower': text_lower,
+        'length': len(text),
+        'valid_scores': valid_scores,
+        'scores_sum': sum(valid_scores[:10]),  # Use first 10 scores
+        'total_score': int(total_match.group(1)) if total_match else None,
+        # First recommendation written in the text
+        'recommendation': rec_match.group(0) if rec_match else None,
+        # (criterion, score) pairs; the named group that matched is the criterion and
+        # the score is the group right after it
+        'criterion_scores': [(m.lastgroup, int(m.group(m.lastindex + 1)))
+                             for m in _criterion_dfa(criteria).finditer(text_lower)],
+        'has_strengths': strengths_match is not None,
+        'strengths_line_length': len(strengths_match.group(1)) if strengths_match else 0,
+        'has_improvements': "areas for improvement:" in text_lower,
+        'keywords_found': len(set(_QUALITY_KW_RE.findall(text_lower))),
+        'has_years': _YEARS_RE.search(text) is not None
+    }
+
+
+def _feature_scope(config: HybridSystemConfig) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Config values the features depend on (built once per reward call, not per completion)"""
+    return tuple(config.valid_recommendations), tuple(config.evaluation_criteria)
+
+
+def _features(completion: Any, scope: Tuple[Tuple[str, ...], Tuple[str, ...]]) -> Dict[str, Any]:
+    """Shared features for one completion"""
+    text = completion if isinstance(completion, str) else str(completion)
+    return _extract_features(text, *scope)
+
+
+def _score_distinct(reward_func):
+    """Score each distinct completion text once and scatter the rewards back to every position"""
+    @wraps(reward_func)
+    def wrapped(completions: List[Any], **kwargs) -> List[float]:
+        texts = [c if isinstance(c, str) else str(c) for c in completions]
+        unique = {text: i for i, text in enumerate(dict.fromkeys(texts))}
+        if len(unique) == len(texts):
+            return reward_func(texts, **kwargs)
+        unique_rewards = reward_func(list(unique), **kwargs)
+        return [unique_rewards[unique[text]] for text in texts]
+    return wrapped
+
+
+@_score_distinct
 def prose_structure_reward_func(completions: List[Any], **kwargs) -> List[float]:
     """Reward well-structured prose evaluations with all criteria"""
     rewards = []
-    config = kwargs.get('config', HybridSystemConfig())
+    config = kwargs.get('config', _DEFAULT_CONFIG)
+    scope = _feature_scope(config)
     required_criteria = list(config.evaluation_criteria.keys())
     
     for completion in completions:
         try:
-            text = completion.lower() if isinstance(completion, str) else str(completion).lower()
+            features = _features(completion, scope)
+            text = features['text_lower']
             reward = 0.0
             
             # Check for each criterion with score format
             criteria_found = 0
             for criterion in required_criteria:
-                criterion_text = criterion.replace('_', ' ')
-                pattern = f"{criterion_text}.*?\\d+/10"
-                if re.search(pattern, text):
+                if _criterion_score_re(criterion).search(text):
                     criteria_found += 1
                     reward += 0.3
             
             # Check for total score
-            if re.search(r"total score:?\s*\d+", text):
+            if features['total_score'] is not None:
                 reward += 0.5
             
             # Check for recommendation
-            if any(rec in text for rec in config.valid_recommendations):
+            if features['recommendation'] is not None:
                 reward += 0.5
             
             # Check for key strengths
-            if "key strengths:" in text or "strengths:" in text:
+            if features['has_strengths']:
                 reward += 0.3
             
             # Check for areas for improvement
-            if "areas for improvement:" in text:
+            if features['has_improvements']:
                 reward += 0.3
             
             # Bonus for completeness
@@ -49,194 +168,146 @@ def prose_structure_reward_func(completions: List[Any], **kwargs) -> List[float]
                 reward += 1.0
             
             rewards.append(min(reward, 5.0))
-        except:
+        except _REWARD_ERRORS:
             rewards.append(0.0)
     
     return rewards
 
 
+@_score_distinct
 def prose_score_extraction_reward_func(completions: List[Any], **kwargs) -> List[float]:
     """Reward valid score extraction from prose"""
-    rewards = []
+    config = kwargs.get('config', _DEFAULT_CONFIG)
+    scope = _feature_scope(config)
     
-    for completion in completions:
+    # Flatten every completion's 1-10 scores, tagged with the completion index
+    owners, scores = [], []
+    for i, completion in enumerate(completions):
         try:
-            text = str(completion)
-            reward = 0.0
-            
-            # Find all score patterns
-            score_pattern = r"(\d+)/10"
-            scores = re.findall(score_pattern, text)
-            
-            if scores:
-                valid_scores = [int(s) for s in scores if 1 <= int(s) <= 10]
-                
-                # Reward valid scores
-                reward += len(valid_scores) * 0.2
-                
-                # Reward realistic distribution
-                if valid_scores and 3 <= np.mean(valid_scores) <= 8:
-                    reward += 1.0
-                
-                # Reward variety
-                if len(set(valid_scores)) >= 5:
-                    reward += 0.5
-            
-            rewards.append(min(reward, 3.0))
-        except:
-            rewards.append(0.0)
+            valid_scores = _features(completion, scope)['valid_scores']
+        except _REWARD_ERRORS:
+            continue
+        owners.extend([i] * len(valid_scores))
+        scores.extend(valid_scores)
     
-    return rewards
+    # Per-completion histogram over scores 0-10 in one bincount
+    n = len(completions)
+    counts = np.bincount(
+        np.asarray(owners, dtype=np.int64) * 11 + np.asarray(scores, dtype=np.int64),
+        minlength=n * 11
+    ).reshape(n, 11)
+    num_valid = counts.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (counts * np.arange(11)).sum(axis=1) / num_valid
+    
+    # Reward valid scores, a realistic distribution (mean 3-8) and variety
+    rewards = num_valid * 0.2
+    rewards += np.where((num_valid > 0) & (mean >= 3) & (mean <= 8), 1.0, 0.0)
+    rewards += np.where((counts > 0).sum(axis=1) >= 5, 0.5, 0.0)
+    
+    return np.minimum(rewards, 3.0).tolist()
 
 
+@_score_distinct
 def prose_total_consistency_reward_func(completions: List[Any], **kwargs) -> List[float]:
     """Reward consistency between individual scores and total"""
     rewards = []
+    config = kwargs.get('config', _DEFAULT_CONFIG)
+    scope = _feature_scope(config)
     
     for completion in completions:
         try:
-            text = str(completion)
-            
-            # Extract individual scores
-            score_pattern = r"(\d+)/10"
-            scores = [int(s) for s in re.findall(score_pattern, text) if 1 <= int(s) <= 10]
-            
-            # Extract total score
-            total_match = re.search(r"total score:?\s*(\d+)", text.lower())
+            features = _features(completion, scope)
+            actual_total = features['total_score']
             
-            if scores and total_match:
-                actual_total = int(total_match.group(1))
-                expected_total = sum(scores[:10])  # Use first 10 scores
-                
-                diff = abs(actual_total - expected_total)
-                if diff == 0:
-                    reward = 2.0
-                elif diff <= 2:
-                    reward = 1.5
-                elif diff <= 5:
-                    reward = 1.0
-                else:
-                    reward = 0.0
-            else:
-                reward = 0.0
+            if not features['valid_scores'] or actual_total is None:
+                rewards.append(0.0)
+                continue
             
-            rewards.append(reward)
-        except:
+            diff = abs(actual_total - features['scores_sum'])
+            rewards.append(_DIFF_REWARD[min(diff, len(_DIFF_REWARD) - 1)])
+        except _REWARD_ERRORS:
             rewards.append(0.0)
     
     return rewards
 
 
+@_score_distinct
 def prose_recommendation_logic_reward_func(completions: List[Any], **kwargs) -> List[float]:
     """Reward logical recommendations based on total score"""
     rewards = []
-    config = kwargs.get('config', HybridSystemConfig())
+    config = kwargs.get('config', _DEFAULT_CONFIG)
+    scope = _feature_scope(config)
     
     for completion in completions:
         try:
-            text = str(completion).lower()
-            
-            # Extract total score
-            total_match = re.search(r"total score:?\s*(\d+)", text)
-            
-            # Find recommendation
-            recommendation = None
-            for rec in config.valid_recommendations:
-                if rec in text:
-                    recommendation = rec
-                    break
+            features = _features(completion, scope)
+            total_score = features['total_score']
+            recommendation = features['recommendation']
             
-            if total_match and recommendation:
-                total_score = int(total_match.group(1))
-                
-                # Check logic
-                logical = False
-                if total_score >= 80 and recommendation in ['strong_hire', 'hire']:
-                    logical = True
-                elif 60 <= total_score < 80 and recommendation in ['hire', 'lean_hire']:
-                    logical = True
-                elif 40 <= total_score < 60 and recommendation in ['lean_hire', 'no_hire']:
-                    logical = True
-                elif total_score < 40 and recommendation in ['no_hire', 'strong_no_hire']:
-                    logical = True
-                
-                reward = 2.0 if logical else 0.5
+            if total_score is not None and recommendation:
+                # Score band: 0 (<40), 1 (40-59), 2 (60-79), 3 (80+)
+                band = (total_score >= 40) + (total_score >= 60) + (total_score >= 80)
+                reward = _LOGIC_REWARD.get((band, recommendation), 0.5)
             else:
                 reward = 0.0
             
             rewards.append(reward)
-        except:
+        except _REWARD_ERRORS:
             rewards.append(0.0)
     
     return rewards
 
 
+@_score_distinct
 def prose_content_quality_reward_func(completions: List[Any], **kwargs) -> List[float]:
     """Reward detailed, specific evaluations"""
     rewards = []
+    config = kwargs.get('config', _DEFAULT_CONFIG)
+    scope = _feature_scope(config)
     
     for completion in completions:
         try:
-            text = str(completion)
+            features = _features(completion, scope)
             reward = 0.0
             
             # Length indicates detail
-            if len(text) > 500:
+            if features['length'] > 500:
                 reward += 0.5
-            if len(text) > 800:
+            if features['length'] > 800:
                 reward += 0.5
             
             # Quality keywords
-            quality_keywords = [
-                'experience', 'skills', 'demonstrates', 'shows',
-                'excellent', 'strong', 'limited', 'could improve',
-                'background', 'expertise', 'proficient'
-            ]
-            
-            keywords_found = sum(1 for kw in quality_keywords if kw in text.lower())
-            reward += min(keywords_found * 0.1, 1.0)
+            reward += min(features['keywords_found'] * 0.1, 1.0)
             
             # Check for specific examples
-            if re.search(r"\d+ years", text):
+            if features['has_years']:
                 reward += 0.3
             
             # Strengths and improvements should be specific
-            if "strengths:" in text.lower():
-                strengths_text = text.lower().split("strengths:")[1].split("\n")[0]
-                if len(strengths_text) > 50:
-                    reward += 0.5
+            if features['strengths_line_length'] > 50:
+                reward += 0.5
             
             rewards.append(min(reward, 3.0))
-        except:
+        except _REWARD_ERRORS:
             rewards.append(0.0)
     
     return rewards
 
 
-def prose_accuracy_reward_func(prompts: List[Any], completions: List[Any], 
+def prose_accuracy_reward_func(prompts: List[Any], completions: List[Any],
                               ground_truth: List[Dict[str, Any]], **kwargs) -> List[float]:
     """Reward accuracy against ground truth prose evaluations"""
     rewards = []
-    config = kwargs.get('config', HybridSystemConfig())
+    config = kwargs.get('config', _DEFAULT_CONFIG)
+    scope = _feature_scope(config)
     
     for i, completion in enumerate(completions):
         try:
-            text = str(completion)
             truth = ground_truth[i % len(ground_truth)]
             
-            # Extract scores from completion
-            score_pattern = r"(\w+)\s*(?:skills?|quality|potential|mindset|fit|progression|impression)?:?\s*(\d+)/10"
-            found_scores = {}
-            
-            for match in re.finditer(score_pattern, text.lower()):
-                criterion_part = match.group(1)
-                score = int(match.group(2))
-                
-                # Match partial criterion names
-                for full_criterion in config.evaluation_criteria.keys():
-                    if criterion_part in full_criterion:
-                        found_scores[full_criterion] = score
-                        break
+            # Extract scores from completion (the last mention of a criterion wins)
+            found_scores = dict(_features(completion, scope)['criterion_scores'])
             
             # Compare with ground truth
             if found_scores and isinstance(truth, dict):
@@ -258,12 +329,29 @@ def prose_accuracy_reward_func(prompts: List[Any], completions: List[Any],
                 reward = 0.5
             
             rewards.append(reward)
-        except:
+        except _REWARD_ERRORS:
             rewards.append(0.0)
     
     return rewards
 
 
+def compute_all_rewards(completions: List[Any], **kwargs) -> Dict[str, List[float]]:
+    """Run every Model A reward function over the completions (one text scan each).
+    
+    prose_accuracy_reward_func is included when ground_truth is passed.
+    """
+    kwargs.setdefault('config', _DEFAULT_CONFIG)
+    rewards = {}
+    for reward_func in MODEL_A_REWARD_FUNCTIONS:
+        if reward_func is prose_accuracy_reward_func:
+            # Pairs each completion with ground_truth by position, so never deduplicated
+            if 'ground_truth' in kwargs:
+                rewards[reward_func.__name__] = reward_func(kwargs.pop('prompts', None), completions, **kwargs)
+            continue
+        rewards[reward_func.__name__] = reward_func(completions, **kwargs)
+    return rewards
+
+
 # List of all Model A reward functions
 MODEL_A_REWARD_FUNCTIONS = [
     prose_structure_reward_func,
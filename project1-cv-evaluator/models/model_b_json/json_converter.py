@@ -1,11 +1,25 @@
 """JSON converter model (Model B)"""
 
+import copy
+import importlib.util
 import torch
-from transformers import GPT2LMHeadModel, GPT2Tokenizer
+from transformers import BitsAndBytesConfig, GPT2LMHeadModel, GPT2TokenizerFast, StoppingCriteriaList
 from peft import LoraConfig, get_peft_model, TaskType
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 from configs.model_configs import ModelBConfig
+from utils.generation import JSONBalancedStop
+
+# Few-shot prompt around each evaluation; the part before it is constant per system prompt
+_FEW_SHOT_TEMPLATE = """{system_prompt}
+
+Example:
+Evaluation: Technical Skills: 8/10. Experience Relevance: 7/10. Total Score: 75. Recommendation: hire
+JSON: {{"technical_skills": 8, "experience_relevance": 7, "total_score": 75, "recommendation": "hire"}}
+
+Now convert:
+Evaluation:"""
+_PROMPT_SUFFIX = "\nJSON:"
 
 
 class JSONConverter:
@@ -15,11 +29,14 @@ class JSONConverter:
         self.config = config
         self.model = None
         self.tokenizer = None
+        # (system_prompt, prefix ids, KV cache); reset whenever self.model is replaced
+        self._prefix_cache = None
         
-    def load_base_model(self, cache_dir: Optional[str] = None):
-        """Load base GPT2 model and tokenizer"""
+    def load_base_model(self, cache_dir: Optional[str] = None, load_quantized: bool = False):
+        """Load base GPT2 model and tokenizer (INT8 weights with load_quantized, for inference only)"""
         
-        self.tokenizer = GPT2Tokenizer.from_pretrained(
+        # Rust-backed tokenizer: batched encoding runs in parallel native code
+        self.tokenizer = GPT2TokenizerFast.from_pretrained(
             self.config.model_name,
             cache_dir=cache_dir
         )
@@ -27,12 +44,30 @@ class JSONConverter:
         self.model = GPT2LMHeadModel.from_pretrained(
             self.config.model_name,
             device_map="auto",
-            torch_dtype=torch.float16,
-            cache_dir=cache_dir
+            torch_dtype=self._dtype(),
+            attn_implementation=self._attn_implementation(),
+            cache_dir=cache_dir,
+            **({"quantization_config": BitsAndBytesConfig(load_in_8bit=True, llm_int8_threshold=6.0)}
+               if load_quantized else {})
         )
+        self.model.eval()  # the trainer switches to train mode itself
         
         # Add padding token for GPT2
         self.tokenizer.pad_token = self.tokenizer.eos_token
+        self._prefix_cache = None
+    
+    def _dtype(self) -> torch.dtype:
+        """bfloat16 when configured and supported (matches bf16 training), float16 otherwise"""
+        if self.config.bf16 and torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+            return torch.bfloat16
+        return torch.float16
+    
+    def _attn_implementation(self) -> str:
+        """FlashAttention-2 on Ampere+ GPUs when flash_attn is installed, fused SDPA otherwise"""
+        if (torch.cuda.is_available() and torch.cuda.get_device_capability()[0] >= 8
+                and importlib.util.find_spec("flash_attn") is not None):
+            return "flash_attention_2"
+        return "sdpa"
     
     def setup_lora(self):
         """Setup LoRA adapters for GPT2"""
@@ -40,13 +75,14 @@ class JSONConverter:
         lora_config = LoraConfig(
             r=self.config.lora_rank,
             lora_alpha=self.config.lora_alpha,
-            target_modules=self.config.target_modules,
+            target_modules=list(self.config.target_modules),
             lora_dropout=self.config.lora_dropout,
             bias="none",
             task_type=TaskType.CAUSAL_LM
         )
         
         self.model = get_peft_model(self.model, lora_config)
+        self._prefix_cache = None
         
         # Print trainable parameters
         trainable_params = sum(p.numel() for p in self.model.parameters() if p.requires_grad)
@@ -57,42 +93,66 @@ class JSONConverter:
     
     def convert_to_json(self, prose_evaluation: str, system_prompt: str) -> str:
         """Convert prose evaluation to JSON format"""
+        return self.batch_convert_to_json([prose_evaluation], system_prompt)[0]
+    
+    def batch_convert_to_json(self, prose_evaluations: List[str], system_prompt: str) -> List[str]:
+        """Convert several prose evaluations with one greedy generate() call"""
+        if not prose_evaluations:
+            return []
         
-        # Use few-shot prompt for better results
-        few_shot_prompt = f"""{system_prompt}
-
-Example:
-Evaluation: Technical Skills: 8/10. Experience Relevance: 7/10. Total Score: 75. Recommendation: hire
-JSON: {{"technical_skills": 8, "experience_relevance": 7, "total_score": 75, "recommendation": "hire"}}
-
-Now convert:
-Evaluation: {prose_evaluation[:500]}
-JSON:"""
-        
-        inputs = self.tokenizer(
-            few_shot_prompt,
-            return_tensors="pt",
-            truncation=True,
-            max_length=self.config.max_seq_length
-        )
+        prefix_ids, prefix_kv = self._few_shot_prefix(system_prompt)
+        suffix_ids = self.tokenizer(_PROMPT_SUFFIX, add_special_tokens=False)["input_ids"]
+        budget = max(0, self.config.max_seq_length - len(prefix_ids) - len(suffix_ids))
+        bodies = [ids[:budget] + suffix_ids for ids in self.tokenizer(
+            [f" {prose[:500]}" for prose in prose_evaluations], add_special_tokens=False)["input_ids"]]
         
+        # [prefix | padding | evaluation]: the cached prefix keeps its positions in every row
+        width = max(len(body) for body in bodies)
+        pad_id = self.tokenizer.pad_token_id
+        inputs = {
+            "input_ids": torch.tensor(
+                [prefix_ids + [pad_id] * (width - len(body)) + body for body in bodies]),
+            "attention_mask": torch.tensor(
+                [[1] * len(prefix_ids) + [0] * (width - len(body)) + [1] * len(body) for body in bodies]),
+        }
         if torch.cuda.is_available():
             inputs = {k: v.cuda() for k, v in inputs.items()}
         
-        with torch.no_grad():
+        # generate() extends the cache in place, so every call gets its own copy
+        cache = copy.deepcopy(prefix_kv)
+        if len(bodies) > 1:
+            cache.batch_repeat_interleave(len(bodies))
+        
+        with torch.inference_mode():
             outputs = self.model.generate(
                 **inputs,
-                max_new_tokens=300,
-                temperature=0.3,
-                do_sample=True,
-                top_p=0.9,
+                past_key_values=cache,
+                max_new_tokens=200,
+                do_sample=False,
+                num_beams=1,
                 pad_token_id=self.tokenizer.eos_token_id,
+                # Typical outputs close their object well before the token budget
+                stopping_criteria=StoppingCriteriaList([
+                    JSONBalancedStop(self.tokenizer, self.model.config.vocab_size)
+                ]),
             )
         
-        full_output = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-        json_output = full_output.split("JSON:")[-1].strip()
-        
-        return json_output
+        generated = self.tokenizer.batch_decode(
+            outputs[:, inputs["input_ids"].shape[1]:], skip_special_tokens=True
+        )
+        return [text.split("JSON:")[-1].strip() for text in generated]
+    
+    def _few_shot_prefix(self, system_prompt: str):
+        """Token ids and KV cache of the constant few-shot prefix (computed once per system prompt)"""
+        if self._prefix_cache is None or self._prefix_cache[0] != system_prompt:
+            prefix_ids = self.tokenizer(_FEW_SHOT_TEMPLATE.format(system_prompt=system_prompt))["input_ids"]
+            prefix = torch.tensor([prefix_ids])
+            if torch.cuda.is_available():
+                prefix = prefix.cuda()
+            with torch.inference_mode():
+                prefix_kv = self.model(input_ids=prefix, use_cache=True).past_key_values
+            self._prefix_cache = (system_prompt, prefix_ids, prefix_kv)
+        return self._prefix_cache[1], self._prefix_cache[2]
     
     def save_model(self, path: str):
         """Save model and tokenizer"""
@@ -1,110 +1,110 @@
 """Training utilities for Model B"""
 
-from typing import List, Dict, Any
+import os
+from typing import List, Dict, Any, Optional
+import numpy as np
+import orjson
+import torch
 from datasets import Dataset
-from transformers import DataCollatorForLanguageModeling
+
+from configs import CRITERIA_NAMES
+
+_CRITERIA_LABELS = tuple(criterion.replace('_', ' ').title() for criterion in CRITERIA_NAMES)
 
 
 def prepare_model_b_dataset(dataset: Dataset, tokenizer, max_length: int = 512) -> Dataset:
     """Prepare dataset for Model B training"""
     
-    def format_for_gpt(example):
-        """Format examples for GPT2 training"""
-        text = f"{example['prompt']}\n{example['completion']}"
-        return {"text": text}
-    
     def tokenize_function(examples):
-        """Tokenize examples"""
-        model_inputs = tokenizer(
-            examples["text"],
+        """Format examples for GPT2 training and tokenize them in one batched call"""
+        texts = [f"{prompt}\n{completion}" for prompt, completion in zip(examples["prompt"], examples["completion"])]
+        # No padding here: the collator pads each batch to its own longest example
+        return tokenizer(
+            texts,
             truncation=True,
-            padding="max_length",
+            padding=False,
             max_length=max_length
         )
-        model_inputs["labels"] = model_inputs["input_ids"].copy()
-        return model_inputs
     
-    # Format dataset
-    formatted_dataset = dataset.map(format_for_gpt)
-    
-    # Tokenize
-    tokenized_dataset = formatted_dataset.map(
+    # Format and tokenize in a single pass, spread over worker processes; the result is
+    # cached on disk by fingerprint, so reruns with the same data and tokenizer skip this
+    tokenized_dataset = dataset.map(
         tokenize_function,
         batched=True,
-        remove_columns=formatted_dataset.column_names
+        batch_size=1000,
+        num_proc=min(8, os.cpu_count() or 1, max(1, len(dataset) // 1000)),
+        load_from_cache_file=True,
+        remove_columns=dataset.column_names
     )
     
     return tokenized_dataset
 
 
-def get_data_collator(tokenizer):
+class DynamicPaddingCausalCollator:
+    """Causal LM collator that pads each batch to its longest example"""
+    
+    def __init__(self, pad_token_id: int, pad_to_multiple_of: int = 8):
+        self.pad_token_id = pad_token_id
+        self.pad_to_multiple_of = pad_to_multiple_of
+    
+    def __call__(self, features: List[Dict[str, Any]]) -> Dict[str, torch.Tensor]:
+        rows = [torch.as_tensor(f["input_ids"]) for f in features]
+        # Round up so tensor-core matmuls see aligned shapes
+        length = -(-max(len(row) for row in rows) // self.pad_to_multiple_of) * self.pad_to_multiple_of
+        
+        input_ids = torch.full((len(rows), length), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(rows), length), dtype=torch.long)
+        for i, row in enumerate(rows):
+            input_ids[i, :len(row)] = row
+            attention_mask[i, :len(row)] = 1
+        
+        # Same labels as DataCollatorForLanguageModeling(mlm=False): padding is ignored by the loss
+        labels = input_ids.masked_fill(input_ids == self.pad_token_id, -100)
+        return {"input_ids": input_ids, "attention_mask": attention_mask, "labels": labels}
+
+
+def get_data_collator(tokenizer, pad_to_multiple_of: int = 8):
     """Get data collator for language modeling"""
-    return DataCollatorForLanguageModeling(
-        tokenizer=tokenizer,
-        mlm=False,  # GPT2 is not a masked LM
-        pad_to_multiple_of=8
-    )
+    return DynamicPaddingCausalCollator(tokenizer.pad_token_id, pad_to_multiple_of)
 
 
-def create_synthetic_json_examples(num_examples: int = 200) -> List[Dict[str, str]]:
+def create_synthetic_json_examples(num_examples: int = 200, seed: Optional[int] = None) -> List[Dict[str, str]]:
     """Create synthetic examples for JSON training"""
-    import random
+    rng = np.random.default_rng(seed)
+    
+    # Draw every score and processing time up front
+    scores_mat = rng.integers(4, 10, size=(num_examples, len(CRITERIA_NAMES)))
+    totals = scores_mat.sum(axis=1)
+    recs = np.select(
+        [totals >= 85, totals >= 70, totals >= 55],
+        ['strong_hire', 'hire', 'lean_hire'],
+        default='no_hire'
+    )
+    proc_times = rng.integers(500, 2001, size=num_examples)
     
     examples = []
     
-    for _ in range(num_examples):
-        # Generate random scores
-        scores = {
-            'technical_skills': random.randint(4, 9),
-            'experience_relevance': random.randint(4, 9),
-            'education_quality': random.randint(4, 9),
-            'leadership_potential': random.randint(4, 9),
-            'communication_skills': random.randint(4, 9),
-            'problem_solving': random.randint(4, 9),
-            'innovation_mindset': random.randint(4, 9),
-            'cultural_fit': random.randint(4, 9),
-            'career_progression': random.randint(4, 9),
-            'overall_impression': random.randint(4, 9)
-        }
-        
-        total = sum(scores.values())
+    for row, total, rec, proc_time in zip(scores_mat.tolist(), totals.tolist(), recs.tolist(), proc_times.tolist()):
+        scores = dict(zip(CRITERIA_NAMES, row))
         
         # Create prose
-        prose_parts = []
-        for criterion, score in scores.items():
-            criterion_text = criterion.replace('_', ' ').title()
-            prose_parts.append(f"{criterion_text}: {score}/10.")
-        
-        prose_parts.append(f"Total Score: {total}.")
-        
-        # Determine recommendation
-        if total >= 85:
-            rec = 'strong_hire'
-        elif total >= 70:
-            rec = 'hire'
-        elif total >= 55:
-            rec = 'lean_hire'
-        else:
-            rec = 'no_hire'
-        
-        prose_parts.append(f"Recommendation: {rec}")
-        prose = " ".join(prose_parts)
+        prose = " ".join(f"{label}: {score}/10." for label, score in zip(_CRITERIA_LABELS, row))
+        prose = f"{prose} Total Score: {total}. Recommendation: {rec}"
         
         # Create JSON
-        import json
         json_obj = {
             **scores,
             "total_score": total,
             "recommendation": rec,
             "key_strengths": ["Strong technical skills", "Good experience"],
             "areas_for_improvement": ["Leadership development needed"],
-            "processing_time_ms": random.randint(500, 2000)
+            "processing_time_ms": proc_time
         }
         
-        json_str = json.dumps(json_obj, indent=2)
+        json_str = orjson.dumps(json_obj).decode()
         
         # Create training example
-        text = f"Convert to JSON:\n{prose}\n\nJSON:\n{json_str}"
-        examples.append({"text": text})
+        # Same prompt/completion columns as the CV-derived data; formats to the same text
+        examples.append({"prompt": f"Convert to JSON:\n{prose}\n\nJSON:", "completion": json_str})
     
     return examples
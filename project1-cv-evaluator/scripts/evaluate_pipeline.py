@@ -4,14 +4,35 @@
 import os
 import sys
 import argparse
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from configs.hybrid_config import HybridSystemConfig
 from inference.hybrid_inference import HybridInference
 from utils.metrics import evaluate_hybrid_system
+from utils.validation import validate_evaluation_batch
+
+
+def _load_sample(cv_path: str, persona_path: Optional[str]) -> dict:
+    """Read a CV and its persona (if available)"""
+    with open(cv_path, 'r', encoding='utf-8') as f:
+        cv_text = f.read()
+    
+    if persona_path:
+        with open(persona_path, 'rb') as f:
+            persona = orjson.loads(f.read())
+    else:
+        persona = {}
+    
+    return {
+        'cv_text': cv_text,
+        'metadata': persona
+    }
 
 
 def main():
@@ -26,6 +47,8 @@ def main():
                        default='outputs/model_b_json_converter')
     parser.add_argument('--output', type=str, default='evaluation_results.json',
                        help='Output file for results')
+    parser.add_argument('--batch_size', type=int, default=8,
+                       help='CVs per batched generate() call')
     
     args = parser.parse_args()
     
@@ -34,44 +57,35 @@ def main():
     
     # Initialize system
     print("Loading models...")
-    inference = HybridInference()
+    inference = HybridInference(HybridSystemConfig(inference_batch_size=args.batch_size))
     inference.load_models(args.model_a_path, args.model_b_path)
     
     # Load test samples
     print(f"Loading test samples from {args.test_dataset}...")
-    test_samples = []
-    
-    cv_files = sorted(Path(args.test_dataset).glob("cv_*.txt"))[:args.num_samples]
-    
-    for cv_file in cv_files:
-        with open(cv_file, 'r', encoding='utf-8') as f:
-            cv_text = f.read()
-        
-        # Load corresponding persona if available
-        persona_file = cv_file.parent / f"persona_{cv_file.stem.split('_')[1]}.json"
-        if persona_file.exists():
-            with open(persona_file, 'r') as f:
-                persona = json.load(f)
-        else:
-            persona = {}
-        
-        test_samples.append({
-            'cv_text': cv_text,
-            'metadata': persona
-        })
+    # One directory listing serves both the CV selection and the persona lookup
+    with os.scandir(args.test_dataset) as it:
+        names = {entry.name: entry.path for entry in it if entry.is_file()}
+    cv_names = sorted(name for name in names if name.startswith("cv_") and name.endswith(".txt"))
+    cv_names = cv_names[:args.num_samples]
+    cv_paths = [names[name] for name in cv_names]
+    persona_paths = [names.get(f"persona_{name[3:-4].split('_')[0]}.json") for name in cv_names]
+    
+    # File reads are I/O bound; map() keeps sample order
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        test_samples = list(executor.map(_load_sample, cv_paths, persona_paths))
     
     print(f"Loaded {len(test_samples)} test samples")
     
     # Evaluate samples
     print("\nEvaluating samples...")
-    results = []
+    results = inference.batch_evaluate([sample['cv_text'] for sample in test_samples])
+    validations = validate_evaluation_batch(results, inference.config)
     
-    for i, sample in enumerate(test_samples):
-        print(f"  Sample {i+1}/{len(test_samples)}...", end='', flush=True)
+    for i, (sample, result, validation) in enumerate(zip(test_samples, results, validations)):
+        print(f"  Sample {i+1}/{len(test_samples)}...", end='')
         
-        result = inference.evaluate_with_validation(sample['cv_text'])
+        result['validation'] = validation
         result['sample_metadata'] = sample['metadata']
-        results.append(result)
         
         if 'error' not in result:
             print(" ✅")
@@ -121,8 +135,7 @@ def main():
     }
     
     # Save results
-    with open(args.output, 'w') as f:
-        json.dump(summary, f, indent=2)
+    Path(args.output).write_bytes(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
     
     # Print summary
     print("\n" + "=" * 60)
@@ -3,14 +3,57 @@
 
 import os
 import sys
+import orjson
 import argparse
 import zipfile
+import multiprocessing
+import numpy as np
+from contextlib import nullcontext
 from pathlib import Path
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from data.cv_generator import CVGenerator
+from data.dataset_processor import write_packed_dataset
+
+# CVs per worker task; chunking (and seeding) is independent of the worker count
+_CHUNK_SIZE = 64
+
+
+def _generate_chunk(task):
+    """Generate one chunk of CVs and write its files (runs in a worker process)"""
+    start, specs, seed, output_dir, keep = task
+    generator = CVGenerator(seed=seed)
+    output_dir = Path(output_dir)
+    cv_texts, personas = [], []
+    
+    for i, ((domain, experience_level, quality), cv_data) in enumerate(
+            zip(specs, generator.generate_batch(specs)), start=start):
+        # Save CV text
+        cv_filename = f"cv_{i+1:04d}.txt"
+        cv_path = output_dir / cv_filename
+        with open(cv_path, 'w', encoding='utf-8') as f:
+            f.write(cv_data['cv_text'])
+        
+        # Save persona metadata
+        persona = {
+            'persona': cv_data['persona'],
+            'metadata': cv_data['metadata'],
+            'quality_tier': quality,
+            'domain': domain,
+            'experience_level': experience_level
+        }
+        persona_filename = f"persona_{i+1:04d}.json"
+        persona_path = output_dir / persona_filename
+        # Machine-read only, so written compact
+        persona_path.write_bytes(orjson.dumps(persona))
+        
+        if keep:
+            cv_texts.append(cv_data['cv_text'])
+            personas.append(persona)
+    
+    return start, len(specs), cv_texts, personas
 
 
 def main():
@@ -21,8 +64,16 @@ def main():
                        help='Output directory for CVs')
     parser.add_argument('--create_zip', action='store_true',
                        help='Create zip file of dataset')
+    parser.add_argument('--compress', action='store_true',
+                       help='Deflate the zip entries (default: stored, much faster for small files)')
     parser.add_argument('--quality_distribution', type=str,
                        help='Quality distribution (e.g., "excellent:0.2,good:0.3,average:0.3,below_average:0.2")')
+    parser.add_argument('--pack', action='store_true',
+                       help='Also write all CVs and personas to a single .parquet shard')
+    parser.add_argument('--seed', type=int,
+                       help='Random seed for reproducible generation')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                       help='Worker processes for generation (default: all cores)')
     
     args = parser.parse_args()
     
@@ -47,54 +98,45 @@ def main():
     output_dir = Path(args.output_dir)
     output_dir.mkdir(exist_ok=True)
     
-    # Initialize generator
-    generator = CVGenerator()
+    # Independent random streams: one for parameter selection, one per chunk
+    chunk_starts = range(0, args.num_cvs, _CHUNK_SIZE)
+    param_seed, *chunk_seeds = np.random.SeedSequence(args.seed).spawn(1 + len(chunk_starts))
+    rng = np.random.default_rng(param_seed)
     
     # Generate CVs
     domains = ['data_science', 'software_engineering', 'marketing', 'finance']
     experience_levels = ['entry', 'mid', 'senior', 'executive']
     
-    cv_count = 0
+    # Select all parameters up front: quality by weights, random domain and experience
+    qualities = list(quality_weights.keys())
+    weights = list(quality_weights.values())
+    total_weight = sum(weights)
+    quality_idx = rng.choice(
+        len(qualities), size=args.num_cvs, p=[w / total_weight for w in weights]
+    ).tolist()
+    domain_idx = rng.integers(0, len(domains), args.num_cvs).tolist()
+    experience_idx = rng.integers(0, len(experience_levels), args.num_cvs).tolist()
     
-    for i in range(args.num_cvs):
-        # Select parameters based on distribution
-        import random
-        
-        # Select quality based on weights
-        qualities = list(quality_weights.keys())
-        weights = list(quality_weights.values())
-        quality = random.choices(qualities, weights=weights)[0]
-        
-        # Random domain and experience
-        domain = random.choice(domains)
-        experience_level = random.choice(experience_levels)
-        
-        # Generate CV
-        cv_data = generator.generate_cv(domain, experience_level, quality)
-        
-        # Save CV text
-        cv_filename = f"cv_{i+1:04d}.txt"
-        cv_path = output_dir / cv_filename
-        with open(cv_path, 'w', encoding='utf-8') as f:
-            f.write(cv_data['cv_text'])
-        
-        # Save persona metadata
-        import json
-        persona_filename = f"persona_{i+1:04d}.json"
-        persona_path = output_dir / persona_filename
-        with open(persona_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                'persona': cv_data['persona'],
-                'metadata': cv_data['metadata'],
-                'quality_tier': quality,
-                'domain': domain,
-                'experience_level': experience_level
-            }, f, indent=2)
-        
-        cv_count += 1
-        
-        if cv_count % 100 == 0:
-            print(f"  Generated {cv_count}/{args.num_cvs} CVs...")
+    specs = [
+        (domains[d], experience_levels[e], qualities[q])
+        for d, e, q in zip(domain_idx, experience_idx, quality_idx)
+    ]
+    tasks = [
+        (start, specs[start:start + _CHUNK_SIZE], seed, str(output_dir), args.pack)
+        for start, seed in zip(chunk_starts, chunk_seeds)
+    ]
+    
+    # Workers write their own files; only packed data comes back to this process
+    cv_count = 0
+    packed = {}
+    workers = max(1, min(args.workers or 1, len(tasks)))
+    with multiprocessing.Pool(processes=workers) if workers > 1 else nullcontext() as pool:
+        chunks = pool.imap_unordered(_generate_chunk, tasks) if pool else map(_generate_chunk, tasks)
+        for start, count, chunk_texts, chunk_personas in chunks:
+            packed[start] = (chunk_texts, chunk_personas)
+            previous, cv_count = cv_count, cv_count + count
+            if cv_count // 100 > previous // 100:
+                print(f"  Generated {cv_count}/{args.num_cvs} CVs...")
     
     print(f"✅ Generated {cv_count} CVs in {output_dir}")
     
@@ -107,19 +149,26 @@ def main():
     }
     
     metadata_path = output_dir / "metadata.json"
-    with open(metadata_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    metadata_path.write_bytes(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+    
+    # Create packed shard if requested
+    if args.pack:
+        cv_texts = [text for start in sorted(packed) for text in packed[start][0]]
+        personas = [persona for start in sorted(packed) for persona in packed[start][1]]
+        packed_path = write_packed_dataset(cv_texts, personas, f"{args.output_dir}.parquet")
+        print(f"📦 Packed dataset: {packed_path}")
     
     # Create zip if requested
     if args.create_zip:
         zip_filename = f"{args.output_dir}.zip"
         print(f"📦 Creating zip file: {zip_filename}")
         
-        with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file_path in output_dir.rglob('*'):
-                if file_path.is_file():
-                    arcname = file_path.relative_to(output_dir.parent)
-                    zipf.write(file_path, arcname)
+        compression = zipfile.ZIP_DEFLATED if args.compress else zipfile.ZIP_STORED
+        with zipfile.ZipFile(zip_filename, 'w', compression) as zipf:
+            for dirpath, _, filenames in os.walk(output_dir):
+                for filename in filenames:
+                    file_path = os.path.join(dirpath, filename)
+                    zipf.write(file_path, os.path.relpath(file_path, output_dir.parent))
         
         print(f"✅ Created {zip_filename}")
     
@@ -2,5 +2,6 @@
 
 from .train_model_a import train_model_a
 from .train_model_b import train_model_b
+from .memory import choose_gradient_checkpointing
 
-__all__ = ['train_model_a', 'train_model_b']
+__all__ = ['train_model_a', 'train_model_b', 'choose_gradient_checkpointing']
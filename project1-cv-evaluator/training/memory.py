@@ -0,0 +1,55 @@
+"""Memory-based training heuristics"""
+
+import os
+from typing import Optional, Tuple
+
+import torch
+
+# Activation bytes per token, per layer, per unit of hidden size for a bf16 decoder layer
+# with fused attention (Korthikanti et al. estimate: 34 * seq * batch * hidden)
+_ACTIVATION_BYTES_PER_HIDDEN = 34
+
+# Free memory must exceed the activation estimate by this factor to drop checkpointing
+_HEADROOM = 1.5
+
+
+def estimate_activation_bytes(model_config, batch_size: int, seq_length: int) -> int:
+    """Rough activation memory of one forward/backward pass without checkpointing"""
+    return (batch_size * seq_length * model_config.hidden_size
+            * model_config.num_hidden_layers * _ACTIVATION_BYTES_PER_HIDDEN)
+
+
+def choose_gradient_checkpointing(model_config,
+                                  enabled: bool,
+                                  batch_size: int,
+                                  grad_accum_steps: int,
+                                  seq_length: int,
+                                  free_gb: Optional[float] = None) -> Tuple[bool, int, int]:
+    """Pick (gradient_checkpointing, per_device_batch, grad_accum) for the free GPU memory.
+    
+    Checkpointing recomputes activations (~10-20% step time), so it is only kept when the
+    batch would not fit without it. When it is dropped and a doubled micro-batch also fits,
+    the batch is doubled and accumulation halved, keeping the effective batch unchanged.
+    FORCE_GRAD_CKPT=1/0 overrides the decision.
+    """
+    forced = os.environ.get("FORCE_GRAD_CKPT")
+    if forced is not None:
+        return forced == "1", batch_size, grad_accum_steps
+    
+    if not enabled:
+        return False, batch_size, grad_accum_steps
+    
+    if free_gb is None:
+        if not torch.cuda.is_available():
+            return enabled, batch_size, grad_accum_steps
+        free_gb = torch.cuda.mem_get_info()[0] / 1024**3
+    free_bytes = free_gb * 1024**3
+    
+    if free_bytes < _HEADROOM * estimate_activation_bytes(model_config, batch_size, seq_length):
+        return True, batch_size, grad_accum_steps
+    
+    if (grad_accum_steps % 2 == 0 and
+            free_bytes >= _HEADROOM * estimate_activation_bytes(model_config, 2 * batch_size, seq_length)):
+        return False, 2 * batch_size, grad_accum_steps // 2
+    
+    return False, batch_size, grad_accum_steps
@@ -2,7 +2,7 @@
 
 import os
 import sys
-import json
+import orjson
 import torch
 import argparse
 from datetime import datetime
@@ -12,7 +12,9 @@ from typing import Dict, Any
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from configs.hybrid_config import HybridSystemConfig
-from data.dataset_processor import HybridDatasetProcessor
+from data.dataset_processor import (
+    HybridDatasetProcessor, save_processed_splits, load_processed_splits, processing_source
+)
 from training.train_model_a import train_model_a
 from training.train_model_b import train_model_b
 from models.hybrid_system import HybridCVEvaluationSystem
@@ -24,9 +26,11 @@ def main():
     
     # Dataset arguments
     parser.add_argument('--cv_dataset_path', type=str, default='cv_dataset',
-                       help='Path to CV dataset')
+                       help='Path to CV dataset (directory, .zip or packed .parquet)')
     parser.add_argument('--skip_dataset_creation', action='store_true',
                        help='Skip dataset creation if already exists')
+    parser.add_argument('--processed_cache_dir', type=str, default='cache/processed',
+                       help='Where processed splits are saved and reloaded from (Arrow, memory-mapped)')
     
     # Model arguments
     parser.add_argument('--model_a_steps', type=int, default=50,
@@ -48,6 +52,13 @@ def main():
     
     args = parser.parse_args()
     
+    # Route leftover FP32 matmuls/convs (e.g. LoRA adapters) to TF32 tensor cores
+    if args.use_a100:
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.set_float32_matmul_precision("high")
+        torch.backends.cudnn.benchmark = True
+    
     print("=" * 70)
     print("🚀 HYBRID CV EVALUATION SYSTEM TRAINING")
     print("=" * 70)
@@ -63,13 +74,19 @@ def main():
     os.makedirs("outputs", exist_ok=True)
     os.makedirs("checkpoints", exist_ok=True)
     
-    # Process dataset
-    if not args.skip_dataset_creation:
+    # Process dataset, reusing splits saved by an earlier run on the same files and config
+    dataset_source = processing_source(config, args.cv_dataset_path)
+    cached_splits = load_processed_splits(args.processed_cache_dir, dataset_source)
+    if cached_splits is not None:
+        args.skip_dataset_creation = True
+        model_a_train, model_a_val, model_b_train, model_b_val = cached_splits
+        print(f"⚡ Loaded processed dataset from {args.processed_cache_dir}: {len(model_a_train)} train samples")
+    elif not args.skip_dataset_creation:
         print("\n📊 Processing dataset for hybrid training...")
         processor = HybridDatasetProcessor(config)
-        model_a_train, model_a_val, model_b_train, model_b_val = processor.process_dataset(
-            args.cv_dataset_path
-        )
+        splits = processor.process_dataset(args.cv_dataset_path)
+        save_processed_splits(splits, args.processed_cache_dir, dataset_source)
+        model_a_train, model_a_val, model_b_train, model_b_val = splits
         print(f"✅ Dataset ready: {len(model_a_train)} train samples")
     else:
         print("⏭️ Skipping dataset creation")
@@ -105,7 +122,8 @@ def main():
     
     # Evaluate system
     if 'model_a_val' in locals():
-        metrics = evaluate_hybrid_system(hybrid_system, model_a_val)
+        metrics = evaluate_hybrid_system(hybrid_system, model_a_val,
+                                         trace_path="outputs/eval_trace.jsonl")
         
         print("\n📈 EVALUATION RESULTS:")
         print(f"  ✅ Success Rate: {metrics['success_rate']:.1%}")
@@ -114,8 +132,8 @@ def main():
         print(f"  🔧 Primary Method: {metrics['primary_method']}")
         
         # Save metrics
-        with open("outputs/evaluation_metrics.json", "w") as f:
-            json.dump(metrics, f, indent=2)
+        with open("outputs/evaluation_metrics.json", "wb") as f:
+            f.write(orjson.dumps(metrics, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
     
     # Save system configuration
     system_config = {
@@ -133,8 +151,8 @@ def main():
         "use_a100_optimizations": config.use_a100_optimizations
     }
     
-    with open("outputs/system_config.json", "w") as f:
-        json.dump(system_config, f, indent=2)
+    with open("outputs/system_config.json", "wb") as f:
+        f.write(orjson.dumps(system_config, option=orjson.OPT_INDENT_2))
     
     print("\n✅ Training pipeline completed successfully!")
     print("📁 Models saved in: outputs/")
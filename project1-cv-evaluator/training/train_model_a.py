@@ -1,7 +1,9 @@
 """Training script for Model A (GRPO)"""
 
+import os
 import torch
 import gc
+import functools
 from datetime import datetime
 from datasets import Dataset
 from trl import GRPOConfig, GRPOTrainer
@@ -11,6 +13,7 @@ from configs.model_configs import ModelAConfig
 from models.model_a_prose.prose_evaluator import ProseEvaluator
 from models.model_a_prose.reward_functions import MODEL_A_REWARD_FUNCTIONS
 from utils.metrics import MetricsGRPOTrainer
+from training.memory import choose_gradient_checkpointing
 
 
 def train_model_a(config: HybridSystemConfig, 
@@ -21,9 +24,10 @@ def train_model_a(config: HybridSystemConfig,
     try:
         print("🚀 Initializing Model A training...")
         
-        # Clear memory
-        torch.cuda.empty_cache()
+        # Clear memory; the allocator cache is only released on request (full block scan)
         gc.collect()
+        if config.empty_cache_on_init:
+            torch.cuda.empty_cache()
         
         # Initialize model
         model_a_config = ModelAConfig()
@@ -35,27 +39,44 @@ def train_model_a(config: HybridSystemConfig,
         # Setup LoRA
         prose_evaluator.setup_lora()
         
-        # Wrap reward functions for GRPO
+        # Wrap reward functions for GRPO. GRPOTrainer calls them with keywords only
+        # (prompts=, completions=, plus dataset columns such as ground_truth), so the
+        # config is bound once and the call goes straight through
+        safe_rewards = os.environ.get("GRPO_SAFE") == "1"
+        
         def create_grpo_wrapper(reward_func):
-            def wrapped(*args, **kwargs):
-                try:
-                    completions = args[0] if args else kwargs.get('completions', [])
-                    clean_kwargs = {k: v for k, v in kwargs.items() if k != 'completions'}
-                    clean_kwargs['config'] = config  # Pass config to reward functions
-                    return reward_func(completions, **clean_kwargs)
-                except Exception as e:
-                    print(f"❌ Reward error in {reward_func.__name__}: {e}")
-                    return [1.0] * len(args[0] if args else [])
+            wrapped = functools.partial(reward_func, config=config)
+            if safe_rewards:
+                # Debug safety net: neutral rewards instead of aborting the step
+                bound = wrapped
+                
+                def wrapped(**kwargs):
+                    try:
+                        return bound(**kwargs)
+                    except Exception as e:
+                        print(f"❌ Reward error in {reward_func.__name__}: {e}")
+                        return [1.0] * len(kwargs.get('completions', []))
             wrapped.__name__ = f"grpo_{reward_func.__name__}"
             return wrapped
         
         grpo_reward_functions = [create_grpo_wrapper(f) for f in MODEL_A_REWARD_FUNCTIONS]
         
+        # Only pay the checkpointing recompute when activations would not fit otherwise
+        gradient_checkpointing, batch_size, grad_accum_steps = choose_gradient_checkpointing(
+            prose_evaluator.model.config,
+            model_a_config.gradient_checkpointing,
+            model_a_config.per_device_train_batch_size,
+            model_a_config.gradient_accumulation_steps,
+            model_a_config.max_prompt_length + model_a_config.max_completion_length
+        )
+        print(f"🧠 Gradient checkpointing: {gradient_checkpointing} "
+              f"(batch {batch_size} x {grad_accum_steps} accumulation steps)")
+        
         # GRPO training configuration
         training_args = GRPOConfig(
             learning_rate=model_a_config.learning_rate,
-            per_device_train_batch_size=model_a_config.per_device_train_batch_size,
-            gradient_accumulation_steps=model_a_config.gradient_accumulation_steps,
+            per_device_train_batch_size=batch_size,
+            gradient_accumulation_steps=grad_accum_steps,
             num_generations=model_a_config.num_generations,
             max_steps=config.model_a_training_steps,
             max_prompt_length=model_a_config.max_prompt_length,
@@ -63,12 +84,16 @@ def train_model_a(config: HybridSystemConfig,
             output_dir="outputs/model_a",
             logging_steps=1,
             save_steps=config.checkpoint_every,
-            optim="paged_adamw_8bit",
+            # Fused CUDA AdamW unless memory pressure calls for CPU-paged 8-bit states
+            optim=("adamw_torch_fused"
+                   if model_a_config.bf16 and config.use_a100_optimizations
+                   and not model_a_config.use_paged_optimizer
+                   else "paged_adamw_8bit"),
             warmup_ratio=0.1,
             report_to="none",
             bf16=model_a_config.bf16,
             tf32=model_a_config.tf32,
-            gradient_checkpointing=model_a_config.gradient_checkpointing,
+            gradient_checkpointing=gradient_checkpointing,
             temperature=0.8,
             top_p=0.9,
         )
@@ -24,9 +24,10 @@ def train_model_b(config: HybridSystemConfig,
     try:
         print("🚀 Initializing Model B training...")
         
-        # Clear memory
-        torch.cuda.empty_cache()
+        # Clear memory; the allocator cache is only released on request (full block scan)
         gc.collect()
+        if config.empty_cache_on_init:
+            torch.cuda.empty_cache()
         
         # Initialize model
         model_b_config = ModelBConfig()
@@ -41,32 +42,40 @@ def train_model_b(config: HybridSystemConfig,
         # Prepare datasets
         print("📊 Preparing datasets for Model B...")
         
-        # Add synthetic examples for better JSON learning
-        synthetic_examples = create_synthetic_json_examples(200)
+        # Add synthetic examples for better JSON learning (seeded, so the tokenization cache stays valid)
+        synthetic_examples = create_synthetic_json_examples(200, seed=config.random_seed)
         synthetic_dataset = Dataset.from_list(synthetic_examples)
         
-        # Combine with training data
-        combined_train = concatenate_datasets([train_dataset, synthetic_dataset])
-        
-        # Tokenize datasets
-        tokenized_train = prepare_model_b_dataset(
-            combined_train, 
-            json_converter.tokenizer,
-            model_b_config.max_seq_length
-        )
-        
-        tokenized_val = prepare_model_b_dataset(
-            val_dataset,
+        # Tokenize train, synthetic and validation rows in one pass, then split back
+        columns = ["prompt", "completion"]
+        combined = concatenate_datasets([
+            train_dataset.select_columns(columns),
+            synthetic_dataset,
+            val_dataset.select_columns(columns)
+        ])
+        tokenized = prepare_model_b_dataset(
+            combined,
             json_converter.tokenizer,
             model_b_config.max_seq_length
         )
+        num_train = len(train_dataset) + len(synthetic_dataset)
+        tokenized_train = tokenized.select(range(num_train))
+        tokenized_val = tokenized.select(range(num_train, len(tokenized)))
         
         # Set format for PyTorch
         tokenized_train.set_format("torch")
         tokenized_val.set_format("torch")
         
+        # Compiled training wants few distinct shapes: pad batches to 128-token buckets
+        compile_model = config.use_a100_optimizations and torch.cuda.is_available()
+        if compile_model:
+            torch._dynamo.config.cache_size_limit = 64
+        
         # Data collator
-        data_collator = get_data_collator(json_converter.tokenizer)
+        data_collator = get_data_collator(
+            json_converter.tokenizer,
+            pad_to_multiple_of=128 if compile_model else 8
+        )
         
         # Training arguments
         training_args = TrainingArguments(
@@ -86,12 +95,16 @@ def train_model_b(config: HybridSystemConfig,
             report_to="none",
             remove_unused_columns=False,
             dataloader_num_workers=model_b_config.dataloader_num_workers,
-            dataloader_pin_memory=True,
+            # Pinned staging and long-lived workers only pay off with background loader workers
+            dataloader_pin_memory=model_b_config.dataloader_num_workers > 0,
+            dataloader_persistent_workers=model_b_config.dataloader_num_workers > 0,
             evaluation_strategy="steps",
             eval_steps=100,
             save_strategy="steps",
             load_best_model_at_end=True,
             metric_for_best_model="loss",
+            torch_compile=compile_model,
+            torch_compile_mode="reduce-overhead" if compile_model else None,
         )
         
         # Create trainer
@@ -1,7 +1,13 @@
 """Utilities module for hybrid CV evaluation system"""
 
 from .extraction import extract_json_from_prose_improved
-from .validation import validate_evaluation_output, validate_cv_output
+from .validation import (
+    validate_evaluation_output,
+    validate_evaluation_batch,
+    evaluation_columns,
+    validate_cv_output
+)
+from .generation import JSONBalancedStop
 from .metrics import (
     evaluate_hybrid_system,
     calculate_criteria_coverage,
@@ -11,8 +17,11 @@ from .metrics import (
 __all__ = [
     'extract_json_from_prose_improved',
     'validate_evaluation_output',
+    'validate_evaluation_batch',
+    'evaluation_columns',
     'validate_cv_output',
     'evaluate_hybrid_system',
     'calculate_criteria_coverage',
-    'MetricsGRPOTrainer'
+    'MetricsGRPOTrainer',
+    'JSONBalancedStop'
 ]
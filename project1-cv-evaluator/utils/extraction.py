@@ -3,71 +3,140 @@
 """Extraction utilities for converting prose to structured data"""
 
 import re
-import random
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import hyperscan
+except ImportError:  # hyperscan is optional; the pattern is then searched with re alone
+    hyperscan = None
+
+_SEP = r"[\s_\-]*"
+_SEP_RE = re.compile(r"[\s_\-]+")
+
+_RECOMMENDATIONS = ('strong_no_hire', 'strong_hire', 'lean_hire', 'no_hire', 'hire')  # longest first
+
+# Total score and recommendation alternatives shared by every scan pattern
+_TOTAL_KEYWORDS = r"total|overall"
+_TOTAL_AND_REC = (
+    r"(?:" + _TOTAL_KEYWORDS + r")(?:" + _SEP + r"score)?[:\s]*(?P<total>[0-9]+)(?!/10)"
+    r"|recommendation[:\s]*(?P<rec>" + "|".join(rec.replace('_', _SEP) for rec in _RECOMMENDATIONS) + ")"
+)
+
+
+def _normalize(name: str) -> str:
+    """'Technical Skills' / 'technical-skills' -> 'technical_skills'"""
+    return _SEP_RE.sub('_', name.strip().lower())
+
+
+@lru_cache(maxsize=None)
+def _scan_pattern(criteria: Tuple[str, ...]) -> re.Pattern:
+    """One pattern matching '<criterion> ... N/10', 'Total Score: N' and 'Recommendation: X'.
+    
+    The gap between a criterion name and its score may hold up to 80 non-digit
+    characters but never another criterion name, so a criterion without a score
+    cannot take its neighbour's.
+    """
+    names = "|".join(_criterion_names(criteria))
+    return re.compile(
+        f"(?P<crit>{names})(?:(?!{names})\\D){{0,80}}?(?P<score>[0-9]+)/10|{_TOTAL_AND_REC}",
+        re.IGNORECASE
+    )
+
+
+def _criterion_names(criteria: Tuple[str, ...]) -> List[str]:
+    """'technical_skills' -> 'technical<sep>skills' for each criterion"""
+    return [_SEP.join(map(re.escape, criterion.split('_'))) for criterion in criteria]
+
+
+@lru_cache(maxsize=None)
+def _anchor_database(criteria: Tuple[str, ...]):
+    """Hyperscan database of the literals every scan-pattern match starts with.
+    
+    Ids 0..n-1 are the criteria, n the total score and n+1 the recommendation.
+    """
+    expressions = _criterion_names(criteria) + [_TOTAL_KEYWORDS, "recommendation"]
+    database = hyperscan.Database()
+    database.compile(
+        expressions=[expression.encode() for expression in expressions],
+        ids=list(range(len(expressions))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * len(expressions)
+    )
+    return database
+
+
+_scratch = threading.local()
+
+
+def _iter_scan_matches(pattern: re.Pattern, criteria: Tuple[str, ...], text: str):
+    """Same matches as pattern.finditer(text), with match starts found by Hyperscan.
+    
+    Every alternative of the scan pattern begins with a criterion name or a total /
+    recommendation keyword, so Hyperscan locates those in one linear pass and re only
+    runs an anchored match at each candidate start instead of trying every offset.
+    """
+    # Hyperscan reports byte offsets, which only equal str offsets for ASCII text
+    if hyperscan is None or not text.isascii():
+        yield from pattern.finditer(text)
+        return
+    
+    database = _anchor_database(criteria)
+    scratches = getattr(_scratch, 'by_db', None)
+    if scratches is None:
+        scratches = _scratch.by_db = {}
+    scratch = scratches.get(id(database))
+    if scratch is None:
+        scratch = scratches[id(database)] = hyperscan.Scratch(database)
+    
+    starts = set()
+    
+    def on_match(pattern_id, start, end, flags, context):
+        starts.add(start)
+    
+    database.scan(text.encode('ascii'), match_event_handler=on_match, scratch=scratch)
+    
+    # Non-overlapping, left to right: the same walk finditer does
+    position = 0
+    for start in sorted(starts):
+        if start < position:
+            continue
+        match = pattern.match(text, start)
+        if match:
+            position = match.end()
+            yield match
 
 
 def extract_json_from_prose_improved(prose_text: str, 
                                    evaluation_criteria: Dict[str, str]) -> Dict[str, Any]:
     """Improved extraction with better score parsing"""
+    start_ns = time.perf_counter_ns()
     try:
         result = {}
         
         # Clean text
         prose_text = prose_text.replace('<pad>', ' ')
         
-        # Extract scores for each criterion
-        for criterion in evaluation_criteria.keys():
-            base_name = criterion.replace('_', ' ')
-            
-            # Multiple patterns for robustness
-            patterns = [
-                f"{base_name}.*?score.*?:\\s*([0-9]+)/10",
-                f"{base_name}.*?:\\s*([0-9]+)/10",
-                f"{base_name}[\\s\\-]*([0-9]+)/10",
-                f"{base_name.upper()}.*?([0-9]+)/10",
-                f"{criterion.upper()}.*?([0-9]+)/10",
-            ]
-            
-            score = None
-            for pattern in patterns:
-                match = re.search(pattern, prose_text, re.IGNORECASE | re.DOTALL)
-                if match:
-                    score_match = re.search(r'([0-9]+)/10', match.group(0))
-                    if score_match:
-                        potential_score = int(score_match.group(1))
-                        if 1 <= potential_score <= 10:
-                            score = potential_score
-                            break
-            
-            if score is not None:
-                result[criterion] = score
-        
-        # Extract total score
-        total_patterns = [
-            r"Total Score[:\\s]*([0-9]+)",
-            r"Total[:\\s]*([0-9]+)",
-            r"Overall Score[:\\s]*([0-9]+)",
-        ]
-        
-        for pattern in total_patterns:
-            match = re.search(pattern, prose_text, re.IGNORECASE)
-            if match:
-                total = int(match.group(1))
-                if 10 <= total <= 100:
+        # One left-to-right pass: the first valid value of each field wins
+        criteria = tuple(evaluation_criteria)
+        scores = {}
+        for match in _iter_scan_matches(_scan_pattern(criteria), criteria, prose_text):
+            kind = match.lastgroup
+            if kind == 'score':
+                criterion = _normalize(match.group('crit'))
+                score = int(match.group('score'))
+                if 1 <= score <= 10 and criterion not in scores:
+                    scores[criterion] = score
+            elif kind == 'total':
+                total = int(match.group('total'))
+                if 10 <= total <= 100 and 'total_score' not in result:
                     result['total_score'] = total
-                    break
-        
-        # Extract recommendation
-        valid_recommendations = [
-            'strong_hire', 'hire', 'lean_hire', 'no_hire', 'strong_no_hire'
-        ]
+            elif 'recommendation' not in result:
+                result['recommendation'] = _normalize(match.group('rec'))
         
-        for rec in valid_recommendations:
-            rec_pattern = rec.replace('_', '[\\s_\\-]?')
-            if re.search(f"Recommendation[:\\s]*{rec_pattern}", prose_text, re.IGNORECASE):
-                result['recommendation'] = rec
-                break
+        # Criteria in config order, ahead of the other fields
+        result = {**{c: scores[c] for c in criteria if c in scores}, **result}
         
         # Extract strengths and improvements (simplified)
         if "Key Strengths:" in prose_text:
@@ -80,7 +149,7 @@ def extract_json_from_prose_improved(prose_text: str,
         else:
             result['areas_for_improvement'] = ["Further development needed"]
         
-        result['processing_time_ms'] = random.randint(800, 1500)
+        result['processing_time_ms'] = (time.perf_counter_ns() - start_ns) // 1_000_000
         
         return result
         
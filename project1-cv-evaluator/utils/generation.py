@@ -0,0 +1,45 @@
+"""Generation helpers shared by the Model B inference paths"""
+
+from functools import lru_cache
+from typing import Tuple
+import torch
+from transformers import StoppingCriteria
+
+
+@lru_cache(maxsize=None)
+def _brace_tables(tokenizer, vocab_size: int) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Per token id: net brace depth change ('{' minus '}') and whether it opens a brace"""
+    opens = torch.zeros(vocab_size, dtype=torch.int32)
+    closes = torch.zeros(vocab_size, dtype=torch.int32)
+    for token_id, token in enumerate(tokenizer.convert_ids_to_tokens(list(range(len(tokenizer))))):
+        if token and token_id < vocab_size:
+            opens[token_id] = token.count('{')
+            closes[token_id] = token.count('}')
+    return opens - closes, opens > 0
+
+
+class JSONBalancedStop(StoppingCriteria):
+    """Stop each row once the braces it generated balance out, i.e. the JSON object is complete.
+    
+    Brace counts come from a per-token lookup table, so each step is two gathers on the
+    device rather than a decode per row.
+    """
+    
+    def __init__(self, tokenizer, vocab_size: int):
+        self.delta, self.opens = _brace_tables(tokenizer, vocab_size)
+        self.depth = None
+        self.opened = None
+    
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        last = input_ids[:, -1]
+        if self.depth is None:
+            # First call sees the first generated token; prompt braces are never counted
+            self.delta = self.delta.to(last.device)
+            self.opens = self.opens.to(last.device)
+            self.depth = torch.zeros(last.shape[0], dtype=torch.int32, device=last.device)
+            self.opened = torch.zeros(last.shape[0], dtype=torch.bool, device=last.device)
+        self.depth += self.delta[last]
+        # Stray closing braces before the first "{" must not leave the row owing depth
+        self.depth = torch.where(self.opened, self.depth, self.depth.clamp(min=0))
+        self.opened |= self.opens[last]
+        return self.opened & (self.depth <= 0)
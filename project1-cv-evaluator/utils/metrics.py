@@ -1,8 +1,11 @@
 """Metrics and evaluation utilities"""
 
+import io
+import sys
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from collections import Counter
+from collections import defaultdict
+import orjson
 import torch
 from trl import GRPOTrainer
 
@@ -15,6 +18,7 @@ class MetricsGRPOTrainer(GRPOTrainer):
         self.step_metrics = []
         self.detailed_logging = True
         self.actual_step_count = 0
+        self._total_gpu_memory = None
     
     def log(self, logs, start_time=None):
         super().log(logs, start_time)
@@ -26,122 +30,131 @@ class MetricsGRPOTrainer(GRPOTrainer):
         step = logs.get('step', self.actual_step_count)
         self.actual_step_count = max(self.actual_step_count, step)
         
-        print(f"\n" + "="*70)
-        print(f"📊 STEP {step} METRICS")
-        print(f"⏰ {datetime.now().strftime('%H:%M:%S')}")
-        print("="*70)
+        # Categorize metrics in one pass over the logs
+        numeric = {}
+        loss_metrics = {}
+        reward_metrics = {}
+        lr_metrics = {}
+        
+        for key, value in logs.items():
+            if not isinstance(value, (int, float)):
+                continue
+            numeric[key] = value
+            lowered = key.lower()
+            if 'loss' in lowered:
+                loss_metrics[key] = value
+            elif 'reward' in lowered:
+                reward_metrics[key] = value
+            elif 'lr' in lowered or 'learning' in lowered:
+                lr_metrics[key] = value
+        
+        # Store metrics
+        self.step_metrics.append({
+            'step': step,
+            'metrics': numeric,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+        # The banner is only printed every 10 logging intervals
+        if step % max(1, self.args.logging_steps * 10) != 0:
+            return
+        
+        buf = io.StringIO()
+        write = buf.write
+        write(f"\n{'=' * 70}\n📊 STEP {step} METRICS\n⏰ {datetime.now().strftime('%H:%M:%S')}\n{'=' * 70}\n")
         
         # Progress bar
         progress = (step / self.args.max_steps) * 100 if self.args.max_steps > 0 else 0
         bar_length = 30
         filled_length = int(bar_length * progress // 100)
         bar = "█" * filled_length + "░" * (bar_length - filled_length)
-        print(f"📈 Progress: [{bar}] {progress:.1f}% ({step}/{self.args.max_steps})")
-        
-        # Categorize metrics
-        loss_metrics = {}
-        reward_metrics = {}
-        lr_metrics = {}
-        
-        for key, value in logs.items():
-            if isinstance(value, (int, float)):
-                if 'loss' in key.lower():
-                    loss_metrics[key] = value
-                elif 'reward' in key.lower():
-                    reward_metrics[key] = value
-                elif 'lr' in key.lower() or 'learning' in key.lower():
-                    lr_metrics[key] = value
+        write(f"📈 Progress: [{bar}] {progress:.1f}% ({step}/{self.args.max_steps})\n")
         
         # Display metrics
         if loss_metrics:
-            print(f"\n📉 LOSS METRICS:")
+            write("\n📉 LOSS METRICS:\n")
             for key, value in loss_metrics.items():
-                print(f"  {key}: {value:.6f}")
+                write(f"  {key}: {value:.6f}\n")
         
         if reward_metrics:
-            print(f"\n🏆 REWARD METRICS:")
+            write("\n🏆 REWARD METRICS:\n")
             for key, value in reward_metrics.items():
-                print(f"  {key}: {value:.6f}")
+                write(f"  {key}: {value:.6f}\n")
             
             # Show reward summary
-            total_rewards = sum(reward_metrics.values())
-            avg_reward = total_rewards / len(reward_metrics) if reward_metrics else 0
-            print(f"  📊 Average reward: {avg_reward:.3f}")
+            avg_reward = sum(reward_metrics.values()) / len(reward_metrics)
+            write(f"  📊 Average reward: {avg_reward:.3f}\n")
         
         if lr_metrics:
-            print(f"\n📈 LEARNING RATE:")
+            write("\n📈 LEARNING RATE:\n")
             for key, value in lr_metrics.items():
-                print(f"  {key}: {value:.2e}")
+                write(f"  {key}: {value:.2e}\n")
         
         # Memory monitoring
         if torch.cuda.is_available():
-            memory_used = torch.cuda.memory_allocated(0) / 1024**3
+            if self._total_gpu_memory is None:
+                self._total_gpu_memory = torch.cuda.get_device_properties(0).total_memory
+            memory_used = torch.cuda.memory_allocated(0)
             memory_reserved = torch.cuda.memory_reserved(0) / 1024**3
-            memory_pct = (memory_used / torch.cuda.get_device_properties(0).total_memory * 1024**3) * 100
+            memory_pct = memory_used / self._total_gpu_memory * 100
             
-            print(f"\n🔋 GPU MEMORY:")
-            print(f"  Used: {memory_used:.1f}GB ({memory_pct:.1f}%)")
-            print(f"  Reserved: {memory_reserved:.1f}GB")
+            write(f"\n🔋 GPU MEMORY:\n  Used: {memory_used / 1024**3:.1f}GB ({memory_pct:.1f}%)\n"
+                  f"  Reserved: {memory_reserved:.1f}GB\n")
         
-        # Store metrics
-        self.step_metrics.append({
-            'step': step,
-            'metrics': {k: v for k, v in logs.items() if isinstance(v, (int, float))},
-            'timestamp': datetime.now().isoformat()
-        })
+        write("=" * 70 + "\n")
         
-        print("="*70)
+        # One write per report instead of one print per line
+        sys.stdout.write(buf.getvalue())
 
 
-def evaluate_hybrid_system(system, test_dataset, num_samples: int = 20) -> Dict[str, Any]:
+def evaluate_hybrid_system(system, test_dataset, num_samples: int = 20,
+                           detailed_sample_cap: int = 20,
+                           trace_path: Optional[str] = None) -> Dict[str, Any]:
     """Evaluate the hybrid CV evaluation system"""
     
     print(f"📊 Evaluating hybrid system on {num_samples} samples...")
     
-    results = []
-    processing_times = []
-    criteria_coverage = []
-    methods_used = []
+    # Pull the prompt column once and keep only the CV text after the instruction
+    num_samples = min(num_samples, len(test_dataset))
+    prompts = test_dataset.select(range(num_samples))['prompt']
+    cv_texts = [prompt.rsplit("Evaluate this CV:", 1)[-1].strip() for prompt in prompts]
     
-    for i in range(min(num_samples, len(test_dataset))):
-        sample = test_dataset[i]
-        
-        # Extract CV text
-        cv_text = sample['prompt'].split("Evaluate this CV:")[-1].strip()
-        
-        # Evaluate
-        result = system.evaluate_cv(cv_text)
-        results.append(result)
-        
-        # Collect metrics
+    # Evaluate in padded batches instead of one generate() per CV
+    results = system.batch_evaluate(cv_texts)
+    
+    # Collect every metric in one pass over the results
+    criteria = system.config.evaluation_criteria.keys()
+    criteria_total = len(criteria)
+    successful = 0
+    time_sum = 0
+    coverage_sum = 0.0
+    method_counts = defaultdict(int)
+    for result in results:
         if 'error' not in result:
-            processing_times.append(result.get('processing_time_ms', 0))
-            
+            successful += 1
+            time_sum += result.get('processing_time_ms', 0)
             # Count criteria extracted
-            criteria_found = len([k for k in result.keys() 
-                                if k in system.config.evaluation_criteria])
-            criteria_total = len(system.config.evaluation_criteria)
-            criteria_coverage.append(criteria_found / criteria_total)
-            
-            methods_used.append(result.get('pipeline_method', 'unknown'))
+            coverage_sum += len(result.keys() & criteria) / criteria_total
+            method_counts[result.get('pipeline_method', 'unknown')] += 1
+    
+    # Optional full trace, one compact JSON object per line
+    if trace_path:
+        with open(trace_path, 'wb') as f:
+            f.writelines(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE) for result in results)
     
     # Calculate summary metrics
-    successful = sum(1 for r in results if 'error' not in r)
     success_rate = successful / len(results) if results else 0
-    
-    # Method distribution
-    method_counter = Counter(methods_used)
-    primary_method = method_counter.most_common(1)[0][0] if method_counter else 'unknown'
+    primary_method = max(method_counts, key=method_counts.get) if method_counts else 'unknown'
     
     metrics = {
         'total_samples': len(results),
         'successful': successful,
         'success_rate': success_rate,
-        'avg_processing_time': sum(processing_times) / len(processing_times) if processing_times else 0,
-        'avg_criteria_coverage': sum(criteria_coverage) / len(criteria_coverage) if criteria_coverage else 0,
+        'avg_processing_time': time_sum / successful if successful else 0,
+        'avg_criteria_coverage': coverage_sum / successful if successful else 0,
         'primary_method': primary_method,
-        'method_distribution': dict(method_counter),
-        'detailed_results': results
+        'method_distribution': dict(method_counts),
+        'detailed_results': results[:detailed_sample_cap]  # Bounded sample; see trace_path for all
     }
     
     return metrics
@@ -1,8 +1,29 @@
 """Validation utilities for CV evaluation outputs"""
 
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple, FrozenSet
+import numpy as np
 from configs.hybrid_config import HybridSystemConfig
 
+_EXTRA_FIELDS = ('key_strengths', 'areas_for_improvement', 'processing_time_ms')
+_REQUIRED_BASE = ('total_score', 'recommendation') + _EXTRA_FIELDS
+
+# Used by validate_cv_output instead of building a config per call
+_DEFAULT_CONFIG = HybridSystemConfig()
+
+
+@lru_cache(maxsize=None)
+def _required_fields(criteria: Tuple[str, ...]) -> Tuple[Tuple[str, ...], FrozenSet[str], FrozenSet[str]]:
+    """Required fields in report order, the same names as a set, and the criteria as a set"""
+    required = criteria + _REQUIRED_BASE
+    return required, frozenset(required), frozenset(criteria)
+
+
+@lru_cache(maxsize=None)
+def _recommendation_set(recommendations: Tuple[str, ...]) -> FrozenSet[str]:
+    """Valid recommendations as a set for O(1) membership"""
+    return frozenset(recommendations)
+
 
 def validate_evaluation_output(result: Dict[str, Any], 
                               config: HybridSystemConfig) -> Dict[str, Any]:
@@ -24,28 +45,26 @@ def validate_evaluation_output(result: Dict[str, Any],
         validation_result['errors'].append(f"Error in result: {result['error']}")
         return validation_result
     
-    # Check required fields
-    required_fields = list(config.evaluation_criteria.keys()) + [
-        'total_score', 'recommendation', 'key_strengths', 
-        'areas_for_improvement', 'processing_time_ms'
-    ]
+    # Check required fields (set difference; the ordered list is only built when reporting)
+    criteria = tuple(config.evaluation_criteria)
+    required_fields, required_set, criteria_set = _required_fields(criteria)
     
-    missing_fields = [field for field in required_fields if field not in result]
-    if missing_fields:
+    if not required_set <= result.keys():
+        missing_fields = [field for field in required_fields if field not in result]
         validation_result['format_valid'] = False
         validation_result['errors'].append(f"Missing required fields: {missing_fields}")
     
     # Check criteria coverage
-    criteria_found = [k for k in result.keys() if k in config.evaluation_criteria]
-    validation_result['criteria_coverage'] = len(criteria_found) / len(config.evaluation_criteria)
+    num_found = len(result.keys() & criteria_set)
+    validation_result['criteria_coverage'] = num_found / len(criteria)
     
-    if len(criteria_found) < 5:
+    if num_found < 5:
         validation_result['warnings'].append(
-            f"Low criteria coverage: {len(criteria_found)}/{len(config.evaluation_criteria)}"
+            f"Low criteria coverage: {num_found}/{len(criteria)}"
         )
     
     # Validate scores
-    for criterion in config.evaluation_criteria.keys():
+    for criterion in criteria:
         if criterion in result:
             score = result[criterion]
             if not isinstance(score, (int, float)) or not (1 <= score <= 10):
@@ -63,7 +82,7 @@ def validate_evaluation_output(result: Dict[str, Any],
             )
         
         # Check consistency
-        individual_sum = sum(result.get(k, 0) for k in config.evaluation_criteria.keys())
+        individual_sum = sum(result.get(k, 0) for k in criteria)
         if abs(individual_sum - total) > 5:
             validation_result['warnings'].append(
                 f"Total score inconsistency: sum={individual_sum}, total={total}"
@@ -71,7 +90,7 @@ def validate_evaluation_output(result: Dict[str, Any],
     
     # Validate recommendation
     if 'recommendation' in result:
-        if result['recommendation'] not in config.valid_recommendations:
+        if result['recommendation'] not in _recommendation_set(tuple(config.valid_recommendations)):
             validation_result['recommendation_valid'] = False
             validation_result['errors'].append(
                 f"Invalid recommendation: {result['recommendation']}"
@@ -94,10 +113,84 @@ def validate_evaluation_output(result: Dict[str, Any],
     return validation_result
 
 
+def evaluation_columns(results: List[Dict[str, Any]],
+                       config: HybridSystemConfig) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Struct-of-arrays view of evaluation results.
+    
+    Returns criterion scores (N, K) and total scores (N,) as floats, NaN where
+    missing or non-numeric, and recommendation ids (N,) indexing
+    config.valid_recommendations, -1 where missing or invalid. Error results
+    are left entirely missing.
+    """
+    criteria = tuple(config.evaluation_criteria)
+    rec_ids = {rec: i for i, rec in enumerate(config.valid_recommendations)}
+    
+    n = len(results)
+    scores = np.full((n, len(criteria)), np.nan)
+    totals = np.full(n, np.nan)
+    recs = np.full(n, -1, dtype=np.int8)
+    
+    for i, result in enumerate(results):
+        if 'error' in result:
+            continue
+        for j, criterion in enumerate(criteria):
+            score = result.get(criterion)
+            if isinstance(score, (int, float)):
+                scores[i, j] = score
+        total = result.get('total_score')
+        if isinstance(total, (int, float)):
+            totals[i] = total
+        rec = result.get('recommendation')
+        if isinstance(rec, str):
+            recs[i] = rec_ids.get(rec, -1)
+    
+    return scores, totals, recs
+
+
+def validate_evaluation_batch(results: List[Dict[str, Any]],
+                              config: HybridSystemConfig,
+                              columns: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+                              ) -> List[Dict[str, Any]]:
+    """Validate many results at once (same output as validate_evaluation_output per result)"""
+    scores, totals, recs = columns if columns is not None else evaluation_columns(results, config)
+    criteria = tuple(config.evaluation_criteria)
+    
+    # Vectorized checks; NaN (missing) compares False so those rows take the slow path
+    complete = (((scores >= 1) & (scores <= 10)).all(axis=1)
+                & (totals >= 10) & (totals <= 100) & (recs >= 0))
+    inconsistent = np.abs(scores.sum(axis=1) - totals) > 5
+    
+    validations = []
+    for result, ok, warn in zip(results, complete.tolist(), inconsistent.tolist()):
+        if not (ok and all(field in result for field in _EXTRA_FIELDS)
+                and isinstance(result['key_strengths'], list)
+                and isinstance(result['areas_for_improvement'], list)):
+            validations.append(validate_evaluation_output(result, config))
+            continue
+        
+        warnings = []
+        if warn:
+            individual_sum = sum(result[k] for k in criteria)
+            warnings.append(
+                f"Total score inconsistency: sum={individual_sum}, total={result['total_score']}"
+            )
+        
+        validations.append({
+            'valid': True,
+            'errors': [],
+            'warnings': warnings,
+            'criteria_coverage': 1.0,
+            'format_valid': True,
+            'scores_valid': True,
+            'recommendation_valid': True
+        })
+    
+    return validations
+
+
 def validate_cv_output(result: Dict[str, Any]) -> Dict[str, Any]:
     """Simple validation function for backwards compatibility"""
-    config = HybridSystemConfig()
-    validation = validate_evaluation_output(result, config)
+    validation = validate_evaluation_output(result, _DEFAULT_CONFIG)
     
     return {
         'valid': validation['valid'],
@@ -4,25 +4,112 @@ Flask application that exposes the LangGraph Map-Reduce functionality.
 Provides a REST API endpoint for sum of squares calculation.
 """
 
+import logging
+import os
 import time
-from flask import Flask, request, jsonify
-from langgraph_mapreduce import run_mapreduce
+from dataclasses import dataclass
+import orjson
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import JSONProvider
+from langgraph_mapreduce import DIRECT_MAX_LENGTH, run_direct, run_mapreduce
+
+
+class OrJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (keys keep insertion order, NumPy values serialize natively)."""
+    
+    option = orjson.OPT_SERIALIZE_NUMPY
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of round-tripping through str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=self.option), mimetype="application/json"
+        )
+
+
+# Bodies up to this size go out in one buffered write; larger ones are streamed in chunks
+STREAM_THRESHOLD = 64 * 1024
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def _chunk_iter(body: bytes, chunk_size: int):
+    """Yield an encoded body in fixed-size byte chunks."""
+    for start in range(0, len(body), chunk_size):
+        yield body[start:start + chunk_size]
+
+
+def smart_jsonify(obj, status: int = 200) -> Response:
+    """Encode once with orjson; buffer small bodies, stream large ones."""
+    body = orjson.dumps(obj, option=OrJSONProvider.option)
+    if len(body) < STREAM_THRESHOLD:
+        return Response(body, status=status, mimetype='application/json')
+    # The size is known up front, so declare it: the body streams without chunked framing
+    return Response(_chunk_iter(body, STREAM_CHUNK_SIZE), status=status, mimetype='application/json',
+                    headers={'Content-Length': str(len(body))})
+
+
+@dataclass
+class SumOfSquaresResponse:
+    """POST /sum_of_squares body (fixed slots; orjson serializes dataclasses without a dict)."""
+    __slots__ = ('sum_of_squares', 'length', 'execution_time', 'numbers_processed', 'api_response_time')
+    sum_of_squares: int
+    length: int
+    execution_time: float
+    numbers_processed: int
+    api_response_time: float
+
+
+# WARNING by default keeps per-request and per-node logging off stdout; LOG_LEVEL=DEBUG to trace
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'WARNING').upper(), format='%(message)s')
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.json = OrJSONProvider(app)
+
+# Configuration: responses are compact and keep key insertion order (see OrJSONProvider).
+# JSON_SORT_KEYS / JSONIFY_PRETTYPRINT_REGULAR are not read by Flask >= 2.3 JSON providers.
 
-# Configuration
-app.config['JSON_SORT_KEYS'] = False
-app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
+
+# Static payloads encoded once at import; /health only appends the timestamp per call
+_HEALTH_PREFIX = orjson.dumps({
+    "status": "healthy",
+    "service": "LangGraph Map-Reduce API"
+})[:-1] + b',"timestamp":'
+
+_INFO_BODY = orjson.dumps({
+    "endpoint": "/sum_of_squares",
+    "method": "POST",
+    "description": "Calculate sum of squares using LangGraph Map-Reduce",
+    "example_request": {
+        "length": 100
+    },
+    "example_response": {
+        "sum_of_squares": 123456,
+        "length": 100,
+        "execution_time": 0.1234,
+        "numbers_processed": 100,
+        "api_response_time": 0.0056
+    },
+    "constraints": {
+        "length": {
+            "type": "integer",
+            "min": 1,
+            "max": 10000
+        }
+    }
+})
 
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({
-        "status": "healthy",
-        "service": "LangGraph Map-Reduce API",
-        "timestamp": time.time()
-    })
+    return Response(_HEALTH_PREFIX + orjson.dumps(time.time()) + b'}', mimetype='application/json')
 
 
 @app.route('/sum_of_squares', methods=['POST'])
@@ -83,27 +170,30 @@ def calculate_sum_of_squares():
             }), 400
         
         # Log the request
-        print(f"🌐 API Request: POST /sum_of_squares with length={length}")
+        logger.info("🌐 API Request: POST /sum_of_squares with length=%d", length)
         
-        # Execute the LangGraph map-reduce
+        # Execute the LangGraph map-reduce (tiny lengths skip the graph)
         start_time = time.time()
-        result = run_mapreduce(length)
+        if length <= DIRECT_MAX_LENGTH:
+            result = run_direct(length)
+        else:
+            result = run_mapreduce(length)
         end_time = time.time()
         
         # Prepare response
-        response = {
-            "sum_of_squares": result["sum_of_squares"],
-            "length": result["length"],
-            "execution_time": round(result["execution_time"], 4),
-            "numbers_processed": result["numbers_processed"],
-            "api_response_time": round(end_time - start_time, 4)
-        }
+        response = SumOfSquaresResponse(
+            sum_of_squares=result.sum_of_squares,
+            length=result.length,
+            execution_time=round(result.execution_time, 4),
+            numbers_processed=result.numbers_processed,
+            api_response_time=round(end_time - start_time, 4)
+        )
         
-        print(f"✅ API Response: sum_of_squares={response['sum_of_squares']}")
-        return jsonify(response), 200
+        logger.info("✅ API Response: sum_of_squares=%d", response.sum_of_squares)
+        return smart_jsonify(response)
         
     except Exception as e:
-        print(f"❌ API Error: {str(e)}")
+        logger.error("❌ API Error: %s", e)
         return jsonify({
             "error": f"Internal server error: {str(e)}"
         }), 500
@@ -112,28 +202,7 @@ def calculate_sum_of_squares():
 @app.route('/sum_of_squares', methods=['GET'])
 def sum_of_squares_info():
     """Provide information about the sum_of_squares endpoint."""
-    return jsonify({
-        "endpoint": "/sum_of_squares",
-        "method": "POST",
-        "description": "Calculate sum of squares using LangGraph Map-Reduce",
-        "example_request": {
-            "length": 100
-        },
-        "example_response": {
-            "sum_of_squares": 123456,
-            "length": 100,
-            "execution_time": 0.1234,
-            "numbers_processed": 100,
-            "api_response_time": 0.0056
-        },
-        "constraints": {
-            "length": {
-                "type": "integer",
-                "min": 1,
-                "max": 10000
-            }
-        }
-    })
+    return Response(_INFO_BODY, mimetype='application/json')
 
 
 @app.errorhandler(404)
@@ -170,4 +239,10 @@ if __name__ == '__main__':
     print("        -d '{\"length\": 10}'")
     print("\n" + "="*50)
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # The Werkzeug dev server (single process, reloader) is opt-in; serve production traffic with gunicorn
+    if os.environ.get('FLASK_DEBUG') == '1':
+        app.run(debug=True, host='0.0.0.0', port=5000)
+    else:
+        print("⚠️  Dev server disabled. Run with FLASK_DEBUG=1, or in production:")
+        print("   gunicorn -w $(nproc) -k gthread --threads 4 -b 0.0.0.0:5000 app:app")
+
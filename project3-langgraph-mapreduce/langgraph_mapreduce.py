@@ -1,32 +1,78 @@
 #!/usr/bin/env python3
 """
 LangGraph Map-Reduce implementation for sum of squares calculation.
-Uses Send API for parallel execution of mapper nodes.
+Uses the Send API to fan out a few bucketed mappers: each squares and sums
+one shard of the numbers in a compiled loop (Numba when available, NumPy
+otherwise) and the reducer adds up the partial sums.
 Based on the Medium tutorial pattern.
 """
 
+import functools
+import logging
 import operator
-import random
+import os
+import queue
+import threading
 import time
+from concurrent.futures import Future
+from dataclasses import dataclass
 from typing import Annotated, List, Dict, Any, TypedDict
+import numpy as np
 from langgraph.graph import StateGraph, START, END
-from langgraph.constants import Send
+from langgraph.types import Send
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the NumPy square+sum below is used instead
+    njit = None
+
+# Node progress is logged at DEBUG; stays silent (no stdout writes) at the default WARNING level
+logger = logging.getLogger(__name__)
+
+if njit is not None:
+    # Explicit signature: compiled eagerly at import (and cached on disk), not on first request.
+    # int64[::1] (C-contiguous) lets LLVM emit a unit-stride vectorized loop.
+    # Serial on purpose: parallelism comes from the mapper shards, which LangGraph runs on
+    # worker threads (nogil lets them overlap). parallel=True would nest a Numba thread pool
+    # per worker process and is not safe to enter concurrently under the workqueue layer.
+    @njit('int64(int64[::1])', cache=True, nogil=True)
+    def _sum_of_squares(numbers):
+        """Sum of squares as one vectorized loop"""
+        total = 0
+        for i in range(numbers.shape[0]):
+            total += numbers[i] * numbers[i]
+        return total
+else:
+    def _sum_of_squares(numbers: np.ndarray) -> np.int64:
+        """Sum of squares with NumPy (square then sum, each one C loop)"""
+        return np.square(numbers).sum()
 
 
 # Define the overall state that flows through the main graph
 class OverallState(TypedDict):
-    """Main state passed through the graph."""
+    """
+    Main state passed through the graph.
+    numbers is one int64 ndarray (a single object for LangGraph to copy and the GC
+    to trace); nodes replace it, never mutate it in place.
+    """
     length: int
-    numbers: List[int]
-    squared_results: Annotated[List[int], operator.add]  # Aggregates results from mappers
+    numbers: np.ndarray  # int64 buffer, filled in one call by the generator
+    partial_sum: Annotated[int, operator.add]  # Running total; each mapper adds its shard's sum
     sum_of_squares: int
     execution_time: float
 
 
-# Define the mapper state for individual number processing
+# Define the mapper state for one shard of numbers
 class MapperState(TypedDict):
     """State for individual mapper nodes."""
-    number: int
+    chunk: np.ndarray
+
+
+# Number of mapper shards; scheduling cost is O(shards), not O(numbers)
+MAX_MAPPERS = min(os.cpu_count() or 1, 8)
+
+
+_RNG = np.random.default_rng()
 
 
 def generator_node(state: OverallState) -> Dict[str, Any]:
@@ -34,15 +80,16 @@ def generator_node(state: OverallState) -> Dict[str, Any]:
     Generator Node: Create a list of random integers (0-99).
     This is the Map phase setup.
     """
-    print(f"🎲 Generator: Creating {state['length']} random numbers...")
+    logger.debug("🎲 Generator: Creating %d random numbers...", state['length'])
     start_time = time.time()
     
-    # Generate random numbers
-    numbers = [random.randint(0, 99) for _ in range(state['length'])]
+    # Generate random numbers (one C call filling a contiguous int64 buffer)
+    numbers = _RNG.integers(0, 100, size=state['length'], dtype=np.int64)
     
     end_time = time.time()
-    print(f"✅ Generator: Created numbers: {numbers[:5]}{'...' if len(numbers) > 5 else ''}")
-    print(f"⏱️  Generator execution time: {end_time - start_time:.4f}s")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("✅ Generator: Created numbers: %s%s", numbers[:5].tolist(), '...' if len(numbers) > 5 else '')
+        logger.debug("⏱️  Generator execution time: %.4fs", end_time - start_time)
     
     return {
         "numbers": numbers,
@@ -52,34 +99,34 @@ def generator_node(state: OverallState) -> Dict[str, Any]:
 
 def mapper_node(state: MapperState) -> Dict[str, Any]:
     """
-    Mapper Node: Square a single number.
-    Each mapper processes one number in parallel.
+    Mapper Node: Square and sum one shard of numbers.
+    Each mapper runs one compiled loop over its slice in parallel.
     This is the Map phase execution.
     """
-    number = state["number"]
-    squared = number ** 2
+    chunk = state["chunk"]
+    partial_sum = _sum_of_squares(chunk)
     
-    print(f"🔢 Mapper: {number}² = {squared}")
+    logger.debug("🔢 Mapper: %d numbers -> partial sum %d", len(chunk), partial_sum)
     
     # Return in the format expected by the aggregated state
-    return {"squared_results": [squared]}
+    return {"partial_sum": partial_sum}
 
 
 def reducer_node(state: OverallState) -> Dict[str, Any]:
     """
-    Reducer Node: Sum all squared results.
+    Reducer Node: Publish the total accumulated from the mapper shards.
     This is the Reduce phase.
     """
-    print("🔄 Reducer: Summing all squared results...")
+    logger.debug("🔄 Reducer: Collecting mapper partial sums...")
     start_time = time.time()
     
-    # Sum all the squared results that were aggregated
-    total_sum = sum(state['squared_results'])
+    # operator.add already folded the K shard sums; cast to a Python int once, here
+    total_sum = int(state['partial_sum'])
     
     end_time = time.time()
-    print(f"✅ Reducer: Sum of squares = {total_sum}")
-    print(f"📊 Processed {len(state['squared_results'])} numbers")
-    print(f"⏱️  Reducer execution time: {end_time - start_time:.4f}s")
+    logger.debug("✅ Reducer: Sum of squares = %d", total_sum)
+    logger.debug("📊 Processed %d numbers", len(state['numbers']))
+    logger.debug("⏱️  Reducer execution time: %.4fs", end_time - start_time)
     
     return {
         "sum_of_squares": total_sum,
@@ -89,24 +136,22 @@ def reducer_node(state: OverallState) -> Dict[str, Any]:
 
 def continue_to_mappers(state: OverallState) -> List[Send]:
     """
-    Create Send objects for parallel mapper execution.
-    This implements the fan-out pattern using LangGraph's Send API.
+    Create Send objects for the bucketed mappers.
+    Splits the numbers into at most MAX_MAPPERS contiguous shards (views, no copies).
     """
-    print(f"📤 Creating {len(state['numbers'])} parallel mapper tasks...")
-    
-    # Create a Send object for each number to be processed in parallel
-    sends = [Send("mapper", {"number": num}) for num in state['numbers']]
+    numbers = np.ascontiguousarray(state['numbers'], dtype=np.int64)
+    shards = np.array_split(numbers, max(1, min(MAX_MAPPERS, len(numbers))))
     
-    print(f"✅ Created {len(sends)} Send objects for parallel processing")
-    return sends
+    logger.debug("📤 Creating %d mapper tasks for %d numbers...", len(shards), len(numbers))
+    return [Send("mapper", {"chunk": shard}) for shard in shards]
 
 
 def create_mapreduce_graph() -> StateGraph:
     """
     Create the LangGraph StateGraph with map-reduce pattern.
-    Uses the Send API for parallel execution.
+    Uses the Send API to fan out one mapper per shard of numbers.
     """
-    print("🏗️  Building LangGraph Map-Reduce graph...")
+    logger.debug("🏗️  Building LangGraph Map-Reduce graph...")
     
     # Create the graph with the overall state
     graph = StateGraph(OverallState)
@@ -119,8 +164,7 @@ def create_mapreduce_graph() -> StateGraph:
     # Add edges
     graph.add_edge(START, "generator")
     
-    # Fan-out: Generator creates Send objects for parallel mappers
-    # This is the key pattern from the Medium post
+    # Fan-out: Generator sends one shard to each mapper
     graph.add_conditional_edges(
         "generator",
         continue_to_mappers,
@@ -131,11 +175,27 @@ def create_mapreduce_graph() -> StateGraph:
     graph.add_edge("mapper", "reducer")
     graph.add_edge("reducer", END)
     
-    print("✅ Graph structure created with Send API pattern")
+    logger.debug("✅ Graph structure created with bucketed Send API pattern")
     return graph
 
 
-def run_mapreduce(length: int) -> Dict[str, Any]:
+# Built and compiled once per process; every run reuses it. Results are not
+# memoized: the generator draws fresh random numbers on each invocation.
+_COMPILED_GRAPH = create_mapreduce_graph().compile()
+
+
+@dataclass
+class MapReduceResult:
+    """Outcome of one run (fixed slots instead of a per-call dict; orjson serializes it natively)."""
+    __slots__ = ('sum_of_squares', 'length', 'execution_time', 'numbers_processed', 'sample_numbers')
+    sum_of_squares: int
+    length: int
+    execution_time: float
+    numbers_processed: int
+    sample_numbers: np.ndarray  # First 10 for reference (ndarray view)
+
+
+def run_mapreduce(length: int) -> MapReduceResult:
     """
     Execute the map-reduce graph with the given length.
     
@@ -143,20 +203,15 @@ def run_mapreduce(length: int) -> Dict[str, Any]:
         length: Number of random integers to generate and process
         
     Returns:
-        Dictionary with sum_of_squares and execution metadata
+        MapReduceResult with sum_of_squares and execution metadata
     """
-    print(f"\n🚀 Starting Map-Reduce execution for length={length}")
-    print("=" * 60)
-    
-    # Create and compile the graph
-    graph = create_mapreduce_graph()
-    compiled_graph = graph.compile()
+    logger.debug("🚀 Starting Map-Reduce execution for length=%d", length)
     
     # Initial state
     initial_state = {
         "length": length,
-        "numbers": [],
-        "squared_results": [],  # Will be aggregated by operator.add
+        "numbers": np.empty(0, dtype=np.int64),
+        "partial_sum": 0,  # Will be accumulated by operator.add
         "sum_of_squares": 0,
         "execution_time": 0.0
     }
@@ -165,49 +220,125 @@ def run_mapreduce(length: int) -> Dict[str, Any]:
     overall_start_time = time.time()
     
     try:
-        # Run the compiled graph
-        result = compiled_graph.invoke(initial_state)
+        # Run the graph compiled once at import
+        result = _COMPILED_GRAPH.invoke(initial_state)
         
         overall_end_time = time.time()
         total_time = overall_end_time - overall_start_time
         
-        print("\n" + "=" * 60)
-        print(f"🎉 Map-Reduce completed successfully!")
-        print(f"📊 Results:")
-        print(f"   - Input length: {length}")
-        print(f"   - Numbers generated: {len(result['numbers'])}")
-        print(f"   - Mappers executed: {len(result['squared_results'])}")
-        print(f"   - Sum of squares: {result['sum_of_squares']}")
-        print(f"   - Total execution time: {total_time:.4f}s")
+        logger.debug(
+            "🎉 Map-Reduce completed: length=%d, numbers=%d, sum_of_squares=%d, time=%.4fs",
+            length, len(result['numbers']), result['sum_of_squares'], total_time
+        )
         
-        return {
-            "sum_of_squares": result["sum_of_squares"],
-            "length": length,
-            "execution_time": total_time,
-            "numbers_processed": len(result["squared_results"]),
-            "sample_numbers": result["numbers"][:10]  # First 10 for reference
-        }
+        return MapReduceResult(
+            sum_of_squares=result["sum_of_squares"],
+            length=length,
+            execution_time=total_time,
+            numbers_processed=len(result["numbers"]),
+            sample_numbers=result["numbers"][:10]
+        )
         
     except Exception as e:
-        print(f"❌ Error during graph execution: {e}")
+        logger.error("❌ Error during graph execution: %s", e)
         raise
 
 
+# Lengths up to this are computed inline; graph dispatch would cost more than the math
+DIRECT_MAX_LENGTH = 4
+
+
+class DirectBatcher:
+    """
+    Coalesces concurrent small requests into one NumPy call.
+    A background thread takes whatever is queued (up to max_batch, optionally
+    waiting window_s for more), draws all numbers in one buffer and computes
+    every request's sum with a single np.add.reduceat.
+    """
+    
+    def __init__(self, max_batch: int = 32, window_s: float = 0.0):
+        self.max_batch = max_batch
+        self.window_s = window_s
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    def submit(self, length: int) -> Future:
+        """Queue one request (length >= 1); the future resolves to (sum_of_squares, numbers)."""
+        if self._thread is None:
+            # Started lazily so each forked gunicorn worker gets its own thread
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="direct-batcher", daemon=True)
+                    self._thread.start()
+        future = Future()
+        self._queue.put((length, future))
+        return future
+    
+    def _collect(self):
+        """Block for one request, then gather what else arrives within the window."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window_s
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                lengths = np.fromiter((length for length, _ in batch), dtype=np.int64, count=len(batch))
+                offsets = np.zeros(len(batch), dtype=np.int64)
+                np.cumsum(lengths[:-1], out=offsets[1:])
+                numbers = _RNG.integers(0, 100, size=int(lengths.sum()), dtype=np.int64)
+                sums = np.add.reduceat(np.square(numbers), offsets).tolist()
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            for (length, future), start, total in zip(batch, offsets.tolist(), sums):
+                future.set_result((total, numbers[start:start + length]))
+
+
+_DIRECT_BATCHER = DirectBatcher()
+
+
+def run_direct(length: int) -> MapReduceResult:
+    """
+    Compute a small request without invoking the graph.
+    Concurrent calls are coalesced by DirectBatcher; same result type as run_mapreduce.
+    """
+    start_time = time.time()
+    total_sum, numbers = _DIRECT_BATCHER.submit(length).result()
+    
+    return MapReduceResult(
+        sum_of_squares=total_sum,
+        length=length,
+        execution_time=time.time() - start_time,
+        numbers_processed=length,
+        sample_numbers=numbers
+    )
+
+
 # LangGraph Studio Integration Functions
 def get_compiled_graph():
     """
     Return a compiled graph for LangGraph Studio.
     This is the entry point that LangGraph Studio will use.
     """
-    graph = create_mapreduce_graph()
-    compiled_graph = graph.compile()
-    return compiled_graph
+    return _COMPILED_GRAPH
 
 
+@functools.lru_cache(maxsize=1)
 def create_graph():
     """
     Alternative entry point for LangGraph Studio.
-    Returns the uncompiled graph.
+    Returns the uncompiled graph (built on first call, then reused).
     """
     return create_mapreduce_graph()
 
@@ -216,17 +347,20 @@ def create_graph():
 # This is what LangGraph Studio will look for
 app = get_compiled_graph()
 
-# Alternative alias that some LangGraph tools expect
-graph = create_mapreduce_graph()
+# Alternative alias that some LangGraph tools expect (same compiled graph, no second build)
+graph = _COMPILED_GRAPH
 
 
 if __name__ == "__main__":
+    # Show node progress when run directly
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    
     # Test the map-reduce implementation
     test_lengths = [3, 5, 10]
     
     for length in test_lengths:
         try:
             result = run_mapreduce(length)
-            print(f"\n✅ Test passed for length {length}: sum = {result['sum_of_squares']}")
+            print(f"\n✅ Test passed for length {length}: sum = {result.sum_of_squares}")
         except Exception as e:
             print(f"\n❌ Test failed for length {length}: {e}")